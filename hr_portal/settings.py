@@ -69,6 +69,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'org.middleware.CurrentEmployeeMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -121,6 +122,19 @@ if _sslmode:
     DATABASES["default"]["OPTIONS"]["sslmode"] = _sslmode
 
 
+# Cache (org chart fragments, leaderboards, etc.). The default in-process cache
+# is never told about changes made in other workers or management commands, so
+# with it those entries are only kept for 30 seconds; point
+# DJANGO_CACHE_BACKEND/DJANGO_CACHE_LOCATION at a shared backend (database,
+# file, memcached) when running several workers to keep them for an hour.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", "hr-portal"),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -178,6 +192,21 @@ LOGOUT_REDIRECT_URL = "home"
 # HR portal defaults
 HR_DEFAULT_PASSWORD = os.environ.get("HR_DEFAULT_PASSWORD", "Welcome@123")
 
+# Offer letter PDFs are rendered by `manage.py run_offer_letter_worker`
+OFFER_LETTER_WORKER_CONCURRENCY = int(os.environ.get("OFFER_LETTER_WORKER_CONCURRENCY", "2"))
+OFFER_LETTER_RENDER_MAX_ATTEMPTS = int(os.environ.get("OFFER_LETTER_RENDER_MAX_ATTEMPTS", "3"))
+OFFER_LETTER_RENDER_RETRY_DELAY = int(os.environ.get("OFFER_LETTER_RENDER_RETRY_DELAY", "30"))  # seconds, doubles per attempt
+OFFER_LETTER_RENDER_TIMEOUT = int(os.environ.get("OFFER_LETTER_RENDER_TIMEOUT", "300"))  # seconds before a claim is retried
+# "overlay" stamps candidate fields onto a cached base PDF (needs pypdf); "full" lays out every letter
+OFFER_LETTER_RENDER_MODE = os.environ.get("OFFER_LETTER_RENDER_MODE", "overlay")
+# Hand PDF downloads to the front proxy: "" (Django sends the file), "x-accel-redirect" (nginx) or "x-sendfile" (Apache/lighttpd)
+OFFER_LETTER_DOWNLOAD_OFFLOAD = os.environ.get("OFFER_LETTER_DOWNLOAD_OFFLOAD", "").strip().lower()
+# nginx `internal` location aliased to MEDIA_ROOT, used with x-accel-redirect
+OFFER_LETTER_ACCEL_REDIRECT_PREFIX = os.environ.get("OFFER_LETTER_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
+# Levels of the org chart rendered up front; deeper levels are expanded on demand.
+ORG_CHART_INITIAL_DEPTH = int(os.environ.get("ORG_CHART_INITIAL_DEPTH", "2"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -7,20 +7,22 @@ from django.contrib.auth import logout
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect
 
+from .middleware import get_employee_permissions
+
 
 def employee_required(view_func):
     @wraps(view_func)
     def _wrapped(request: HttpRequest, *args, **kwargs) -> HttpResponse:
-        user = request.user
-        if not user.is_authenticated:
+        if not request.user.is_authenticated:
             return redirect("login")
 
-        if not hasattr(user, "employee"):
+        permissions = get_employee_permissions(request)
+        if not permissions.is_employee:
             logout(request)
             messages.error(request, "No employee profile found for this account.")
             return redirect("login")
 
-        if not user.employee.is_active:
+        if not permissions.is_active:
             logout(request)
             messages.error(request, "This account is inactive.")
             return redirect("login")
@@ -34,7 +36,7 @@ def admin_required(view_func):
     @wraps(view_func)
     @employee_required
     def _wrapped(request: HttpRequest, *args, **kwargs) -> HttpResponse:
-        if request.user.employee.can_access_admin_portal():
+        if get_employee_permissions(request).can_access_admin_portal:
             return view_func(request, *args, **kwargs)
         return redirect("dashboard")
 
@@ -46,10 +48,9 @@ def can_add_employees_required(view_func):
     @wraps(view_func)
     @employee_required
     def _wrapped(request: HttpRequest, *args, **kwargs) -> HttpResponse:
-        if request.user.employee.can_add_employees():
+        if get_employee_permissions(request).can_add_employees:
             return view_func(request, *args, **kwargs)
         messages.error(request, "You don't have permission to manage employees.")
         return redirect("dashboard")
 
     return _wrapped
-
@@ -0,0 +1,126 @@
+"""
+Conditional, resumable file downloads.
+
+pdf_download_response() answers If-None-Match / If-Modified-Since with 304,
+serves single byte ranges with 206, and can hand the transfer to the front
+proxy (OFFER_LETTER_DOWNLOAD_OFFLOAD) so no Python worker is tied up
+streaming the file.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from django.http import FileResponse, HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+from .models import CONTENT_ADDRESSED_NAME
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(file: FieldFile) -> str:
+    """Strong ETag: the content hash for content-addressed files, else name/size/mtime"""
+    name = file.name
+    if CONTENT_ADDRESSED_NAME.fullmatch(name):
+        return quote_etag(name.rsplit("/", 1)[1].removesuffix(".pdf"))
+    stamp = f"{name}:{file.size}:{file.storage.get_modified_time(name).timestamp()}"
+    return quote_etag(hashlib.sha256(stamp.encode()).hexdigest())
+
+
+def _requested_range(request: HttpRequest, size: int, etag: str, last_modified: int) -> tuple[int, int] | None | bool:
+    """
+    (start, end) inclusive for a satisfiable single-range request, None to
+    send the whole file, or False when the range can't be satisfied.
+    """
+    header = request.headers.get("Range")
+    if not header or request.method not in ("GET", "HEAD"):
+        return None
+
+    # If-Range: only honour the range if the client's copy is still current
+    if_range = request.headers.get("If-Range")
+    if if_range:
+        if if_range.startswith(('"', 'W/')):
+            if if_range != etag:
+                return None
+        elif parse_http_date_safe(if_range) != last_modified:
+            return None
+
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None  # multiple or malformed ranges: the whole file is a valid answer
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the final N bytes
+        length = min(int(last), size)
+        return (size - length, size - 1) if length else False
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _header_safe(value: str) -> bool:
+    """True if `value` can be sent as a header value unchanged (latin-1, one line)"""
+    try:
+        value.encode("latin-1")
+    except UnicodeEncodeError:
+        return False
+    return "\r" not in value and "\n" not in value
+
+
+def pdf_download_response(request: HttpRequest, file: FieldFile, filename: str) -> HttpResponse:
+    """Send `file` as a PDF attachment named `filename`"""
+    storage = file.storage
+    etag = file_etag(file)
+    last_modified = int(storage.get_modified_time(file.name).timestamp())
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    offload = settings.OFFER_LETTER_DOWNLOAD_OFFLOAD
+    if offload == "x-sendfile":
+        path = storage.path(file.name)
+        if not _header_safe(path):
+            # Legacy files named after the candidate may not fit in a header
+            offload = None
+    if offload == "x-accel-redirect":
+        # nginx serves the file from an `internal` location mapped to MEDIA_ROOT,
+        # including ranges and conditional requests. It decodes the URI, so
+        # any file name is percent-encoded to plain ASCII.
+        response = HttpResponse(content_type="application/pdf")
+        response["X-Accel-Redirect"] = settings.OFFER_LETTER_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(file.name)
+    elif offload == "x-sendfile":
+        response = HttpResponse(content_type="application/pdf")
+        response["X-Sendfile"] = path
+    else:
+        size = file.size
+        byte_range = _requested_range(request, size, etag, last_modified)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        if byte_range is None:
+            response = FileResponse(file.open("rb"), content_type="application/pdf")
+        else:
+            start, end = byte_range
+            with file.open("rb") as f:
+                f.seek(start)
+                response = HttpResponse(f.read(end - start + 1), status=206, content_type="application/pdf")
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Accept-Ranges"] = "bytes"
+
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    # Cache, but check back every time: approval can be withdrawn
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,297 @@
+"""
+Employee import/export as CSV.
+
+Export streams straight from the database cursor (QuerySet.iterator), so
+memory stays flat however many employees there are. Import reads the file
+row by row and keeps only a small record per employee; the whole batch is
+validated before anything is written (IDs, roles, reporting managers resolved
+in one query, cycles among the new rows, hiring limits), then inserted in one
+transaction with chunked bulk_create, managers before their reports.
+"""
+from __future__ import annotations
+
+import csv
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .models import Employee, EmployeeIdSequence, ManagerHeadcount, reporting_cycles
+from .streaming import csv_lines
+
+EMPLOYEE_CSV_COLUMNS = ["employee_id", "full_name", "role", "reporting_manager", "is_active"]
+OPTIONAL_COLUMNS = {"reporting_manager", "is_active"}
+
+# Upper bound for one import; the manager/ID lookups are single IN queries
+MAX_ROWS = 20000
+CHUNK_SIZE = 1000
+
+_TRUE_VALUES = {"", "1", "true", "yes", "y", "active"}
+_FALSE_VALUES = {"0", "false", "no", "n", "inactive"}
+
+SAMPLE_ROWS = [
+    ["1201", "Anita Desai", "SALES_MANAGER", "", "true"],
+    ["1202", "Rahul Verma", "Assistant Manager", "1201", "true"],
+]
+
+
+@dataclass
+class EmployeeRow:
+    """
+    One CSV data row; `line` is the 1-based line number in the file and
+    `manager_ref` the reporting manager's employee ID ("" for none), which may
+    be an existing employee or another row of the same file.
+    """
+
+    line: int
+    employee_id: str
+    full_name: str
+    role: str
+    manager_ref: str
+    is_active: bool
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+
+def iter_employee_csv() -> Iterator[str]:
+    """Every employee as CSV lines (header first), read in chunks from a cursor"""
+    rows = Employee.objects.order_by("user__username").values_list(
+        "user__username", "full_name", "role", "reporting_manager__user__username", "is_active"
+    )
+    return csv_lines(
+        EMPLOYEE_CSV_COLUMNS,
+        (
+            (employee_id, full_name, role, manager_id or "", "true" if is_active else "false")
+            for employee_id, full_name, role, manager_id, is_active in rows.iterator(chunk_size=CHUNK_SIZE)
+        ),
+    )
+
+
+def write_csv_template(stream) -> None:
+    """Header plus example rows, for people preparing an import"""
+    writer = csv.writer(stream)
+    writer.writerow(EMPLOYEE_CSV_COLUMNS)
+    writer.writerows(SAMPLE_ROWS)
+
+
+def read_employee_csv(stream) -> list[EmployeeRow]:
+    """
+    Parse and validate every row of a CSV text stream. Problems with the file
+    as a whole raise ValidationError; problems with individual rows are
+    collected on each EmployeeRow.
+    """
+    reader = csv.DictReader(stream)
+    header = [name.strip() for name in reader.fieldnames or []]
+    missing = [name for name in EMPLOYEE_CSV_COLUMNS if name not in header and name not in OPTIONAL_COLUMNS]
+    if missing:
+        raise ValidationError(f"Missing column(s): {', '.join(missing)}. Expected: {', '.join(EMPLOYEE_CSV_COLUMNS)}.")
+    reader.fieldnames = header
+
+    # Accept the role value (RELATIONSHIP_MANAGER) or its label (Relationship Manager)
+    roles = Employee.role_lookup()
+    max_length = Employee._meta.get_field("full_name").max_length
+    first_line: dict[str, int] = {}
+    rows = []
+    for record in reader:
+        if not any((value or "").strip() for value in record.values() if isinstance(value, str)):
+            continue  # blank line
+        if len(rows) >= MAX_ROWS:
+            raise ValidationError(f"Too many rows; import at most {MAX_ROWS} employees per file.")
+
+        data = {name: (record.get(name) or "").strip() for name in EMPLOYEE_CSV_COLUMNS}
+        row = EmployeeRow(
+            line=reader.line_num,
+            employee_id=data["employee_id"],
+            full_name=data["full_name"],
+            role=roles.get(data["role"].lower(), ""),
+            manager_ref=data["reporting_manager"],
+            is_active=data["is_active"].lower() not in _FALSE_VALUES,
+        )
+
+        if not row.employee_id:
+            row.errors.append("Employee ID is required.")
+        elif len(row.employee_id) > 150:
+            row.errors.append("Employee ID is longer than 150 characters.")
+        elif row.employee_id in first_line:
+            row.errors.append(f"Employee ID {row.employee_id} is repeated (first used on line {first_line[row.employee_id]}).")
+        else:
+            first_line[row.employee_id] = row.line
+        if not row.full_name:
+            row.errors.append("Full name is required.")
+        elif len(row.full_name) > max_length:
+            row.errors.append(f"Full name is longer than {max_length} characters.")
+        if not row.role:
+            row.errors.append(f"Unknown role {data['role']!r}." if data["role"] else "Role is required.")
+        if data["is_active"].lower() not in _TRUE_VALUES | _FALSE_VALUES:
+            row.errors.append(f"is_active must be true or false, not {data['is_active']!r}.")
+        if row.manager_ref and row.manager_ref == row.employee_id:
+            row.errors.append("Employee cannot report to themselves.")
+        rows.append(row)
+
+    if not rows:
+        raise ValidationError("The file has no employee rows.")
+
+    taken = set(
+        User.objects.filter(username__in=list(first_line)).values_list("username", flat=True)
+    )
+    for row in rows:
+        if row.employee_id in taken:
+            row.errors.append(f"Employee ID {row.employee_id} already exists.")
+
+    # References to an ID that already exists point at that employee, even if a
+    # (rejected) row of the file repeats it
+    new_ids = set(first_line) - taken
+    managers = _existing_managers(rows, new_ids)
+    _check_reporting_lines(rows, new_ids, managers)
+    counts = {
+        (manager_id, role): count
+        for manager_id, by_role in ManagerHeadcount.counts_for([m.id for m in managers.values()]).items()
+        for role, count in by_role.items()
+    }
+    _check_hiring_limits(rows, new_ids, managers, counts)
+    return rows
+
+
+def _existing_managers(rows: list[EmployeeRow], new_ids: set[str]) -> dict[str, Employee]:
+    """Reporting managers outside `new_ids` that already exist, by employee ID, in one query"""
+    refs = {row.manager_ref for row in rows if row.manager_ref and row.manager_ref not in new_ids}
+    if not refs:
+        return {}
+    return {
+        manager.user.username: manager
+        for manager in Employee.objects.select_related("user").filter(user__username__in=refs)
+    }
+
+
+def _check_reporting_lines(rows: list[EmployeeRow], new_ids: set[str], managers: dict[str, Employee]) -> None:
+    """Unknown managers, and cycles among the new rows (existing employees can't be under a new one)"""
+    parents = {row.employee_id: row.manager_ref for row in rows if row.employee_id in new_ids}
+    for row in rows:
+        if row.manager_ref and row.manager_ref not in new_ids and row.manager_ref not in managers:
+            row.errors.append(f"Unknown reporting manager {row.manager_ref}.")
+
+    cycle_members = reporting_cycles(parents, parents)
+    for row in rows:
+        if row.employee_id in cycle_members and row.manager_ref != row.employee_id:
+            row.errors.append("Invalid reporting manager (would create a cycle).")
+
+
+def _check_hiring_limits(
+    rows: list[EmployeeRow], new_ids: set[str], managers: dict[str, Employee], counts: dict[tuple[int, str], int]
+) -> list[EmployeeRow]:
+    """
+    Add a hiring-limit error to every row that would take its manager past
+    their limit, counting the file's rows in order on top of `counts`
+    ({(manager_id, role): active direct reports}). Returns the rows flagged.
+    """
+    new_managers = {}
+    for row in rows:
+        if row.employee_id in new_ids and row.role:
+            new_managers.setdefault(row.employee_id, Employee(role=row.role))
+    hired: dict[tuple, int] = {}
+    flagged = []
+    for row in rows:
+        if not row.is_active or not row.manager_ref or not row.role:
+            continue
+        if row.manager_ref in managers:
+            manager = managers[row.manager_ref]
+            key = (manager.id, row.role)
+            current = counts.get(key, 0)
+        elif row.manager_ref in new_managers:
+            manager = new_managers[row.manager_ref]
+            key = (row.manager_ref, row.role)
+            current = 0
+        else:
+            continue
+        can_hire, error_msg = manager.can_hire_role(row.role, current_count=current + hired.get(key, 0))
+        if can_hire:
+            hired[key] = hired.get(key, 0) + 1
+        else:
+            row.errors.append(f"Reporting manager {row.manager_ref}: {error_msg}")
+            flagged.append(row)
+    return flagged
+
+
+def _levels(rows: list[EmployeeRow]) -> list[list[EmployeeRow]]:
+    """Rows grouped by depth below the existing org, so each level's managers exist before it is inserted"""
+    by_id = {row.employee_id: row for row in rows}
+    depth: dict[str, int] = {}
+    levels: list[list[EmployeeRow]] = []
+    for row in rows:
+        chain = []
+        cursor = row
+        while cursor.employee_id not in depth and cursor.manager_ref in by_id:
+            chain.append(cursor)
+            cursor = by_id[cursor.manager_ref]
+        level = depth.setdefault(cursor.employee_id, 0)
+        for member in reversed(chain):
+            level += 1
+            depth[member.employee_id] = level
+
+        while len(levels) <= depth[row.employee_id]:
+            levels.append([])
+        levels[depth[row.employee_id]].append(row)
+    return levels
+
+
+def create_employees(rows: list[EmployeeRow]) -> list[Employee]:
+    """
+    Create a user and employee for every row in one transaction. Hiring
+    limits are checked again with the counters locked; if they no longer
+    allow the batch, nothing is created.
+    """
+    if any(not row.is_valid for row in rows):
+        raise ValueError("create_employees() needs rows that all passed validation")
+
+    try:
+        with transaction.atomic():
+            new_ids = {row.employee_id for row in rows}
+            managers = _existing_managers(rows, new_ids)
+            counts = ManagerHeadcount.lock_many(
+                (managers[row.manager_ref].id, row.role)
+                for row in rows
+                if row.is_active and row.manager_ref in managers
+            )
+            flagged = _check_hiring_limits(rows, new_ids, managers, counts)
+            if flagged:
+                raise ValidationError(
+                    "Hiring limits changed since the file was checked: "
+                    + " ".join(f"Line {row.line}: {row.errors[-1]}" for row in flagged)
+                )
+
+            password = Employee.default_password_hash()
+            users = User.objects.bulk_create(
+                [User(username=row.employee_id, password=password) for row in rows], batch_size=CHUNK_SIZE
+            )
+            user_by_id = {user.username: user for user in users}
+
+            manager_pks = {employee_id: manager.pk for employee_id, manager in managers.items()}
+            created: list[Employee] = []
+            for level in _levels(rows):
+                employees = Employee.bulk_create_new(
+                    [
+                        Employee(
+                            user=user_by_id[row.employee_id],
+                            full_name=row.full_name,
+                            role=row.role,
+                            reporting_manager_id=manager_pks.get(row.manager_ref),
+                            must_change_password=True,
+                            is_active=row.is_active,
+                        )
+                        for row in level
+                    ],
+                    batch_size=CHUNK_SIZE,
+                )
+                manager_pks.update((employee.user.username, employee.pk) for employee in employees)
+                created += employees
+
+            EmployeeIdSequence.advance_past(user_by_id)
+    except IntegrityError:
+        # Someone created one of the employee IDs since validation ran
+        raise ValidationError("Some employee IDs were created by someone else meanwhile; import the file again.")
+    return created
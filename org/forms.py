@@ -60,13 +60,22 @@ class EmployeeCreateForm(forms.Form):
     def save(self) -> Employee:
         employee_id = self.cleaned_data["employee_id"]
         default_password = getattr(settings, "HR_DEFAULT_PASSWORD", "Welcome@123")
+        role = self.cleaned_data["role"]
+        reporting_manager = self.cleaned_data.get("reporting_manager")
+
+        # Re-check under a row lock: clean() ran outside this transaction, so a
+        # concurrent hire for the same manager may have used the last slot.
+        if reporting_manager:
+            can_hire, error_msg = reporting_manager.can_hire_role(role, lock=True)
+            if not can_hire:
+                raise forms.ValidationError(error_msg)
 
         user = User.objects.create_user(username=employee_id, password=default_password)
         employee = Employee.objects.create(
             user=user,
             full_name=self.cleaned_data["full_name"],
-            role=self.cleaned_data["role"],
-            reporting_manager=self.cleaned_data.get("reporting_manager"),
+            role=role,
+            reporting_manager=reporting_manager,
             must_change_password=True,
             is_active=bool(self.cleaned_data.get("is_active")),
         )
@@ -113,6 +122,10 @@ class EmployeeUpdateForm(forms.ModelForm):
         if commit:
             employee.user.save()
             employee.save()
+            if "employee_id" in self.changed_data:
+                # The org chart and leaderboards show employee IDs, which live on the User row
+                employee.invalidate_org_tree_cache()
+                employee.invalidate_leaderboard_cache()
         return employee
 
 
@@ -178,6 +191,31 @@ class OfferLetterForm(forms.Form):
                 field.widget.attrs.setdefault("class", "form-control")
 
 
+class BulkOfferLetterRowForm(OfferLetterForm):
+    """One CSV row; reference numbers are checked for the whole file at once (see offer_letter_import)"""
+
+    def clean_reference_number(self):
+        return self.cleaned_data.get('reference_number')
+
+
+class OfferLetterCSVUploadForm(forms.Form):
+    """Upload a CSV of candidates for bulk offer letters"""
+    csv_file = forms.FileField(
+        label="Candidates CSV",
+        help_text="UTF-8 CSV with one candidate per row; download the template for the expected columns",
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,text/csv', 'class': 'form-control'}),
+    )
+
+
+class EmployeeCSVUploadForm(forms.Form):
+    """Upload a CSV of employees to import"""
+    csv_file = forms.FileField(
+        label="Employees CSV",
+        help_text="UTF-8 CSV with one employee per row; download the template or an export for the expected columns",
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,text/csv', 'class': 'form-control'}),
+    )
+
+
 class DailyReportForm(forms.ModelForm):
     """Form for submitting daily work reports"""
     
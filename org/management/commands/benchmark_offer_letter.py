@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from org.offer_letter_pdf import OfferLetterTemplate, PdfReader, get_offer_letter_template
+
+SAMPLE_LETTER = {
+    "reference_number": "EOM/BENCH/0001",
+    "offer_date": "01 January 2026",
+    "candidate_name": "Sample Candidate",
+    "designation_display": "Team Leader",
+    "joining_date": "15 January 2026",
+    "annual_salary": "3,00,000",
+    "salary_in_words": "Three Lakh Rupees Only",
+}
+
+
+class Command(BaseCommand):
+    help = "Measure offer letter PDF render throughput: cold, cached template and overlay mode."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=50, help="Renders per measurement (default: 50).")
+
+    def handle(self, *args, **options):
+        count = max(1, options["count"])
+
+        # Cold: styles, images and paragraphs rebuilt for every letter
+        cold = self._measure(lambda: OfferLetterTemplate().render(SAMPLE_LETTER), count)
+
+        template = get_offer_letter_template()
+        template.render(SAMPLE_LETTER)
+        cached = self._measure(lambda: template.render(SAMPLE_LETTER), count)
+
+        self._report("Cold template", cold, count)
+        self._report("Cached template", cached, count)
+
+        if PdfReader is None:
+            self.stdout.write("Overlay mode:    skipped (pypdf is not installed)")
+            best = cached
+        else:
+            template.render_overlay(SAMPLE_LETTER)
+            best = overlay = self._measure(lambda: template.render_overlay(SAMPLE_LETTER), count)
+            self._report("Overlay mode", overlay, count)
+
+        self.stdout.write(self.style.SUCCESS(f"Speed-up over cold: {cold / best:.1f}x"))
+
+    def _report(self, label: str, elapsed: float, count: int) -> None:
+        self.stdout.write(f"{label + ':':<17}{count / elapsed:7.1f} renders/s ({elapsed / count * 1000:.1f} ms each)")
+
+    @staticmethod
+    def _measure(render, count: int) -> float:
+        start = time.perf_counter()
+        for _ in range(count):
+            render()
+        return time.perf_counter() - start
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from org.models import DailyReport
+
+
+class Command(BaseCommand):
+    help = "Delete the empty daily reports that opening the report form used to create."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Count the empty reports without deleting them.")
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="Delete this many reports per transaction (default: 500)."
+        )
+
+    def handle(self, *args, **options):
+        empty = DailyReport.empty_placeholders()
+        if options.get("dry_run"):
+            self.stdout.write(self.style.SUCCESS(f"{empty.count()} empty daily report(s) would be deleted."))
+            return
+
+        # Short transactions, so people submitting meanwhile aren't held up.
+        # The batch is locked and the delete re-checks that each report is
+        # still empty, so one submitted in between is kept. delete() runs the
+        # pre_delete signal that keeps the rollups in step.
+        deleted = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    empty.select_for_update().order_by("pk").values_list("pk", flat=True)[: options["batch_size"]]
+                )
+                if not batch:
+                    break
+                deleted += empty.filter(pk__in=batch).delete()[1].get(DailyReport._meta.label, 0)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} empty daily report(s)."))
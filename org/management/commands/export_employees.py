@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from org.employee_csv import iter_employee_csv
+
+
+class Command(BaseCommand):
+    help = "Write every employee to CSV (the format import_employees reads)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", default="-", help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        path = options["output"]
+        if path == "-":
+            for line in iter_employee_csv():
+                self.stdout.write(line, ending="")
+            return
+
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                count = -1  # the header line
+                for line in iter_employee_csv():
+                    f.write(line)
+                    count += 1
+        except OSError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} employee(s) to {path}."))
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from org.models import OfferLetter
+
+
+class Command(BaseCommand):
+    help = "Delete stored offer letter PDFs that no offer letter references any more."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=24,
+            help="Keep files younger than this, in case a render is still being saved (default: 24).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="List the orphaned files without deleting them.")
+        parser.add_argument(
+            "--rehash",
+            action="store_true",
+            help="First move PDFs stored under old-style names to content-addressed names.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = bool(options.get("dry_run"))
+
+        if options.get("rehash") and not dry_run:
+            moved = OfferLetter.rehash_pdfs()
+            self.stdout.write(f"Moved {moved} PDF(s) to content-addressed names.")
+
+        orphans = OfferLetter.collect_orphaned_pdfs(
+            min_age=timedelta(hours=options["min_age_hours"]), delete=not dry_run
+        )
+        for name in orphans:
+            self.stdout.write(name)
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(f"{len(orphans)} orphaned PDF(s) would be deleted."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {len(orphans)} orphaned PDF(s)."))
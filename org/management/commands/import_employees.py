@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from org.employee_csv import EMPLOYEE_CSV_COLUMNS, create_employees, read_employee_csv
+
+
+class Command(BaseCommand):
+    help = "Create employees from a CSV file (validated as a whole; nothing is created if any row is invalid)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "csv_path", help=f"CSV with the columns {', '.join(EMPLOYEE_CSV_COLUMNS)} (as written by export_employees)."
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only validate the file.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_path"], newline="", encoding="utf-8-sig") as f:
+                rows = read_employee_csv(f)
+        except OSError as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError(" ".join(e.messages))
+
+        invalid = [row for row in rows if not row.is_valid]
+        for row in invalid:
+            for error in row.errors:
+                self.stderr.write(f"Line {row.line}: {error}")
+        if invalid:
+            raise CommandError(f"{len(invalid)} of {len(rows)} row(s) are invalid; nothing was created.")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"All {len(rows)} row(s) are valid."))
+            return
+
+        try:
+            employees = create_employees(rows)
+        except ValidationError as e:
+            raise CommandError(" ".join(e.messages))
+        self.stdout.write(self.style.SUCCESS(f"Created {len(employees)} employee(s)."))
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from org.models import Employee, OfferLetter
+from org.offer_letter_import import create_offer_letters, read_offer_letter_csv
+from org.offer_letter_pdf import render_pool
+
+
+class Command(BaseCommand):
+    help = "Create offer letters for every candidate in a CSV file and render their PDFs in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help="CSV with the columns listed on the bulk upload page.")
+        parser.add_argument(
+            "--created-by", required=True, help="Employee ID (username) recorded as the letters' creator."
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.OFFER_LETTER_WORKER_CONCURRENCY,
+            help="Render processes (default: OFFER_LETTER_WORKER_CONCURRENCY).",
+        )
+        parser.add_argument(
+            "--no-render", action="store_true", help="Only create the letters; leave rendering to the worker."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            created_by = Employee.objects.select_related("user").get(user__username=options["created_by"])
+        except Employee.DoesNotExist:
+            raise CommandError(f"No employee with ID {options['created_by']}.")
+
+        try:
+            with open(options["csv_path"], newline="", encoding="utf-8-sig") as f:
+                rows = read_offer_letter_csv(f)
+        except OSError as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError(" ".join(e.messages))
+
+        invalid = [row for row in rows if not row.is_valid]
+        for row in invalid:
+            for error in row.errors:
+                self.stderr.write(f"Line {row.line}: {error}")
+        if invalid:
+            raise CommandError(f"{len(invalid)} of {len(rows)} row(s) are invalid; nothing was created.")
+
+        render = not options["no_render"]
+        try:
+            letters = create_offer_letters(rows, created_by, claim=render)
+        except ValidationError as e:
+            raise CommandError(" ".join(e.messages))
+        self.stdout.write(f"Created {len(letters)} offer letter(s).")
+
+        if not render:
+            self.stdout.write(self.style.SUCCESS("PDFs will be rendered by run_offer_letter_worker."))
+            return
+
+        failed = 0
+        with render_pool(max(1, options["workers"])) as pool:
+            try:
+                for done, letter in enumerate(OfferLetter.render_pdfs(letters, pool), start=1):
+                    progress = f"[{done}/{len(letters)}]"
+                    if letter.is_pdf_ready:
+                        self.stdout.write(f"{progress} Rendered {letter.reference_number} ({letter.candidate_name})")
+                    else:
+                        failed += 1
+                        self.stderr.write(f"{progress} Failed {letter.reference_number}: {letter.render_error}")
+            except BrokenProcessPool:
+                raise CommandError(
+                    "A render process died; the remaining PDFs will be rendered by run_offer_letter_worker."
+                )
+
+        if failed:
+            self.stdout.write(
+                self.style.WARNING(f"{failed} PDF(s) failed and will be retried by run_offer_letter_worker.")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rendered {len(letters)} PDF(s)."))
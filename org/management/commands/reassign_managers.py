@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from org.models import Employee
+
+COLUMNS = ["employee_id", "reporting_manager"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Move employees to new reporting managers from a CSV file. The re-org is validated as a whole "
+        "(unknown IDs, self-reporting, cycles); nobody is moved if any line is invalid."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "csv_path", help="CSV with the columns employee_id, reporting_manager (blank manager = top-level)."
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only validate the file.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_path"], newline="", encoding="utf-8-sig") as f:
+                reader = csv.DictReader(f)
+                missing = [c for c in COLUMNS if c not in (reader.fieldnames or [])]
+                if missing:
+                    raise CommandError(f"Missing column(s): {', '.join(missing)}.")
+                lines = [
+                    (reader.line_num, row["employee_id"].strip(), (row["reporting_manager"] or "").strip())
+                    for row in reader
+                ]
+        except OSError as e:
+            raise CommandError(str(e))
+
+        # Employee IDs are usernames; resolve the whole file in one query
+        usernames = {ref for _, employee_ref, manager_ref in lines for ref in (employee_ref, manager_ref) if ref}
+        ids = dict(Employee.objects.filter(user__username__in=usernames).values_list("user__username", "id"))
+
+        errors = []
+        changes: dict[int, int | None] = {}
+        line_of: dict[int, int] = {}
+        for line, employee_ref, manager_ref in lines:
+            if employee_ref not in ids:
+                errors.append(f"Line {line}: Unknown employee ID {employee_ref!r}.")
+            elif manager_ref and manager_ref not in ids:
+                errors.append(f"Line {line}: Unknown reporting manager {manager_ref!r}.")
+            elif ids[employee_ref] in changes:
+                errors.append(f"Line {line}: Employee {employee_ref} is listed more than once.")
+            else:
+                changes[ids[employee_ref]] = ids[manager_ref] if manager_ref else None
+                line_of[ids[employee_ref]] = line
+
+        if not errors:
+            try:
+                if options["dry_run"]:
+                    Employee.validate_reassignments(changes)
+                else:
+                    moved = Employee.reassign_managers(changes)
+            except ValidationError as e:
+                for employee_id, messages in sorted(e.message_dict.items(), key=lambda item: line_of[item[0]]):
+                    errors.extend(f"Line {line_of[employee_id]}: {message}" for message in messages)
+
+        for error in errors:
+            self.stderr.write(error)
+        if errors:
+            raise CommandError(f"{len(errors)} error(s) in {len(lines)} line(s); nobody was moved.")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"All {len(lines)} line(s) are valid."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Moved {moved} employee(s)."))
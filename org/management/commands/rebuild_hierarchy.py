@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from org.models import EmployeeClosure
+
+
+class Command(BaseCommand):
+    help = "Rebuild the employee hierarchy index (EmployeeClosure) from reporting managers."
+
+    def handle(self, *args, **options):
+        rows = EmployeeClosure.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt hierarchy index ({rows} rows)."))
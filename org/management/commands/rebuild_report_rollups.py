@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from org.models import ReportRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily/weekly/monthly report rollups (ReportRollup) from daily reports."
+
+    def handle(self, *args, **options):
+        rows = ReportRollup.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt report rollups ({rows} rows)."))
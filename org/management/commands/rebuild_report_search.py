@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from org.report_search import build_search_index, create_search_index
+
+
+class Command(BaseCommand):
+    help = "Recreate the daily report full-text search index if it is missing, and refill it."
+
+    def handle(self, *args, **options):
+        # Not atomic: on PostgreSQL the GIN index is built CONCURRENTLY
+        with connection.schema_editor(atomic=False) as schema_editor:
+            create_search_index(schema_editor)
+            build_search_index(schema_editor)
+        self.stdout.write(self.style.SUCCESS(f"Report search index ready ({connection.vendor})."))
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from org.models import ManagerHeadcount
+
+
+class Command(BaseCommand):
+    help = "Verify the per-manager headcount counters against actual direct reports."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rewrite counters that do not match.")
+
+    def handle(self, *args, **options):
+        fix = bool(options.get("fix"))
+        mismatches = ManagerHeadcount.reconcile(fix=fix)
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("All headcount counters match."))
+            return
+
+        for manager_id, role, stored, actual in mismatches:
+            self.stdout.write(f"Manager {manager_id} / {role}: stored {stored}, actual {actual}")
+
+        if fix:
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(mismatches)} counter(s)."))
+        else:
+            raise CommandError(f"{len(mismatches)} counter(s) out of sync; re-run with --fix to repair.")
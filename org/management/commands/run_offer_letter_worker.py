@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from org.models import OfferLetter
+from org.offer_letter_pdf import render_pool
+
+
+class Command(BaseCommand):
+    help = "Render queued offer letter PDFs. Run alongside gunicorn (see Procfile)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.OFFER_LETTER_WORKER_CONCURRENCY,
+            help="Number of render processes (default: OFFER_LETTER_WORKER_CONCURRENCY).",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=5.0, help="Seconds to wait when the queue is empty."
+        )
+        parser.add_argument("--once", action="store_true", help="Drain the queue and exit instead of polling.")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        poll_interval = options["poll_interval"]
+        once = bool(options.get("once"))
+
+        self.stdout.write(f"Offer letter worker started (concurrency={concurrency}).")
+        pool = render_pool(concurrency)
+        try:
+            while True:
+                # Drop connections the server closed or that outlived CONN_MAX_AGE while we slept
+                close_old_connections()
+                try:
+                    letters = OfferLetter.claim_render_jobs(limit=concurrency)
+                    if not letters:
+                        if once:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    for letter in OfferLetter.render_pdfs(letters, pool):
+                        if letter.is_pdf_ready:
+                            self.stdout.write(self.style.SUCCESS(f"Rendered {letter.reference_number}"))
+                        else:
+                            self.stderr.write(
+                                f"Failed to render {letter.reference_number} "
+                                f"(attempt {letter.render_attempts}): {letter.render_error}"
+                            )
+                except BrokenProcessPool:
+                    self.stderr.write("A render process died; restarting the pool and requeueing its letters.")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = render_pool(concurrency)
+                except DatabaseError as e:
+                    # Claimed letters are picked up again once their claim goes stale
+                    self.stderr.write(f"Database error, retrying in {poll_interval}s: {e}")
+                    time.sleep(poll_interval)
+        finally:
+            pool.shutdown()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from functools import cached_property
+
+from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
+
+from .models import Employee
+
+
+def get_employee(request: HttpRequest) -> Employee | None:
+    """
+    The logged-in user's Employee profile, loaded once per request with the
+    reporting manager joined. Returns None for anonymous users and accounts
+    without a profile.
+    """
+    if not hasattr(request, "_cached_employee"):
+        employee = None
+        user = request.user
+        if user.is_authenticated:
+            try:
+                employee = Employee.objects.select_related("reporting_manager__user").get(user_id=user.pk)
+            except Employee.DoesNotExist:
+                pass
+            else:
+                # Reuse the already-loaded User on both sides of the relation so
+                # request.user.employee (templates, older code) doesn't query again.
+                user.employee = employee
+        request._cached_employee = employee
+    return request._cached_employee
+
+
+class EmployeePermissions:
+    """Role/permission snapshot for the current request's employee"""
+
+    def __init__(self, employee: Employee | None):
+        self.employee = employee
+        self.is_employee = employee is not None
+        self.is_active = bool(employee and employee.is_active)
+        self.can_access_admin_portal = bool(employee and employee.can_access_admin_portal())
+        self.can_view_subtree = bool(employee and employee.can_view_subtree())
+        self.can_add_employees = bool(employee and employee.can_add_employees())
+
+    @cached_property
+    def has_team_members(self) -> bool:
+        # Needs a query, so only computed when something asks for it
+        return bool(self.employee and self.employee.has_team_members())
+
+
+def get_employee_permissions(request: HttpRequest) -> EmployeePermissions:
+    if not hasattr(request, "_cached_employee_permissions"):
+        request._cached_employee_permissions = EmployeePermissions(get_employee(request))
+    return request._cached_employee_permissions
+
+
+class CurrentEmployeeMiddleware:
+    """
+    Exposes request.employee and request.employee_permissions, both resolved
+    lazily and at most once per request. Must come after AuthenticationMiddleware.
+
+    request.employee is a lazy proxy: test it for truthiness, not `is None`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        request.employee = SimpleLazyObject(lambda: get_employee(request))
+        request.employee_permissions = SimpleLazyObject(lambda: get_employee_permissions(request))
+        return self.get_response(request)
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_closure(apps, schema_editor):
+    """Populate the hierarchy index from the existing reporting_manager links"""
+    Employee = apps.get_model('org', 'Employee')
+    EmployeeClosure = apps.get_model('org', 'EmployeeClosure')
+
+    parents = dict(Employee.objects.values_list('id', 'reporting_manager_id'))
+    rows = []
+    for employee_id in parents:
+        depth = 0
+        cursor = employee_id
+        seen = set()
+        while cursor is not None and cursor not in seen:
+            seen.add(cursor)
+            rows.append(EmployeeClosure(ancestor_id=cursor, descendant_id=employee_id, depth=depth))
+            cursor = parents.get(cursor)
+            depth += 1
+    EmployeeClosure.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('org', '0005_simplify_roles'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='org.employee')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='org.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='org_closure_desc_depth_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_headcounts(apps, schema_editor):
+    """Seed counters from existing active direct reports"""
+    Employee = apps.get_model('org', 'Employee')
+    ManagerHeadcount = apps.get_model('org', 'ManagerHeadcount')
+
+    rows = (
+        Employee.objects.filter(is_active=True, reporting_manager__isnull=False)
+        .values('reporting_manager_id', 'role')
+        .annotate(count=models.Count('id'))
+        .order_by()
+    )
+    ManagerHeadcount.objects.bulk_create(
+        [ManagerHeadcount(manager_id=r['reporting_manager_id'], role=r['role'], count=r['count']) for r in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('org', '0006_employeeclosure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ManagerHeadcount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('SALES_MANAGER', 'Sales Manager'), ('ASSISTANT_MANAGER', 'Assistant Manager'), ('RELATIONSHIP_MANAGER', 'Relationship Manager'), ('AGENT', 'Agent'), ('HR_MANAGER', 'HR Manager'), ('HR_EXECUTIVE', 'HR Executive')], max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('manager', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='headcounts', to='org.employee')),
+            ],
+            options={
+                'unique_together': {('manager', 'role')},
+            },
+        ),
+        migrations.RunPython(populate_headcounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+def mark_existing_ready(apps, schema_editor):
+    """Letters created before the queue already have their PDF"""
+    OfferLetter = apps.get_model('org', 'OfferLetter')
+    OfferLetter.objects.exclude(pdf_file='').update(render_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('org', '0007_managerheadcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offerletter',
+            name='render_after',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='offerletter',
+            name='render_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='offerletter',
+            name='render_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='offerletter',
+            name='render_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='offerletter',
+            name='render_status',
+            field=models.CharField(choices=[('rendering', 'Rendering'), ('ready', 'Ready'), ('failed', 'Failed')], default='rendering', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='offerletter',
+            name='pdf_file',
+            field=models.FileField(blank=True, upload_to='offer_letters/'),
+        ),
+        migrations.RunPython(mark_existing_ready, migrations.RunPython.noop),
+    ]
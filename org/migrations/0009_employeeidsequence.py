@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+def seed_sequence(apps, schema_editor):
+    """Start after the highest numeric employee ID in use (1007 if there is none)"""
+    User = apps.get_model('auth', 'User')
+    EmployeeIdSequence = apps.get_model('org', 'EmployeeIdSequence')
+
+    numeric = User.objects.filter(username__regex=r'^[0-9]+$').values_list('username', flat=True)
+    next_value = max((int(username) + 1 for username in numeric.iterator()), default=1007)
+    EmployeeIdSequence.objects.create(pk=1, next_value=next_value)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('org', '0008_offerletter_render_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeIdSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_value', models.PositiveBigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(seed_sequence, migrations.RunPython.noop),
+    ]
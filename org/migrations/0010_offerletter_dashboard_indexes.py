@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('org', '0009_employeeidsequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offerletter',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='org_offer_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offerletter',
+            index=models.Index(fields=['created_at', 'id'], name='org_offer_created_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.4 on 2026-10-18 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models.functions import TruncMonth, TruncWeek
+
+
+def populate_rollups(apps, schema_editor):
+    """Sum existing reports per employee (own) and per ancestor (team) for each period"""
+    DailyReport = apps.get_model('org', 'DailyReport')
+    ReportRollup = apps.get_model('org', 'ReportRollup')
+
+    starts = {'day': models.F('report_date'), 'week': TruncWeek('report_date'), 'month': TruncMonth('report_date')}
+    owners = {
+        'own': (DailyReport.objects.all(), 'employee_id'),
+        'team': (
+            DailyReport.objects.filter(employee__ancestor_links__depth__gt=0),
+            'employee__ancestor_links__ancestor_id',
+        ),
+    }
+    for scope, (reports, owner) in owners.items():
+        for period, start in starts.items():
+            rows = (
+                reports.annotate(owner=models.F(owner), start=start)
+                .values('owner', 'start')
+                .annotate(
+                    report_count=models.Count('id'),
+                    sales=models.Sum('sales'),
+                    today_hiring=models.Sum('today_hiring'),
+                    total_hiring=models.Sum('total_hiring'),
+                )
+                .order_by()
+            )
+            ReportRollup.objects.bulk_create(
+                [
+                    ReportRollup(
+                        employee_id=r['owner'], scope=scope, period=period, period_start=r['start'],
+                        report_count=r['report_count'], sales=r['sales'],
+                        today_hiring=r['today_hiring'], total_hiring=r['total_hiring'],
+                    )
+                    for r in rows.iterator(chunk_size=2000)
+                ],
+                batch_size=1000,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('org', '0010_offerletter_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('own', 'Own reports'), ('team', 'Team')], max_length=4)),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('report_count', models.PositiveIntegerField(default=0)),
+                ('sales', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('today_hiring', models.IntegerField(default=0)),
+                ('total_hiring', models.IntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_rollups', to='org.employee')),
+            ],
+            options={
+                'unique_together': {('employee', 'scope', 'period', 'period_start')},
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:05
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """PostgreSQL: tsvector column + trigger (filled and indexed by 0014). SQLite: FTS5 table + triggers."""
+    from org.report_search import create_search_index
+
+    create_search_index(schema_editor)
+
+
+def drop_search_index(apps, schema_editor):
+    from org.report_search import drop_search_index
+
+    drop_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('org', '0011_reportrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('org', '0012_dailyreport_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyreport',
+            index=models.Index(fields=['report_date', 'employee'], name='org_report_date_emp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['reporting_manager', 'role', 'is_active'], name='org_emp_manager_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offerletter',
+            index=models.Index(fields=['created_by', 'created_at'], name='org_offer_creator_created_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_search_index(apps, schema_editor):
+    """PostgreSQL: backfill search_vector in batches, then CREATE INDEX CONCURRENTLY. Nothing to do elsewhere."""
+    from org.report_search import build_search_index
+
+    build_search_index(schema_editor)
+
+
+def drop_search_index_concurrently(apps, schema_editor):
+    from org.report_search import drop_search_index_concurrently
+
+    drop_search_index_concurrently(schema_editor)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('org', '0013_composite_indexes'),
+    ]
+
+    operations = [
+        # State only: the FTS5 table itself is created by 0012 (SQLite)
+        migrations.CreateModel(
+            name='DailyReportSearchEntry',
+            fields=[
+                ('report', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='org.dailyreport')),
+            ],
+            options={
+                'db_table': 'org_dailyreport_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(build_search_index, drop_search_index_concurrently),
+    ]
@@ -1,12 +1,47 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Greatest, TruncMonth, TruncWeek
 from django.utils import timezone
 
 
+def reporting_cycles(parents: dict, starts) -> set:
+    """
+    Everyone caught in a reporting cycle found walking up from each of
+    `starts` through `parents` ({id: manager id}; an id that is not a key, or
+    None, is the top). Chains already resolved are remembered, so checking
+    every start stays linear overall.
+    """
+    reaches_top: set = set()
+    stuck: set = set()  # ends in a cycle
+    cycle_members: set = set()
+    for start in starts:
+        path: list = []
+        on_path: set = set()
+        cursor = start
+        while cursor in parents and cursor not in reaches_top and cursor not in stuck:
+            if cursor in on_path:
+                cycle_members.update(path[path.index(cursor):])
+                break
+            path.append(cursor)
+            on_path.add(cursor)
+            cursor = parents[cursor]
+        if cursor in parents and cursor not in reaches_top:
+            stuck.update(path)
+        else:
+            reaches_top.update(path)
+    return cycle_members
+
+
 class Employee(models.Model):
     class Role(models.TextChoices):
         # Sales Hierarchy
@@ -40,10 +75,102 @@ class Employee(models.Model):
 
     class Meta:
         ordering = ["user__username"]
+        indexes = [
+            # Direct reports by role (hiring limits, headcount recounts); is_active makes it covering
+            models.Index(fields=["reporting_manager", "role", "is_active"], name="org_emp_manager_role_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.username} - {self.full_name}"
 
+    # Persisted values save() compares against to keep the hierarchy index,
+    # the headcount counters and the cached org chart HTML in sync.
+    _TRACKED_FIELDS = {
+        "reporting_manager_id": "reporting_manager",
+        "role": "role",
+        "is_active": "is_active",
+        "full_name": "full_name",
+    }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = {
+            attname: instance.__dict__[attname] for attname in cls._TRACKED_FIELDS if attname in instance.__dict__
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        before = {} if is_new else getattr(self, "_loaded_state", {})
+
+        after = {}
+        for attname, name in self._TRACKED_FIELDS.items():
+            skipped = update_fields is not None and name not in update_fields and attname not in update_fields
+            after[attname] = before[attname] if skipped and attname in before else getattr(self, attname)
+        before = {**after, **before}
+
+        with transaction.atomic():
+            if not is_new and before != after:
+                # Org charts rendered under the old reporting line go stale too
+                self.invalidate_org_tree_cache()
+            super().save(*args, **kwargs)
+            if is_new:
+                EmployeeClosure.move_subtree(self, is_new=True)
+            elif before["reporting_manager_id"] != after["reporting_manager_id"]:
+                old_ancestor_ids = EmployeeClosure.ancestor_ids(self.id)
+                EmployeeClosure.move_subtree(self)
+                ReportRollup.move_subtree(self, old_ancestor_ids)
+            ManagerHeadcount.track_change(None if is_new else before, after)
+            if is_new or before != after:
+                self.invalidate_org_tree_cache()
+            if before["full_name"] != after["full_name"]:
+                self.invalidate_leaderboard_cache()
+
+        self._loaded_state = after
+
+    @classmethod
+    def bulk_create_new(cls, employees: list[Employee], batch_size: int = 500) -> list[Employee]:
+        """
+        Insert new employees with bulk_create and do the bookkeeping save()
+        would have done: closure links, headcount counters and org chart
+        cache. A reporting manager in the same batch must come before their
+        reports. Call inside a transaction.
+        """
+        employees = cls.objects.bulk_create(employees, batch_size=batch_size)
+        ancestor_ids = EmployeeClosure.link_new(employees)
+
+        deltas: dict[tuple[int, str], int] = {}
+        for employee in employees:
+            if employee.is_active and employee.reporting_manager_id is not None:
+                key = (employee.reporting_manager_id, employee.role)
+                deltas[key] = deltas.get(key, 0) + 1
+        ManagerHeadcount.lock_many(deltas)  # creates missing counters in one INSERT
+        for (manager_id, role), delta in deltas.items():
+            ManagerHeadcount.adjust(manager_id, role, delta)
+
+        for employee in employees:
+            employee._loaded_state = {attname: getattr(employee, attname) for attname in cls._TRACKED_FIELDS}
+
+        from .org_tree import invalidate_org_tree
+
+        transaction.on_commit(lambda: invalidate_org_tree(ancestor_ids))
+        return employees
+
+    def invalidate_org_tree_cache(self) -> None:
+        """Drop the cached org chart of everyone whose subtree shows this employee"""
+        from .org_tree import invalidate_org_tree
+
+        root_ids = EmployeeClosure.ancestor_ids(self.id)
+        transaction.on_commit(lambda: invalidate_org_tree(root_ids))
+
+    def invalidate_leaderboard_cache(self) -> None:
+        """Drop cached leaderboards that list this employee (they show the name and employee ID)"""
+        from .report_leaderboard import invalidate_member_leaderboards
+
+        transaction.on_commit(lambda: invalidate_member_leaderboards(self.id))
+
     @property
     def employee_id(self) -> str:
         # We treat Django's username as the Employee ID for login.
@@ -55,17 +182,98 @@ class Employee(models.Model):
         if self.reporting_manager_id and self.reporting_manager_id == self.id:
             raise ValidationError({"reporting_manager": "Employee cannot report to themselves."})
 
-        # Prevent cycles: A -> B -> C -> A
-        if self.reporting_manager_id and self.id:
-            seen_ids: set[int] = {self.id}
-            cursor = self.reporting_manager
-            while cursor is not None:
-                if cursor.id in seen_ids:
-                    raise ValidationError(
-                        {"reporting_manager": "Invalid reporting manager (would create a cycle)."}
-                    )
-                seen_ids.add(cursor.id)
-                cursor = cursor.reporting_manager
+        # Prevent cycles: A -> B -> C -> A. The new manager must not already be
+        # somewhere in this employee's subtree (one lookup on the closure table).
+        if self.reporting_manager_id and self.id and self.is_in_subtree(self.reporting_manager_id):
+            raise ValidationError(
+                {"reporting_manager": "Invalid reporting manager (would create a cycle)."}
+            )
+
+    @classmethod
+    def validate_reassignments(cls, changes: dict[int, int | None]) -> dict[int, int | None]:
+        """
+        Validate a whole re-org at once. `changes` maps employee id -> proposed
+        reporting manager id (None for top-level). One query on the closure
+        table reads the current chain above every moved employee and every
+        proposed manager; the changes are applied to those chains in memory
+        and checked for cycles. Any cycle a change creates passes through
+        a proposed manager, so nothing else needs loading.
+
+        Raises ValidationError keyed by employee id for every employee that
+        reports to themselves, to an unknown manager, or ends up in a cycle.
+        Otherwise returns the proposed reporting lines ({id: manager id}) of
+        the moved employees, their new managers and everyone above them.
+        """
+        targets = set(changes) | {manager_id for manager_id in changes.values() if manager_id is not None}
+        chains: dict[int, list[tuple[int, int]]] = {}
+        for descendant_id, ancestor_id, depth in EmployeeClosure.objects.filter(descendant_id__in=targets).values_list(
+            "descendant_id", "ancestor_id", "depth"
+        ):
+            chains.setdefault(descendant_id, []).append((depth, ancestor_id))
+
+        errors: dict[int, str] = {}
+        for employee_id, manager_id in changes.items():
+            # Every employee has a depth-0 link to themselves
+            if employee_id not in chains:
+                errors[employee_id] = "Unknown employee."
+            elif manager_id is not None and manager_id not in chains:
+                errors[employee_id] = "Unknown reporting manager."
+            elif manager_id == employee_id:
+                errors[employee_id] = "Employee cannot report to themselves."
+        if errors:
+            raise ValidationError(errors)
+
+        parents: dict[int, int | None] = {}
+        for chain in chains.values():
+            ids = [ancestor_id for _, ancestor_id in sorted(chain)]
+            parents.update(zip(ids, ids[1:]))
+            parents.setdefault(ids[-1], None)
+        parents.update(changes)
+        for employee_id in reporting_cycles(parents, changes) & changes.keys():
+            errors[employee_id] = "Invalid reporting manager (would create a cycle)."
+        if errors:
+            raise ValidationError(errors)
+        return parents
+
+    @classmethod
+    def reassign_managers(cls, changes: dict[int, int | None]) -> int:
+        """
+        Apply a re-org (employee id -> new reporting manager id) in one
+        transaction, after validate_reassignments() accepted it as a whole.
+        Each move goes through save(), so the closure table, headcounts,
+        rollups and caches follow. Employees are moved top of the new tree
+        first: every new manager is then already in their final place, so no
+        intermediate state has a cycle. Returns the number of employees moved.
+        """
+        with transaction.atomic():
+            parents = cls.validate_reassignments(changes)
+
+            depths: dict[int | None, int] = {None: 0}
+
+            def depth(employee_id):
+                if employee_id not in depths:
+                    depths[employee_id] = depth(parents.get(employee_id)) + 1
+                return depths[employee_id]
+
+            employees = cls.objects.in_bulk(changes)
+            moved = 0
+            for employee_id in sorted(changes, key=depth):
+                employee = employees[employee_id]
+                if employee.reporting_manager_id == changes[employee_id]:
+                    continue
+                employee.reporting_manager_id = changes[employee_id]
+                employee.save(update_fields=["reporting_manager", "updated_at"])
+                moved += 1
+        return moved
+
+    @classmethod
+    def role_lookup(cls) -> dict[str, str]:
+        """Role value by lowercased value or label, for free-text input such as CSV files"""
+        lookup = {}
+        for value, label in cls.Role.choices:
+            lookup[value.lower()] = value
+            lookup[label.lower()] = value
+        return lookup
 
     def can_access_admin_portal(self) -> bool:
         """Only HR Manager and HR Executive can access the admin portal"""
@@ -94,36 +302,43 @@ class Employee(models.Model):
     def subtree_ids(self) -> set[int]:
         """
         Returns ids for this employee + all (direct + indirect) reports.
-        BFS; OK for small/medium orgs. For very large orgs, use a closure table.
+        Single indexed lookup on the EmployeeClosure table.
         """
-        root_id = self.id
-        if root_id is None:
+        if self.id is None:
             return set()
 
-        visited: set[int] = {root_id}
-        frontier: set[int] = {root_id}
+        return set(
+            EmployeeClosure.objects.filter(ancestor_id=self.id).values_list("descendant_id", flat=True)
+        )
 
-        while frontier:
-            children = (
-                Employee.objects.filter(reporting_manager_id__in=frontier)
-                .values_list("id", flat=True)
-                .iterator()
-            )
-            next_frontier: set[int] = set()
-            for cid in children:
-                if cid not in visited:
-                    visited.add(cid)
-                    next_frontier.add(cid)
-            frontier = next_frontier
+    def subtree_queryset(self, max_depth: int | None = None):
+        """This employee + their reports, optionally only `max_depth` levels down"""
+        lookups = {"ancestor_links__ancestor_id": self.id}
+        if max_depth is not None:
+            lookups["ancestor_links__depth__lte"] = max_depth
+        return Employee.objects.filter(**lookups).select_related("user", "reporting_manager")
 
-        return visited
+    @classmethod
+    def direct_report_counts(cls, employee_ids) -> dict[int, int]:
+        """{employee_id: number of direct reports} in one aggregate query"""
+        rows = (
+            cls.objects.filter(reporting_manager_id__in=list(employee_ids))
+            .values("reporting_manager_id")
+            .annotate(count=models.Count("id"))
+            .order_by()
+        )
+        return {row["reporting_manager_id"]: row["count"] for row in rows}
+
+    def is_in_subtree(self, other: Employee | int) -> bool:
+        """True if `other` is this employee or one of their (direct or indirect) reports"""
+        other_id = other if isinstance(other, int) else other.id
+        if self.id is None or other_id is None:
+            return False
+        return EmployeeClosure.objects.filter(ancestor_id=self.id, descendant_id=other_id).exists()
 
-    def subtree_queryset(self):
-        return Employee.objects.filter(id__in=self.subtree_ids()).select_related("user", "reporting_manager")
-    
     def has_team_members(self) -> bool:
         """Check if this employee has any team members (direct or indirect reports)"""
-        return len(self.subtree_ids()) > 1  # More than just themselves
+        return EmployeeClosure.objects.filter(ancestor_id=self.id, depth__gt=0).exists()
 
     def get_hiring_limits(self) -> dict[str, int]:
         """
@@ -148,18 +363,19 @@ class Employee(models.Model):
         return limits.get(self.role, {})
     
     def get_direct_reports_by_role(self) -> dict[str, int]:
-        """Count direct reports grouped by role"""
-        from django.db.models import Count
-        
-        direct_reports = Employee.objects.filter(reporting_manager_id=self.id).values('role').annotate(
-            count=Count('role')
-        )
-        return {item['role']: item['count'] for item in direct_reports}
+        """Count active direct reports grouped by role (read from ManagerHeadcount)"""
+        return ManagerHeadcount.counts_for([self.id]).get(self.id, {})
     
-    def can_hire_role(self, target_role: str) -> tuple[bool, str]:
+    def can_hire_role(self, target_role: str, lock: bool = False, current_count: int | None = None) -> tuple[bool, str]:
         """
         Check if this employee can hire someone with the target_role.
         Returns (can_hire: bool, error_message: str)
+
+        With lock=True the (manager, role) headcount row is locked with
+        SELECT ... FOR UPDATE, so call it inside the transaction that creates
+        the employee; a concurrent hire then waits instead of slipping past
+        the limit. Batch callers that already hold the counts (see
+        ManagerHeadcount.lock_many) pass `current_count` instead.
         """
         # HR and Admin roles have no restrictions
         if self.can_access_admin_portal():
@@ -176,8 +392,11 @@ class Employee(models.Model):
                 return (False, f"{self.get_role_display()} cannot hire any subordinates")
         
         # Check if hiring limit is reached
-        current_counts = self.get_direct_reports_by_role()
-        current_count = current_counts.get(target_role, 0)
+        if current_count is None:
+            if lock:
+                current_count = ManagerHeadcount.lock(self.id, target_role).count
+            else:
+                current_count = self.get_direct_reports_by_role().get(target_role, 0)
         max_allowed = hiring_limits[target_role]
         
         if current_count >= max_allowed:
@@ -190,9 +409,25 @@ class Employee(models.Model):
         Returns hiring status for this employee.
         Returns dict with: total_hired, total_capacity, by_role, is_empty, status_text
         """
-        hiring_limits = self.get_hiring_limits()
-        current_counts = self.get_direct_reports_by_role()
-        
+        return self._hiring_capacity(self.get_hiring_limits(), self.get_direct_reports_by_role())
+
+    @classmethod
+    def bulk_hiring_capacity(cls, employees) -> dict[int, dict[str, any]]:
+        """
+        Hiring capacity for many employees at once, keyed by employee id.
+        Reads all the needed ManagerHeadcount rows in one query instead of
+        one get_direct_reports_by_role() query per employee.
+        """
+        employees = list(employees)
+        counts_by_manager = ManagerHeadcount.counts_for([e.id for e in employees if e.get_hiring_limits()])
+
+        return {
+            e.id: cls._hiring_capacity(e.get_hiring_limits(), counts_by_manager.get(e.id, {}))
+            for e in employees
+        }
+
+    @staticmethod
+    def _hiring_capacity(hiring_limits: dict[str, int], current_counts: dict[str, int]) -> dict[str, any]:
         total_capacity = sum(hiring_limits.values())
         total_hired = sum(current_counts.values())
         
@@ -225,6 +460,329 @@ class Employee(models.Model):
     def default_password(self) -> str:
         return getattr(settings, "HR_DEFAULT_PASSWORD", "Welcome@123")
 
+    @staticmethod
+    def default_password_hash() -> str:
+        """
+        HR_DEFAULT_PASSWORD hashed with a fresh salt, for a batch of new
+        accounts to share. One PBKDF2 run per batch instead of per account;
+        the only thing equal hashes reveal is that those accounts still have
+        the (already shared) default password, and every account replaces it
+        with its own salted hash at the forced change on first login.
+        """
+        from django.contrib.auth.hashers import make_password
+
+        return make_password(getattr(settings, "HR_DEFAULT_PASSWORD", "Welcome@123"))
+
+
+class EmployeeClosure(models.Model):
+    """
+    Closure table for the reporting hierarchy: one row per (ancestor, descendant)
+    pair, including a depth-0 row for every employee pointing at itself.
+    Maintained by Employee.save() and the pre_delete signal; rebuild with
+    `python manage.py rebuild_hierarchy`.
+    """
+    ancestor = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="descendant_links")
+    descendant = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="ancestor_links")
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = [["ancestor", "descendant"]]
+        indexes = [models.Index(fields=["descendant", "depth"], name="org_closure_desc_depth_idx")]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+    @classmethod
+    def ancestor_ids(cls, employee_id: int) -> set[int]:
+        """`employee_id` and everyone above them"""
+        return set(cls.objects.filter(descendant_id=employee_id).values_list("ancestor_id", flat=True))
+
+    @classmethod
+    def move_subtree(cls, employee: Employee, is_new: bool = False) -> None:
+        """
+        Re-link `employee` (and everything under them) below their current
+        reporting_manager. Must run inside the transaction that saved the change.
+        """
+        if is_new:
+            subtree = {employee.id: 0}
+            cls.objects.create(ancestor_id=employee.id, descendant_id=employee.id, depth=0)
+        else:
+            subtree = dict(
+                cls.objects.filter(ancestor_id=employee.id).values_list("descendant_id", "depth")
+            )
+            # Drop every link from outside the subtree into it
+            cls.objects.filter(descendant_id__in=list(subtree)).exclude(
+                ancestor_id__in=list(subtree)
+            ).delete()
+
+        if employee.reporting_manager_id is None:
+            return
+
+        ancestors = cls.objects.filter(descendant_id=employee.reporting_manager_id).values_list(
+            "ancestor_id", "depth"
+        )
+        cls.objects.bulk_create(
+            [
+                cls(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+                for ancestor_id, up in ancestors
+                for descendant_id, down in subtree.items()
+            ],
+            batch_size=1000,
+        )
+
+    @classmethod
+    def link_new(cls, employees: list[Employee]) -> set[int]:
+        """
+        Closure rows for freshly inserted employees (which have no reports
+        yet, except later members of the same list). Reads the ancestors of
+        all outside managers in one query. Returns every ancestor id touched.
+        """
+        chains: dict[int, list[tuple[int, int]]] = {}
+        outside = {e.reporting_manager_id for e in employees} - {e.id for e in employees} - {None}
+        for ancestor_id, descendant_id, depth in cls.objects.filter(descendant_id__in=outside).values_list(
+            "ancestor_id", "descendant_id", "depth"
+        ):
+            chains.setdefault(descendant_id, []).append((ancestor_id, depth))
+
+        rows = []
+        for employee in employees:
+            chain = [(employee.id, 0)]
+            if employee.reporting_manager_id is not None:
+                chain += [(ancestor_id, depth + 1) for ancestor_id, depth in chains.get(employee.reporting_manager_id, [])]
+            chains[employee.id] = chain
+            rows += [cls(ancestor_id=ancestor_id, descendant_id=employee.id, depth=depth) for ancestor_id, depth in chain]
+
+        cls.objects.bulk_create(rows, batch_size=1000)
+        return {row.ancestor_id for row in rows}
+
+    @classmethod
+    def detach_subtree(cls, employee: Employee) -> None:
+        """
+        Called before `employee` is deleted: their reports are about to become
+        top-level (reporting_manager is SET_NULL), so cut the links from
+        `employee` and everyone above them into that subtree.
+        """
+        cls.objects.filter(
+            ancestor_id__in=cls.objects.filter(descendant_id=employee.id).values("ancestor_id"),
+            descendant_id__in=cls.objects.filter(ancestor_id=employee.id, depth__gt=0).values("descendant_id"),
+        ).delete()
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Recompute the whole table from Employee.reporting_manager. Returns rows written."""
+        parents = dict(Employee.objects.values_list("id", "reporting_manager_id"))
+
+        rows = []
+        for employee_id in parents:
+            depth = 0
+            cursor = employee_id
+            seen: set[int] = set()
+            while cursor is not None and cursor not in seen:
+                seen.add(cursor)
+                rows.append(cls(ancestor_id=cursor, descendant_id=employee_id, depth=depth))
+                cursor = parents.get(cursor)
+                depth += 1
+
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
+class ManagerHeadcount(models.Model):
+    """
+    Denormalized count of a manager's active direct reports per role, used for
+    hiring-limit checks. Maintained by Employee.save() and the pre_delete
+    signal; verify with `python manage.py reconcile_headcounts`.
+    """
+    manager = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="headcounts")
+    role = models.CharField(max_length=30, choices=Employee.Role.choices)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = [["manager", "role"]]
+
+    def __str__(self):
+        return f"{self.manager_id} / {self.role}: {self.count}"
+
+    @classmethod
+    def counts_for(cls, manager_ids) -> dict[int, dict[str, int]]:
+        """{manager_id: {role: count}} for the given managers, in one query"""
+        counts: dict[int, dict[str, int]] = {}
+        if not manager_ids:
+            return counts
+        rows = cls.objects.filter(manager_id__in=manager_ids, count__gt=0).values_list("manager_id", "role", "count")
+        for manager_id, role, count in rows:
+            counts.setdefault(manager_id, {})[role] = count
+        return counts
+
+    @classmethod
+    def lock(cls, manager_id: int, role: str) -> ManagerHeadcount:
+        """Fetch (creating if needed) and row-lock the counter. Requires an open transaction."""
+        row, _ = cls.objects.select_for_update().get_or_create(manager_id=manager_id, role=role)
+        return row
+
+    @classmethod
+    def lock_many(cls, keys) -> dict[tuple[int, str], int]:
+        """
+        lock() for many (manager_id, role) pairs: creates missing counters,
+        then locks and reads them all in one query. Requires an open transaction.
+        """
+        keys = set(keys)
+        if not keys:
+            return {}
+        cls.objects.bulk_create(
+            [cls(manager_id=manager_id, role=role) for manager_id, role in keys], ignore_conflicts=True
+        )
+        rows = (
+            cls.objects.select_for_update()
+            .filter(manager_id__in={manager_id for manager_id, _ in keys}, role__in={role for _, role in keys})
+            .values_list("manager_id", "role", "count")
+        )
+        return {(manager_id, role): count for manager_id, role, count in rows if (manager_id, role) in keys}
+
+    @classmethod
+    def adjust(cls, manager_id: int | None, role: str, delta: int) -> None:
+        if manager_id is None or not delta:
+            return
+        # Never below zero: a counter that drifted low heals instead of failing the save
+        updated = cls.objects.filter(manager_id=manager_id, role=role).update(
+            count=Greatest(models.F("count") + delta, 0)
+        )
+        if not updated and delta > 0:
+            cls.lock(manager_id, role)
+            cls.objects.filter(manager_id=manager_id, role=role).update(count=models.F("count") + delta)
+
+    @classmethod
+    def track_change(cls, before: dict | None, after: dict | None) -> None:
+        """
+        Move one employee's contribution between counters. `before`/`after` are
+        the tracked field values (reporting_manager_id, role, is_active) before
+        and after the change; None means the employee did not exist.
+        """
+        def key(state):
+            if not state or not state["is_active"] or state["reporting_manager_id"] is None:
+                return None
+            return (state["reporting_manager_id"], state["role"])
+
+        old, new = key(before), key(after)
+        if old == new:
+            return
+        if old:
+            cls.adjust(*old, -1)
+        if new:
+            cls.adjust(*new, 1)
+
+    @classmethod
+    def actual_counts(cls) -> dict[tuple[int, str], int]:
+        """Recount active direct reports from Employee rows (one GROUP BY query)"""
+        rows = (
+            Employee.objects.filter(is_active=True, reporting_manager__isnull=False)
+            .values("reporting_manager_id", "role")
+            .annotate(count=models.Count("id"))
+            .order_by()
+        )
+        return {(row["reporting_manager_id"], row["role"]): row["count"] for row in rows}
+
+    @classmethod
+    def reconcile(cls, fix: bool = False) -> list[tuple[int, str, int, int]]:
+        """
+        Compare stored counters with real data. Returns mismatches as
+        (manager_id, role, stored, actual); with fix=True they are corrected.
+        """
+        with transaction.atomic():
+            stored = {
+                (row.manager_id, row.role): row
+                for row in (cls.objects.select_for_update() if fix else cls.objects.all())
+            }
+            actual = cls.actual_counts()
+
+            mismatches = []
+            for key in sorted(set(stored) | set(actual)):
+                stored_count = stored[key].count if key in stored else 0
+                actual_count = actual.get(key, 0)
+                if stored_count != actual_count:
+                    mismatches.append((*key, stored_count, actual_count))
+
+            if fix and mismatches:
+                for manager_id, role, _, actual_count in mismatches:
+                    cls.objects.update_or_create(
+                        manager_id=manager_id, role=role, defaults={"count": actual_count}
+                    )
+        return mismatches
+
+
+class EmployeeIdSequence(models.Model):
+    """
+    Allocator for numeric employee IDs (usernames). A single row holds the
+    next number to hand out; reserve() locks it, so concurrent approvals
+    never get the same ID and nothing scans auth_user. Seeded by migration
+    from the highest numeric username.
+    """
+    DEFAULT_START = 1007
+    LOOKAHEAD = 32
+
+    next_value = models.PositiveBigIntegerField()
+
+    def __str__(self):
+        return f"Next employee ID: {self.next_value}"
+
+    @classmethod
+    def reserve(cls, count: int = 1) -> list[str]:
+        """
+        Reserve `count` consecutive-as-possible unused employee IDs (a block,
+        for bulk imports). Numbers someone already took by hand are skipped.
+        The row lock lasts until the surrounding transaction ends, so call it
+        late in long transactions; IDs reserved by a transaction that later
+        fails are either rolled back with it or simply left unused.
+        """
+        if count < 1:
+            return []
+
+        with transaction.atomic():
+            sequence = cls.objects.select_for_update().filter(pk=1).first()
+            if sequence is None:
+                cls.objects.get_or_create(pk=1, defaults={"next_value": cls.seed_value()})
+                sequence = cls.objects.select_for_update().get(pk=1)
+
+            reserved: list[str] = []
+            start = sequence.next_value
+            while len(reserved) < count:
+                # Look a little past what's needed so a few hand-made IDs don't cost a query each
+                candidates = [str(number) for number in range(start, start + count - len(reserved) + cls.LOOKAHEAD)]
+                taken = set(User.objects.filter(username__in=candidates).values_list("username", flat=True))
+                for candidate in candidates:
+                    start += 1
+                    if candidate not in taken:
+                        reserved.append(candidate)
+                        if len(reserved) == count:
+                            break
+
+            sequence.next_value = start
+            sequence.save(update_fields=["next_value"])
+        return reserved
+
+    @classmethod
+    def advance_past(cls, usernames) -> None:
+        """
+        Move the counter beyond the highest numeric ID among `usernames`
+        (e.g. after an import), so reserve() doesn't have to step over them.
+        """
+        numeric = [int(username) for username in usernames if username.isascii() and username.isdigit()]
+        if not numeric:
+            return
+        highest = max(numeric)
+        with transaction.atomic():
+            if not cls.objects.select_for_update().filter(pk=1).exists():
+                cls.objects.get_or_create(pk=1, defaults={"next_value": cls.seed_value()})
+            cls.objects.filter(pk=1, next_value__lte=highest).update(next_value=highest + 1)
+
+    @classmethod
+    def seed_value(cls) -> int:
+        """One more than the highest numeric username, or DEFAULT_START"""
+        numeric = User.objects.filter(username__regex=r"^[0-9]+$").values_list("username", flat=True)
+        return max((int(username) + 1 for username in numeric.iterator()), default=cls.DEFAULT_START)
+
 
 class DailyReport(models.Model):
     """Daily work report submitted by employees"""
@@ -246,12 +804,356 @@ class DailyReport(models.Model):
     class Meta:
         unique_together = [['employee', 'report_date']]
         ordering = ['-report_date', 'employee']
+        indexes = [
+            # Everyone's reports for a day or date range (the unique index leads with employee)
+            models.Index(fields=['report_date', 'employee'], name='org_report_date_emp_idx'),
+        ]
         verbose_name = "Daily Report"
         verbose_name_plural = "Daily Reports"
     
     def __str__(self):
         return f"{self.employee.full_name} - {self.report_date}"
 
+    # Persisted values save() compares against to keep ReportRollup in sync
+    _TRACKED_FIELDS = ("employee_id", "report_date", "sales", "today_hiring", "total_hiring")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = {
+            attname: instance.__dict__[attname] for attname in cls._TRACKED_FIELDS if attname in instance.__dict__
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        before = {} if is_new else getattr(self, "_loaded_state", {})
+
+        after = {}
+        for attname in self._TRACKED_FIELDS:
+            name = attname.removesuffix("_id")
+            skipped = update_fields is not None and name not in update_fields and attname not in update_fields
+            after[attname] = before[attname] if skipped and attname in before else getattr(self, attname)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            ReportRollup.track_change(None if is_new else {**after, **before}, after)
+
+        self._loaded_state = after
+
+    # What the report form fills in (everything except the key and timestamps)
+    SUBMITTED_FIELDS = (
+        "tasks_completed", "challenges", "next_day_plan", "joining_date", "today_hiring", "total_hiring", "sales",
+    )
+
+    @classmethod
+    def submit(cls, employee: Employee, report_date, values: dict) -> tuple[DailyReport, bool]:
+        """
+        Create or update `employee`'s report for `report_date` from `values`
+        (SUBMITTED_FIELDS); returns (report, created). get_or_create() under
+        SELECT ... FOR UPDATE: when two submissions race for the day's first
+        report, one INSERT wins and the other hits the unique constraint and
+        reads (and locks) the winner's row, then updates it. Either way save()
+        runs, so the report is counted once in the rollups.
+        """
+        with transaction.atomic():
+            report, created = cls.objects.select_for_update().get_or_create(
+                employee=employee, report_date=report_date, defaults=values
+            )
+            if not created:
+                for name, value in values.items():
+                    setattr(report, name, value)
+                report.save()
+        return report, created
+
+    # Nothing filled in, as opening the report form used to create
+    EMPTY_PLACEHOLDER = models.Q(
+        tasks_completed="", challenges="", next_day_plan="",
+        joining_date=None, today_hiring=0, total_hiring=0, sales=0,
+    )
+
+    @classmethod
+    def empty_placeholders(cls):
+        """Reports with nothing filled in, as opening the report form used to create"""
+        return cls.objects.filter(cls.EMPTY_PLACEHOLDER)
+
+    @classmethod
+    def for_team(cls, manager: Employee, start=None, end=None):
+        """
+        Reports by everyone below `manager` (not their own), optionally limited
+        to report dates in [start, end]. Joins the closure table rather than
+        passing the subtree's ids, so it is one query for any team size.
+        """
+        reports = cls.objects.filter(
+            employee__ancestor_links__ancestor_id=manager.id, employee__ancestor_links__depth__gt=0
+        )
+        if start is not None:
+            reports = reports.filter(report_date__gte=start)
+        if end is not None:
+            reports = reports.filter(report_date__lte=end)
+        return reports
+
+
+class DailyReportSearchEntry(models.Model):
+    """
+    A row of the SQLite full-text index of daily reports (org_dailyreport_fts,
+    an FTS5 table keyed by the report id). Created and kept in sync by the
+    database (see report_search); this model only lets search queries join it.
+    """
+    report = models.OneToOneField(
+        DailyReport,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        related_name="search_entry",
+    )
+
+    class Meta:
+        managed = False
+        db_table = "org_dailyreport_fts"
+
+
+class ReportRollup(models.Model):
+    """
+    DailyReport figures summed per employee for each day, week (from Monday)
+    and month. Scope "own" covers the employee's own reports, "team" everyone
+    below them (as DailyReport.for_team), so a manager's team total for a
+    period is one row. Maintained incrementally by DailyReport.save(),
+    Employee.save() (when a subtree moves) and the pre_delete signals;
+    rebuild with `python manage.py rebuild_report_rollups`.
+    """
+
+    class Scope(models.TextChoices):
+        OWN = "own", "Own reports"
+        TEAM = "team", "Team"
+
+    class Period(models.TextChoices):
+        DAY = "day", "Day"
+        WEEK = "week", "Week"
+        MONTH = "month", "Month"
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="report_rollups")
+    scope = models.CharField(max_length=4, choices=Scope.choices)
+    period = models.CharField(max_length=5, choices=Period.choices)
+    period_start = models.DateField()
+    report_count = models.PositiveIntegerField(default=0)
+    sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    today_hiring = models.IntegerField(default=0)
+    total_hiring = models.IntegerField(default=0)
+
+    # Summed fields; figure tuples below hold them in this order
+    FIGURES = ("report_count", "sales", "today_hiring", "total_hiring")
+
+    class Meta:
+        unique_together = [["employee", "scope", "period", "period_start"]]
+
+    def __str__(self):
+        return f"{self.employee_id} / {self.scope} / {self.period} {self.period_start}"
+
+    @classmethod
+    def period_starts(cls, day) -> dict[str, date]:
+        """First day of the day, week and month containing `day`"""
+        day = models.DateField().to_python(day)
+        return {
+            cls.Period.DAY: day,
+            cls.Period.WEEK: day - timedelta(days=day.weekday()),
+            cls.Period.MONTH: day.replace(day=1),
+        }
+
+    @classmethod
+    def totals(cls, employee: Employee, period: str, day, scope: str = Scope.TEAM) -> ReportRollup:
+        """The rollup for the period containing `day` (all zeros if nothing was reported), by unique key"""
+        key = {"employee": employee, "scope": scope, "period": period, "period_start": cls.period_starts(day)[period]}
+        try:
+            return cls.objects.get(**key)
+        except cls.DoesNotExist:
+            return cls(**key, sales=Decimal("0.00"))
+
+    @staticmethod
+    def _figures(state: dict) -> tuple:
+        return (1, Decimal(str(state["sales"] or 0)), int(state["today_hiring"] or 0), int(state["total_hiring"] or 0))
+
+    @classmethod
+    def track_change(cls, before: dict | None, after: dict | None) -> None:
+        """
+        Move one report's figures between rollups. `before`/`after` are its
+        DailyReport._TRACKED_FIELDS values before and after the change; None
+        means the report did not exist.
+        """
+        def key(state):
+            return (state["employee_id"], models.DateField().to_python(state["report_date"])) if state else None
+
+        old, new = key(before), key(after)
+        if old == new:
+            delta = tuple(a - b for a, b in zip(cls._figures(after), cls._figures(before)))
+            if any(delta):
+                cls._add_report(*new, delta)
+            return
+        if old:
+            cls._add_report(*old, tuple(-figure for figure in cls._figures(before)))
+        if new:
+            cls._add_report(*new, cls._figures(after))
+
+    @classmethod
+    def _add_report(cls, employee_id: int, day: date, figures: tuple) -> None:
+        team_ids = EmployeeClosure.ancestor_ids(employee_id) - {employee_id}
+        cls._shift(
+            {cls.Scope.OWN: {employee_id}, cls.Scope.TEAM: team_ids},
+            {bucket: figures for bucket in cls.period_starts(day).items()},
+        )
+
+    @classmethod
+    def _shift(cls, owners: dict[str, set[int]], buckets: dict[tuple[str, date], tuple]) -> None:
+        """
+        Add figure deltas to rollups. `buckets` maps (period, period_start) to
+        a delta, `owners` maps a scope to the employees whose rollups take it.
+        Rows an increase needs are created in one INSERT; then one UPDATE per
+        distinct delta (a single report's change is a single UPDATE). Cached
+        leaderboards of the team owners are dropped on commit.
+        """
+        owners = {scope: ids for scope, ids in owners.items() if ids}
+        if not owners or not buckets:
+            return
+        cls.objects.bulk_create(
+            [
+                cls(employee_id=employee_id, scope=scope, period=period, period_start=period_start)
+                for (period, period_start), figures in buckets.items()
+                if any(figure > 0 for figure in figures)
+                for scope, ids in owners.items()
+                for employee_id in ids
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+        by_delta: dict[tuple, models.Q] = {}
+        for (period, period_start), figures in buckets.items():
+            in_bucket = models.Q(period=period, period_start=period_start)
+            by_delta[figures] = by_delta[figures] | in_bucket if figures in by_delta else in_bucket
+        owned = models.Q()
+        for scope, ids in owners.items():
+            owned |= models.Q(scope=scope, employee_id__in=ids)
+        for figures, in_buckets in by_delta.items():
+            cls.objects.filter(owned, in_buckets).update(
+                **{name: models.F(name) + figure for name, figure in zip(cls.FIGURES, figures) if figure}
+            )
+
+        if cls.Scope.TEAM in owners:
+            from .report_leaderboard import invalidate_leaderboards
+
+            manager_ids, changed = owners[cls.Scope.TEAM], list(buckets)
+            transaction.on_commit(lambda: invalidate_leaderboards(manager_ids, changed))
+
+    @classmethod
+    def _subtree_buckets(cls, employee_id: int, include_root: bool = True) -> dict[tuple[str, date], tuple]:
+        """Figures of every report in `employee_id`'s subtree summed per (period, period_start), one GROUP BY"""
+        links = {"employee__ancestor_links__ancestor_id": employee_id}
+        if not include_root:
+            links["employee__ancestor_links__depth__gt"] = 0
+        rows = (
+            DailyReport.objects.filter(**links)
+            .values("report_date")
+            .annotate(
+                report_count=models.Count("id"),
+                sales=models.Sum("sales"),
+                today_hiring=models.Sum("today_hiring"),
+                total_hiring=models.Sum("total_hiring"),
+            )
+            .order_by()
+        )
+        buckets: dict[tuple[str, date], tuple] = {}
+        for row in rows:
+            figures = tuple(row[name] for name in cls.FIGURES)
+            for bucket in cls.period_starts(row["report_date"]).items():
+                totals = buckets.get(bucket, (0, Decimal(0), 0, 0))
+                buckets[bucket] = tuple(a + b for a, b in zip(totals, figures))
+        return buckets
+
+    @classmethod
+    def move_subtree(cls, employee: Employee, old_ancestor_ids: set[int]) -> None:
+        """
+        Called after `employee` moved to another reporting manager (closure
+        already updated): the subtree's figures, their own reports included,
+        leave the team rollups of the old line and join the new one.
+        """
+        new_ancestor_ids = EmployeeClosure.ancestor_ids(employee.id)
+        left = old_ancestor_ids - new_ancestor_ids
+        joined = new_ancestor_ids - old_ancestor_ids
+        if not left and not joined:
+            return
+        buckets = cls._subtree_buckets(employee.id)
+        cls._shift(
+            {cls.Scope.TEAM: left},
+            {bucket: tuple(-figure for figure in figures) for bucket, figures in buckets.items()},
+        )
+        cls._shift({cls.Scope.TEAM: joined}, buckets)
+
+    @classmethod
+    def detach_subtree(cls, employee: Employee) -> None:
+        """
+        Called before `employee` is deleted: their reports become top-level,
+        so the figures below them leave everyone above. (The employee's own
+        reports are deleted with them and subtracted one by one.)
+        """
+        above = EmployeeClosure.ancestor_ids(employee.id) - {employee.id}
+        if above:
+            buckets = cls._subtree_buckets(employee.id, include_root=False)
+            cls._shift(
+                {cls.Scope.TEAM: above},
+                {bucket: tuple(-figure for figure in figures) for bucket, figures in buckets.items()},
+            )
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """Recompute every rollup from DailyReport, one GROUP BY per scope and period. Returns rows written."""
+        starts = {
+            cls.Period.DAY: models.F("report_date"),
+            cls.Period.WEEK: TruncWeek("report_date"),
+            cls.Period.MONTH: TruncMonth("report_date"),
+        }
+        owners = {
+            cls.Scope.OWN: (DailyReport.objects.all(), "employee_id"),
+            cls.Scope.TEAM: (
+                DailyReport.objects.filter(employee__ancestor_links__depth__gt=0),
+                "employee__ancestor_links__ancestor_id",
+            ),
+        }
+        written = 0
+        with transaction.atomic():
+            cls.objects.all().delete()
+            for scope, (reports, owner) in owners.items():
+                for period, start in starts.items():
+                    rows = (
+                        reports.annotate(owner=models.F(owner), start=start)
+                        .values("owner", "start")
+                        .annotate(
+                            report_count=models.Count("id"),
+                            sales=models.Sum("sales"),
+                            today_hiring=models.Sum("today_hiring"),
+                            total_hiring=models.Sum("total_hiring"),
+                        )
+                        .order_by()
+                    )
+                    created = cls.objects.bulk_create(
+                        [
+                            cls(
+                                employee_id=row["owner"], scope=scope, period=period, period_start=row["start"],
+                                **{name: row[name] for name in cls.FIGURES},
+                            )
+                            for row in rows.iterator(chunk_size=2000)
+                        ],
+                        batch_size=1000,
+                    )
+                    written += len(created)
+        return written
+
+
+# Rendered offer letter PDFs live under PDF_STORAGE_DIR named by their SHA-256
+PDF_STORAGE_DIR = 'offer_letters'
+CONTENT_ADDRESSED_NAME = re.compile(rf'{PDF_STORAGE_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{64}}\.pdf')
+
 
 class OfferLetter(models.Model):
     """Offer letters with approval workflow"""
@@ -283,8 +1185,18 @@ class OfferLetter(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     rejection_reason = models.TextField(blank=True)
     
-    # PDF storage
-    pdf_file = models.FileField(upload_to='offer_letters/')
+    # PDF storage (rendered in the background by `manage.py run_offer_letter_worker`)
+    RENDER_STATUS_CHOICES = [
+        ('rendering', 'Rendering'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    pdf_file = models.FileField(upload_to=f'{PDF_STORAGE_DIR}/', blank=True)
+    render_status = models.CharField(max_length=20, choices=RENDER_STATUS_CHOICES, default='rendering')
+    render_attempts = models.PositiveIntegerField(default=0)
+    render_error = models.TextField(blank=True)
+    render_after = models.DateTimeField(null=True, blank=True)
+    render_claimed_at = models.DateTimeField(null=True, blank=True)
     
     # Unique token for candidate download (no login required)
     download_token = models.CharField(max_length=64, unique=True)
@@ -296,6 +1208,269 @@ class OfferLetter(models.Model):
         ordering = ['-created_at']
         verbose_name = "Offer Letter"
         verbose_name_plural = "Offer Letters"
+        indexes = [
+            # HR dashboard tabs: filter by status, newest first, paged by (created_at, id)
+            models.Index(fields=['status', 'created_at', 'id'], name='org_offer_status_created_idx'),
+            models.Index(fields=['created_at', 'id'], name='org_offer_created_idx'),
+            # "My offer letters": one creator's letters, newest first
+            models.Index(fields=['created_by', 'created_at'], name='org_offer_creator_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.candidate_name} - {self.designation_display} ({self.status})"
+
+    @property
+    def is_pdf_ready(self) -> bool:
+        return self.render_status == 'ready'
+
+    def pdf_data(self) -> dict[str, str]:
+        """Fields for generate_offer_letter_pdf(); stored values are already formatted"""
+        return {
+            'reference_number': self.reference_number,
+            'offer_date': self.offer_date,
+            'candidate_name': self.candidate_name,
+            'designation': self.designation,
+            'designation_display': self.designation_display,
+            'department': self.department,
+            'joining_date': self.joining_date,
+            'annual_salary': self.annual_salary,
+            'salary_in_words': self.salary_in_words,
+            'team_details': self.team_details,
+        }
+
+    @classmethod
+    def from_form_data(cls, cleaned_data: dict, created_by: Employee) -> OfferLetter:
+        """Unsaved letter from OfferLetterForm data; values are stored formatted for the PDF"""
+        import secrets
+
+        designation = cleaned_data['designation']
+        return cls(
+            created_by=created_by,
+            candidate_name=cleaned_data['candidate_name'],
+            candidate_email=cleaned_data.get('candidate_email', ''),
+            designation=designation,
+            designation_display=dict(Employee.Role.choices).get(designation, designation),
+            department=cleaned_data['department'],
+            annual_salary=f"{cleaned_data['annual_salary']:,.2f}",
+            salary_in_words=cleaned_data['salary_in_words'],
+            joining_date=cleaned_data['joining_date'].strftime('%B %Y'),
+            offer_date=cleaned_data['offer_date'].strftime('%d-%m-%Y'),
+            reference_number=cleaned_data['reference_number'],
+            team_details=cleaned_data.get('team_details', ''),
+            download_token=secrets.token_urlsafe(32),
+            status='pending',
+            render_status='rendering',
+        )
+
+    @classmethod
+    def status_counts(cls) -> dict[str, int]:
+        """{status: number of letters} for every status, in one GROUP BY query"""
+        counts = dict.fromkeys(dict(cls.STATUS_CHOICES), 0)
+        counts.update(cls.objects.values_list('status').annotate(count=models.Count('id')).order_by())
+        return counts
+
+    @classmethod
+    def taken_reference_numbers(cls, reference_numbers) -> set[str]:
+        """The given reference numbers that are already in use, in one query"""
+        return set(
+            cls.objects.filter(reference_number__in=set(reference_numbers)).values_list('reference_number', flat=True)
+        )
+
+    @classmethod
+    def render_pdfs(cls, letters, pool):
+        """
+        Render `letters` across `pool` (see offer_letter_pdf.render_pool) and
+        record each result. Yields every letter as it finishes, with
+        render_status updated and render_error set if it failed; letters
+        whose claim another worker took over meanwhile are left to that
+        worker and not yielded.
+
+        If a render process dies, the pool is unusable: the letters not
+        finished yet are released without counting an attempt and
+        BrokenProcessPool is raised, so the caller can start a new pool.
+        """
+        from concurrent.futures import as_completed
+        from concurrent.futures.process import BrokenProcessPool
+
+        from .offer_letter_pdf import generate_offer_letter_pdf
+
+        unfinished = {letter.pk: letter for letter in letters}
+        try:
+            futures = {pool.submit(generate_offer_letter_pdf, letter.pdf_data()): letter for letter in letters}
+            for future in as_completed(futures):
+                letter = futures[future]
+                try:
+                    pdf_content = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    recorded = letter.mark_render_failed(f"{type(e).__name__}: {e}")
+                else:
+                    recorded = letter.mark_rendered(pdf_content)
+                del unfinished[letter.pk]
+                if recorded:
+                    yield letter
+        except BrokenProcessPool:
+            cls.release_render_claims(unfinished.values())
+            raise
+
+    @classmethod
+    def release_render_claims(cls, letters) -> None:
+        """Put claimed letters back in the queue as they were, without counting an attempt"""
+        for letter in letters:
+            cls.objects.filter(pk=letter.pk, render_claimed_at=letter.render_claimed_at).update(render_claimed_at=None)
+
+    @classmethod
+    def claim_render_jobs(cls, limit: int) -> list[OfferLetter]:
+        """
+        Claim up to `limit` letters waiting to be rendered. A claim is a
+        conditional UPDATE on render_claimed_at, so concurrent workers never
+        take the same letter; claims older than OFFER_LETTER_RENDER_TIMEOUT
+        (a crashed worker) are picked up again.
+        """
+        now = timezone.now()
+        stale = now - timedelta(seconds=settings.OFFER_LETTER_RENDER_TIMEOUT)
+        candidates = (
+            cls.objects.filter(render_status='rendering')
+            .filter(models.Q(render_after__isnull=True) | models.Q(render_after__lte=now))
+            .filter(models.Q(render_claimed_at__isnull=True) | models.Q(render_claimed_at__lt=stale))
+            .order_by('created_at')
+            .values_list('pk', 'render_claimed_at')[:limit]
+        )
+
+        claimed_ids = []
+        for pk, claimed_at in candidates:
+            if cls.objects.filter(pk=pk, render_claimed_at=claimed_at).update(render_claimed_at=now):
+                claimed_ids.append(pk)
+        return list(cls.objects.filter(pk__in=claimed_ids).order_by('created_at'))
+
+    @staticmethod
+    def pdf_storage_name(pdf_content: bytes) -> str:
+        """Content-addressed name: identical PDFs share one file"""
+        digest = hashlib.sha256(pdf_content).hexdigest()
+        return f"{PDF_STORAGE_DIR}/{digest[:2]}/{digest}.pdf"
+
+    @classmethod
+    def store_pdf(cls, pdf_content: bytes) -> str:
+        """Write pdf_content to storage unless an identical file is already there; returns its name"""
+        from django.core.files.base import ContentFile
+
+        storage = cls._meta.get_field('pdf_file').storage
+        name = cls.pdf_storage_name(pdf_content)
+        if storage.exists(name):
+            # Reusing an old orphan: make it young again so collect_orphaned_pdfs()
+            # leaves it alone until the letter referencing it is saved.
+            cls._touch_pdf(storage, name, pdf_content)
+            return name
+        # If another process wrote the same content meanwhile, storage picks a
+        # free name; the duplicate is harmless and rehash_pdfs() folds it back.
+        return storage.save(name, ContentFile(pdf_content))
+
+    @staticmethod
+    def _touch_pdf(storage, name: str, pdf_content: bytes) -> None:
+        try:
+            path = storage.path(name)
+        except NotImplementedError:
+            # Remote storage has no local path; rewriting refreshes its modified time
+            with storage.open(name, 'wb') as f:
+                f.write(pdf_content)
+        else:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+
+    def _record_render(self, **values) -> bool:
+        """
+        Save a render outcome, unless the claim this letter was rendered under
+        went stale and another worker has claimed it since. Returns whether
+        it was saved.
+        """
+        values['updated_at'] = timezone.now()
+        recorded = OfferLetter.objects.filter(pk=self.pk, render_claimed_at=self.render_claimed_at).update(**values)
+        if recorded:
+            for field, value in values.items():
+                setattr(self, field, value)
+        return bool(recorded)
+
+    def mark_rendered(self, pdf_content: bytes) -> bool:
+        name = self.store_pdf(pdf_content)
+        if not self._record_render(
+            pdf_file=name,
+            render_status='ready',
+            render_attempts=self.render_attempts + 1,
+            render_error='',
+            render_claimed_at=None,
+        ):
+            return False
+        # collect_orphaned_pdfs() may have removed a reused file just before it
+        # was referenced; now that it is, put it back.
+        storage = self.pdf_file.storage
+        if not storage.exists(name):
+            from django.core.files.base import ContentFile
+
+            storage.save(name, ContentFile(pdf_content))
+        return True
+
+    def mark_render_failed(self, error: str) -> bool:
+        """Schedule a retry with exponential backoff, or give up after OFFER_LETTER_RENDER_MAX_ATTEMPTS"""
+        attempts = self.render_attempts + 1
+        values = {'render_attempts': attempts, 'render_error': error, 'render_claimed_at': None}
+        if attempts >= settings.OFFER_LETTER_RENDER_MAX_ATTEMPTS:
+            values['render_status'] = 'failed'
+        else:
+            delay = settings.OFFER_LETTER_RENDER_RETRY_DELAY * 2 ** (attempts - 1)
+            values['render_after'] = timezone.now() + timedelta(seconds=delay)
+        return self._record_render(**values)
+
+    @classmethod
+    def rehash_pdfs(cls) -> int:
+        """
+        Move PDFs stored under any other name (letters rendered before storage
+        was content-addressed) to their content-addressed name. The old files
+        are left for collect_orphaned_pdfs(). Returns the number of letters moved.
+        """
+        storage = cls._meta.get_field('pdf_file').storage
+        moved = 0
+        letters = cls.objects.exclude(pdf_file='').only('pk', 'pdf_file')
+        for letter in letters.iterator():
+            if CONTENT_ADDRESSED_NAME.fullmatch(letter.pdf_file.name) or not storage.exists(letter.pdf_file.name):
+                continue
+            with storage.open(letter.pdf_file.name, 'rb') as f:
+                name = cls.store_pdf(f.read())
+            cls.objects.filter(pk=letter.pk).update(pdf_file=name)
+            moved += 1
+        return moved
+
+    @classmethod
+    def collect_orphaned_pdfs(cls, min_age: timedelta, delete: bool = True) -> list[str]:
+        """
+        Remove stored PDFs that no offer letter references any more. Files
+        younger than `min_age` are kept: a worker may have stored (or reused)
+        one without having saved the letter yet. Each candidate's age and
+        references are checked again right before it is deleted, since the
+        walk can take a while. Returns the orphaned names.
+        """
+        storage = cls._meta.get_field('pdf_file').storage
+        referenced = set(cls.objects.exclude(pdf_file='').values_list('pdf_file', flat=True).iterator())
+        cutoff = timezone.now() - min_age
+
+        orphans = []
+        pending_dirs = [PDF_STORAGE_DIR]
+        while pending_dirs:
+            directory = pending_dirs.pop()
+            try:
+                subdirs, files = storage.listdir(directory)
+            except FileNotFoundError:
+                continue
+            pending_dirs.extend(f"{directory}/{subdir}" for subdir in subdirs)
+            for filename in files:
+                name = f"{directory}/{filename}"
+                if name in referenced or storage.get_modified_time(name) > cutoff:
+                    continue
+                if delete:
+                    if storage.get_modified_time(name) > cutoff or cls.objects.filter(pdf_file=name).exists():
+                        continue
+                    storage.delete(name)
+                orphans.append(name)
+        return orphans
@@ -0,0 +1,153 @@
+"""
+Approving and rejecting offer letters, one or many at a time.
+
+A batch runs in one transaction: the letters are row-locked, hiring limits
+for every manager involved are read (and locked) in one query, employee IDs
+are reserved as a block, and the new User/Employee rows are inserted with
+bulk_create. Letters that can't be approved (already decided, over the
+manager's hiring limit) are reported and left pending; they don't stop the
+rest of the batch.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Employee, EmployeeIdSequence, ManagerHeadcount, OfferLetter
+
+
+@dataclass
+class OfferLetterActionResult:
+    """Outcome for one letter of a batch; `employee_id` is set when an employee was created"""
+
+    letter_id: int
+    candidate_name: str
+    reference_number: str
+    ok: bool
+    message: str
+    employee_id: str = ""
+
+
+def _locked_letters(letter_ids) -> tuple[list[int], dict[int, OfferLetter]]:
+    letter_ids = list(dict.fromkeys(int(letter_id) for letter_id in letter_ids))
+    return letter_ids, OfferLetter.objects.select_for_update().in_bulk(letter_ids)
+
+
+def _undecided(letter_id: int, letter: OfferLetter | None) -> OfferLetterActionResult | None:
+    """A failed result for letters that are missing or no longer pending, else None"""
+    if letter is None:
+        return OfferLetterActionResult(letter_id, "", "", False, "Offer letter not found.")
+    if letter.status != 'pending':
+        return OfferLetterActionResult(
+            letter.pk, letter.candidate_name, letter.reference_number, False,
+            f"Already {letter.get_status_display().lower()}.",
+        )
+    return None
+
+
+def approve_offer_letters(letter_ids, approved_by: Employee) -> list[OfferLetterActionResult]:
+    """
+    Approve the given letters and create an employee for each candidate,
+    reporting to the letter's creator. Results come back in `letter_ids` order.
+    """
+    with transaction.atomic():
+        letter_ids, letters = _locked_letters(letter_ids)
+        creators = Employee.objects.in_bulk({letter.created_by_id for letter in letters.values()})
+
+        # Current headcount for every (manager, role) a letter would add to, locked
+        limited = set()
+        for letter in letters.values():
+            creator = creators[letter.created_by_id]
+            if letter.status == 'pending' and letter.designation in creator.get_hiring_limits():
+                limited.add((creator.id, letter.designation))
+        counts = ManagerHeadcount.lock_many(limited)
+
+        results: dict[int, OfferLetterActionResult] = {}
+        to_approve: list[OfferLetter] = []
+        for letter_id in letter_ids:
+            letter = letters.get(letter_id)
+            result = _undecided(letter_id, letter)
+            if result is None:
+                key = (letter.created_by_id, letter.designation)
+                can_hire, error_msg = creators[letter.created_by_id].can_hire_role(
+                    letter.designation, current_count=counts.get(key, 0)
+                )
+                if can_hire:
+                    if key in counts:
+                        counts[key] += 1
+                    to_approve.append(letter)
+                    continue
+                result = OfferLetterActionResult(
+                    letter.pk, letter.candidate_name, letter.reference_number, False, error_msg
+                )
+            results[letter_id] = result
+
+        if to_approve:
+            employee_ids = EmployeeIdSequence.reserve(len(to_approve))
+            password = Employee.default_password_hash()
+            users = []
+            for employee_id, letter in zip(employee_ids, to_approve):
+                name_parts = letter.candidate_name.split()
+                users.append(User(
+                    username=employee_id,
+                    password=password,
+                    email=letter.candidate_email,
+                    first_name=name_parts[0] if name_parts else "",
+                    last_name=" ".join(name_parts[1:]),
+                ))
+            users = User.objects.bulk_create(users)
+
+            Employee.bulk_create_new([
+                Employee(
+                    user=user,
+                    full_name=letter.candidate_name,
+                    role=letter.designation,
+                    reporting_manager_id=letter.created_by_id,
+                )
+                for user, letter in zip(users, to_approve)
+            ])
+
+            now = timezone.now()
+            for letter in to_approve:
+                letter.status = 'approved'
+                letter.approved_by = approved_by
+                letter.approved_at = now
+                letter.updated_at = now
+            OfferLetter.objects.bulk_update(to_approve, ['status', 'approved_by', 'approved_at', 'updated_at'])
+
+            for employee_id, letter in zip(employee_ids, to_approve):
+                creator = creators[letter.created_by_id]
+                results[letter.pk] = OfferLetterActionResult(
+                    letter.pk, letter.candidate_name, letter.reference_number, True,
+                    f"Approved; employee ID {employee_id} added under {creator.full_name}.",
+                    employee_id=employee_id,
+                )
+
+    return [results[letter_id] for letter_id in letter_ids]
+
+
+def reject_offer_letters(letter_ids, rejection_reason: str) -> list[OfferLetterActionResult]:
+    """Reject the given pending letters with one UPDATE. Results come back in `letter_ids` order."""
+    with transaction.atomic():
+        letter_ids, letters = _locked_letters(letter_ids)
+
+        results: dict[int, OfferLetterActionResult] = {}
+        to_reject = []
+        for letter_id in letter_ids:
+            letter = letters.get(letter_id)
+            result = _undecided(letter_id, letter)
+            if result is None:
+                to_reject.append(letter_id)
+                result = OfferLetterActionResult(
+                    letter.pk, letter.candidate_name, letter.reference_number, True, "Rejected."
+                )
+            results[letter_id] = result
+
+        OfferLetter.objects.filter(pk__in=to_reject).update(
+            status='rejected', rejection_reason=rejection_reason, updated_at=timezone.now()
+        )
+
+    return [results[letter_id] for letter_id in letter_ids]
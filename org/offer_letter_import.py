@@ -0,0 +1,151 @@
+"""
+Bulk offer letters from a CSV of candidates.
+
+Every row is validated with the same field rules as OfferLetterForm before
+anything is written, and reference numbers are checked for duplicates within
+the file and against the database in a single query. A valid file becomes
+OfferLetter rows in one bulk_create; PDFs are rendered either by the caller
+(OfferLetter.render_pdfs) or by the background worker.
+"""
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .forms import BulkOfferLetterRowForm
+from .models import Employee, OfferLetter
+
+CSV_COLUMNS = [
+    "reference_number",
+    "offer_date",
+    "candidate_name",
+    "candidate_email",
+    "designation",
+    "department",
+    "joining_date",
+    "annual_salary",
+    "salary_in_words",
+    "team_details",
+]
+OPTIONAL_COLUMNS = {"team_details"}
+
+# Upper bound for one upload; larger drives can be split across files
+MAX_ROWS = 1000
+
+SAMPLE_ROW = {
+    "reference_number": "EOM/HR/DP/095/25/711",
+    "offer_date": "2026-01-05",
+    "candidate_name": "Priya Sharma",
+    "candidate_email": "priya.sharma@example.com",
+    "designation": "Relationship Manager",
+    "department": "Sales",
+    "joining_date": "2026-01-15",
+    "annual_salary": "600000",
+    "salary_in_words": "Six Lakh",
+    "team_details": "",
+}
+
+
+@dataclass
+class OfferLetterRow:
+    """One CSV data row; `line` is the 1-based line number in the file"""
+
+    line: int
+    data: dict[str, str]
+    cleaned_data: dict | None = None
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+
+def write_csv_template(stream) -> None:
+    """Header plus one example row, for people preparing an upload"""
+    writer = csv.DictWriter(stream, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    writer.writerow(SAMPLE_ROW)
+
+
+def read_offer_letter_csv(stream) -> list[OfferLetterRow]:
+    """
+    Parse and validate every row of a CSV text stream. Problems with the file
+    as a whole (missing columns, no rows, too many rows) raise ValidationError;
+    problems with individual rows are collected on each OfferLetterRow.
+    """
+    reader = csv.DictReader(stream)
+    header = [name.strip() for name in reader.fieldnames or []]
+    missing = [name for name in CSV_COLUMNS if name not in header and name not in OPTIONAL_COLUMNS]
+    if missing:
+        raise ValidationError(f"Missing column(s): {', '.join(missing)}. Expected: {', '.join(CSV_COLUMNS)}.")
+    reader.fieldnames = header
+
+    # Accept the role value (RELATIONSHIP_MANAGER) or its label (Relationship Manager)
+    designations = Employee.role_lookup()
+    rows = []
+    for record in reader:
+        if not any((value or "").strip() for value in record.values()):
+            continue  # blank line
+        if len(rows) >= MAX_ROWS:
+            raise ValidationError(f"Too many rows; upload at most {MAX_ROWS} candidates per file.")
+
+        data = {name: (record.get(name) or "").strip() for name in CSV_COLUMNS}
+        data["designation"] = designations.get(data["designation"].lower(), data["designation"])
+        row = OfferLetterRow(line=reader.line_num, data=data)
+
+        form = BulkOfferLetterRowForm(data)
+        if form.is_valid():
+            row.cleaned_data = form.cleaned_data
+        else:
+            for name, errors in form.errors.items():
+                label = form.fields[name].label if name in form.fields else ""
+                row.errors.extend(f"{label}: {error}" if label else error for error in errors)
+        rows.append(row)
+
+    if not rows:
+        raise ValidationError("The file has no candidate rows.")
+
+    # Reference numbers must be unique within the file and not yet used
+    first_line = {}
+    for row in rows:
+        reference_number = row.data["reference_number"]
+        if not reference_number:
+            continue
+        if reference_number in first_line:
+            row.errors.append(f"Reference number {reference_number} is repeated (first used on line {first_line[reference_number]}).")
+        else:
+            first_line[reference_number] = row.line
+
+    taken = OfferLetter.taken_reference_numbers(first_line)
+    for row in rows:
+        if row.data["reference_number"] in taken:
+            row.errors.append(f"Reference number {row.data['reference_number']} is already in use.")
+
+    return rows
+
+
+def create_offer_letters(rows: list[OfferLetterRow], created_by: Employee, claim: bool = False) -> list[OfferLetter]:
+    """
+    Create a letter for every row in one bulk_create. With claim=True the
+    letters are marked as claimed so the background worker leaves them to the
+    caller to render (until OFFER_LETTER_RENDER_TIMEOUT passes).
+    """
+    if any(not row.is_valid for row in rows):
+        raise ValueError("create_offer_letters() needs rows that all passed validation")
+
+    letters = [OfferLetter.from_form_data(row.cleaned_data, created_by) for row in rows]
+    if claim:
+        now = timezone.now()
+        for letter in letters:
+            letter.render_claimed_at = now
+
+    try:
+        with transaction.atomic():
+            return OfferLetter.objects.bulk_create(letters, batch_size=500)
+    except IntegrityError:
+        # Someone used one of the reference numbers since validation ran
+        raise ValidationError("Some reference numbers were used by another offer letter meanwhile; upload the file again.")
@@ -1,260 +1,241 @@
 """
 Utility module for generating appointment letter PDFs with company branding - Updated Format
+
+Only a handful of fields vary between letters, so styles, images (read and
+decoded once) and the fixed paragraphs live in a lazily built
+OfferLetterTemplate that is reused for every render (one per thread, since
+flowables hold drawing state).
+
+With OFFER_LETTER_RENDER_MODE = "overlay" the boilerplate is rendered once
+into a base PDF and each letter only draws its own fields on top of it.
 """
+import copy
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_JUSTIFY, TA_LEFT
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, Flowable
+from reportlab import rl_config
 from reportlab.lib import colors
 from django.conf import settings
 
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # overlay rendering is optional; see OfferLetterTemplate.render_overlay()
+    PdfReader = PdfWriter = None
 
-def generate_offer_letter_pdf(data):
+# Write image and page streams as binary rather than ASCII85 text. ReportLab's
+# pure-Python ASCII85 encoder (used without the optional C accelerator) was
+# most of a render's time, spent re-encoding the same images into every letter;
+# binary streams are also a fifth smaller.
+rl_config.useA85 = 0
+
+# Header, footer and signature images, relative to BASE_DIR
+TEMPLATE_FILES = ('header.png', 'foter.png', 'sign.png')
+
+
+def _cached_image(path, width, height):
     """
-    Generate appointment letter PDF from form data with company template formatting
-    
-    Args:
-        data: Dictionary containing appointment letter information
-        
-    Returns:
-        BytesIO buffer containing the PDF
+    Image flowable over the file's bytes, read once for the template. Given
+    a file-like object the flowable opens its ImageReader straight away, and
+    every render's copy of the flowable shares that reader (and the pixels
+    it decodes on first use).
     """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                            rightMargin=72, leftMargin=72,
-                            topMargin=20, bottomMargin=20)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Get base directory for images
-    base_dir = settings.BASE_DIR
-    header_path = os.path.join(base_dir, 'header.png')
-    footer_path = os.path.join(base_dir, 'foter.png')
-    sign_path = os.path.join(base_dir, 'sign.png')
-    
-    # Add header image if exists
-    if os.path.exists(header_path):
-        try:
-            header_img = Image(header_path, width=6.5*inch, height=0.6*inch)
-            elements.append(header_img)
-            elements.append(Spacer(1, 6))
-        except Exception as e:
-            print(f"Could not load header image: {e}")
-            pass
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        textColor=colors.HexColor('#000000'),
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        leading=16,
-        alignment=TA_JUSTIFY,
-        spaceAfter=12
-    )
-    
-    left_style = ParagraphStyle(
-        'LeftAlign',
-        parent=styles['Normal'],
-        fontSize=10,
-        alignment=TA_LEFT
-    )
-    
-    right_style = ParagraphStyle(
-        'RightAlign',
-        parent=styles['Normal'],
-        fontSize=10,
-        alignment=TA_RIGHT
-    )
-    
-    bold_style = ParagraphStyle(
-        'BoldStyle',
-        parent=normal_style,
-        fontName='Helvetica-Bold'
-    )
-    
-    # Reference number and date
-    ref_text = f'<b>{data["reference_number"]}</b>'
-    date_text = f'{data["offer_date"]}'
-    
-    ref_table = Table([[Paragraph(ref_text, left_style), Paragraph(date_text, right_style)]], 
-                      colWidths=[3.5*inch, 3*inch])
-    elements.append(ref_table)
-    elements.append(Spacer(1, 24))
-    
-    # Candidate name
-    elements.append(Paragraph(f'Ms. {data["candidate_name"]}', left_style))
-    elements.append(Spacer(1, 36))
-    
-    # Title - APPOINTMENT LETTER
-    elements.append(Paragraph('<b><u>APPOINTMENT LETTER</u></b>', title_style))
-    elements.append(Spacer(1, 12))
-    
-    # Greeting
-    elements.append(Paragraph(f'Dear Ms. {data["candidate_name"].split()[0]},', normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Main content paragraph
-    para1 = f'''This is with reference to your application and the subsequent discussions you had with us. We are pleased to appointment you the position of <b>{data["designation_display"]} – Department Retainer Sales & Marketing</b>, effective <b>{data["joining_date"]}</b>, on the terms and conditions mutually agreed upon during the interview process.'''
-    elements.append(Paragraph(para1, normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Salary information
-    salary_para = f'''As discussed, your annual Amount would be Rupees <b>{data["annual_salary"]}/- ({data["salary_in_words"]})</b>'''
-    elements.append(Paragraph(salary_para, normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Role & Responsibilities section
-    elements.append(Paragraph('<b><u>Role & Responsibilities:</u></b>', bold_style))
-    elements.append(Spacer(1, 6))
-    
-    role_para = '''In this role, you will be responsible for recruiting direct reportees and supporting structured team expansion through effective leadership. Over a period of time, you will be expected to manage and supervise a team strength of 40–50 members.'''
-    elements.append(Paragraph(role_para, normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Performance Expectations section
-    elements.append(Paragraph('<b><u>Performance Expectations:</u></b>', bold_style))
-    elements.append(Spacer(1, 6))
-    
-    perf_intro = 'As discussed, during the initial phase you will be expected to:'
-    elements.append(Paragraph(perf_intro, normal_style))
-    
-    # Bullet points for performance expectations
-    bullet_style = ParagraphStyle(
-        'Bullet',
-        parent=normal_style,
-        leftIndent=20,
-        bulletIndent=10
-    )
-    
-    perf_points = [
-        'Recruit a minimum of 3 candidates as per business requirements (positions will be communicated from time to time).',
-        'Close at least 1 sale within the first 2 working days of joining.',
-        'Achieve a minimum of 4 sales per month, which will remain mandatory until the team reaches its planned strength.'
-    ]
-    
-    for point in perf_points:
-        elements.append(Paragraph(f'• {point}', bullet_style))
-    
-    elements.append(Spacer(1, 12))
-    
-    # Leave/Holidays section
-    elements.append(Paragraph('<b>Leave/Holidays</b>', bold_style))
-    elements.append(Spacer(1, 6))
-    
-    leave_points = [
-        'You are entitled to no casual leave of day.',
-        'You are entitled to working days of no paid sick leave.',
-        'The Company will inform you in advance about the list of each declared holiday.'
-    ]
-    
-    for point in leave_points:
-        elements.append(Paragraph(f'• {point}', bullet_style))
-    
-    elements.append(Spacer(1, 24))
-    
-    # Department and probation paragraph
-    dept_para = '''The department concerned shall be known as Retainer Sales & Marketing and all individuals joining this department shall be bound to comply with all departmental terms and conditions. You shall be on a probationary period of six (6) months, upon completion of which, subject to your performance being found satisfactory, you may, at the sole discretion of the Company, be confirmed as an employee or a permanent employee.'''
-    elements.append(Paragraph(dept_para, normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Confidentiality paragraph
-    conf_para = '''You will be required to enter into a Confidentiality Agreement with the Company and provide accurate information to be filled in your joining form, sending along with your appointment letter.'''
-    elements.append(Paragraph(conf_para, normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Joining kit submission paragraph
-    submit_para = '''All applicable terms and conditions are detailed in the joining kit. Submission of the duly filled joining kit along with the signed appointment letter shall be mandatory, and only upon receipt of both shall the appointment be deemed to have been accepted.'''
-    elements.append(Paragraph(submit_para, normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Acceptance instructions
-    accept_para = f'''Please <b>sign</b> a duplicate copy of this letter and fill the joining form as a token of your acceptance and send the same email id <u><b>hr_vanshika@eomshopping.in</b></u> (HR Manager) back to us. The letter and joining kit will be valid for 2 days only from the day it is issued.'''
-    elements.append(Paragraph(accept_para, normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Welcome message
-    welcome_para = '''We Welcome you and look forward for your arrival in EASY ONLINE MARKETING.'''
-    elements.append(Paragraph(welcome_para, normal_style))
-    elements.append(Paragraph('Thanking You Sincerely', normal_style))
-    elements.append(Spacer(1, 12))
-    
-    # Signature section
-    left_content = [
-        [Paragraph('For <b>EASY ONLINE MARKETING</b>', left_style)],
-        [Spacer(1, 6)],
-    ]
-    
-    # Add signature stamp if exists
-    if os.path.exists(sign_path):
-        try:
-            sign_img = Image(sign_path, width=1.5*inch, height=1.5*inch)
-            left_content.append([sign_img])
-        except:
-            left_content.append([Spacer(1, 40)])
-    else:
-        left_content.append([Spacer(1, 40)])
-    
-    left_content.append([Paragraph('<b>Authorized Signatory</b>', left_style)])
-    
-    # Right side - Applicant signature
-    right_style_center = ParagraphStyle(
-        'RightCenter',
-        parent=styles['Normal'],
-        fontSize=10,
-        alignment=TA_CENTER
-    )
-    
-    right_content = [
-        [Paragraph('I accept the terms and conditions', right_style_center)],
-        [Spacer(1, 60)],
-        [Paragraph('<b>Sample</b>', right_style_center)],
-        [Paragraph('<b>Signature of Applicant</b>', right_style_center)],
-    ]
-    
-    # Create tables for left and right
-    left_table = Table(left_content, colWidths=[2.5*inch])
-    left_table.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-    ]))
-    
-    right_table = Table(right_content, colWidths=[2.5*inch])
-    right_table.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-    ]))
-    
-    # Combine left and right in one table
-    sig_table = Table([[left_table, '', right_table]], colWidths=[2.5*inch, 1*inch, 2.5*inch])
-    sig_table.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    
-    elements.append(sig_table)
-    elements.append(Spacer(1, 24))
-    
-    # Add footer image if exists
-    if os.path.exists(footer_path):
-        try:
-            footer_img = Image(footer_path, width=6.5*inch, height=0.8*inch)
-            elements.append(footer_img)
-        except:
-            # Fallback footer
+    with open(path, 'rb') as f:
+        return Image(BytesIO(f.read()), width=width, height=height)
+
+
+class _Slot(Flowable):
+    """
+    Reserves a candidate-specific flowable's space in a base PDF without
+    drawing it, and records where it landed so it can be stamped later.
+    """
+
+    def __init__(self, name, flowable, positions):
+        super().__init__()
+        self.name = name
+        self.flowable = flowable
+        self.positions = positions
+
+    def wrap(self, availWidth, availHeight):
+        self.avail = (availWidth, availHeight)
+        self.width, self.height = self.flowable.wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def getSpaceBefore(self):
+        return self.flowable.getSpaceBefore()
+
+    def getSpaceAfter(self):
+        return self.flowable.getSpaceAfter()
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self.positions[self.name] = (canvas.getPageNumber(), x, y, _sW) + self.avail
+
+
+# Slots stamped by OfferLetterTemplate.render_overlay(), in layout order
+SLOTS = ('reference', 'name', 'greeting', 'position', 'salary')
+
+# Distinct slot layouts (base PDFs) kept per template
+MAX_BASES = 16
+
+
+class OfferLetterTemplate:
+    """
+    Everything in the appointment letter that doesn't depend on the candidate:
+    styles, images and parsed paragraphs. Not thread-safe; see
+    get_offer_letter_template().
+    """
+
+    def __init__(self):
+        self.styles = styles = getSampleStyleSheet()
+        self.fingerprint = template_fingerprint()
+
+        # Base PDFs for render_overlay(), keyed by slot heights
+        self._bases = {}
+        self._slot_width = self._slot_height = None
+
+        # Get base directory for images
+        base_dir = settings.BASE_DIR
+        header_path, footer_path, sign_path = (os.path.join(base_dir, name) for name in TEMPLATE_FILES)
+
+        self.header_img = None
+        if os.path.exists(header_path):
+            try:
+                self.header_img = _cached_image(header_path, width=6.5*inch, height=0.6*inch)
+            except Exception as e:
+                print(f"Could not load header image: {e}")
+
+        self.sign_img = None
+        if os.path.exists(sign_path):
+            try:
+                self.sign_img = _cached_image(sign_path, width=1.5*inch, height=1.5*inch)
+            except Exception:
+                pass
+
+        self.footer_img = None
+        self.footer_fallback = None
+        if os.path.exists(footer_path):
+            try:
+                self.footer_img = _cached_image(footer_path, width=6.5*inch, height=0.8*inch)
+            except Exception:
+                self.footer_fallback = True
+
+        # Custom styles
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            textColor=colors.HexColor('#000000'),
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        )
+
+        self.normal_style = normal_style = ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=11,
+            leading=16,
+            alignment=TA_JUSTIFY,
+            spaceAfter=12
+        )
+
+        self.left_style = left_style = ParagraphStyle(
+            'LeftAlign',
+            parent=styles['Normal'],
+            fontSize=10,
+            alignment=TA_LEFT
+        )
+
+        self.right_style = ParagraphStyle(
+            'RightAlign',
+            parent=styles['Normal'],
+            fontSize=10,
+            alignment=TA_RIGHT
+        )
+
+        self.bold_style = bold_style = ParagraphStyle(
+            'BoldStyle',
+            parent=normal_style,
+            fontName='Helvetica-Bold'
+        )
+
+        bullet_style = ParagraphStyle(
+            'Bullet',
+            parent=normal_style,
+            leftIndent=20,
+            bulletIndent=10
+        )
+
+        right_style_center = ParagraphStyle(
+            'RightCenter',
+            parent=styles['Normal'],
+            fontSize=10,
+            alignment=TA_CENTER
+        )
+
+        # Invariant paragraphs, parsed once
+        self.title = Paragraph('<b><u>APPOINTMENT LETTER</u></b>', self.title_style)
+
+        # Role & Responsibilities section
+        self.role_heading = Paragraph('<b><u>Role & Responsibilities:</u></b>', bold_style)
+        self.role_para = Paragraph(
+            '''In this role, you will be responsible for recruiting direct reportees and supporting structured team expansion through effective leadership. Over a period of time, you will be expected to manage and supervise a team strength of 40–50 members.''',
+            normal_style,
+        )
+
+        # Performance Expectations section
+        self.perf_heading = Paragraph('<b><u>Performance Expectations:</u></b>', bold_style)
+        self.perf_intro = Paragraph('As discussed, during the initial phase you will be expected to:', normal_style)
+        self.perf_points = [
+            Paragraph(f'• {point}', bullet_style)
+            for point in [
+                'Recruit a minimum of 3 candidates as per business requirements (positions will be communicated from time to time).',
+                'Close at least 1 sale within the first 2 working days of joining.',
+                'Achieve a minimum of 4 sales per month, which will remain mandatory until the team reaches its planned strength.'
+            ]
+        ]
+
+        # Leave/Holidays section
+        self.leave_heading = Paragraph('<b>Leave/Holidays</b>', bold_style)
+        self.leave_points = [
+            Paragraph(f'• {point}', bullet_style)
+            for point in [
+                'You are entitled to no casual leave of day.',
+                'You are entitled to working days of no paid sick leave.',
+                'The Company will inform you in advance about the list of each declared holiday.'
+            ]
+        ]
+
+        # Department and probation, confidentiality, joining kit, acceptance, welcome
+        self.closing_paras = [
+            Paragraph(text, normal_style)
+            for text in [
+                '''The department concerned shall be known as Retainer Sales & Marketing and all individuals joining this department shall be bound to comply with all departmental terms and conditions. You shall be on a probationary period of six (6) months, upon completion of which, subject to your performance being found satisfactory, you may, at the sole discretion of the Company, be confirmed as an employee or a permanent employee.''',
+                '''You will be required to enter into a Confidentiality Agreement with the Company and provide accurate information to be filled in your joining form, sending along with your appointment letter.''',
+                '''All applicable terms and conditions are detailed in the joining kit. Submission of the duly filled joining kit along with the signed appointment letter shall be mandatory, and only upon receipt of both shall the appointment be deemed to have been accepted.''',
+                '''Please <b>sign</b> a duplicate copy of this letter and fill the joining form as a token of your acceptance and send the same email id <u><b>hr_vanshika@eomshopping.in</b></u> (HR Manager) back to us. The letter and joining kit will be valid for 2 days only from the day it is issued.''',
+            ]
+        ]
+        self.welcome_para = Paragraph(
+            '''We Welcome you and look forward for your arrival in EASY ONLINE MARKETING.''', normal_style
+        )
+        self.thanks_para = Paragraph('Thanking You Sincerely', normal_style)
+
+        # Signature section
+        self.sign_company = Paragraph('For <b>EASY ONLINE MARKETING</b>', left_style)
+        self.sign_authorized = Paragraph('<b>Authorized Signatory</b>', left_style)
+        self.applicant_accept = Paragraph('I accept the terms and conditions', right_style_center)
+        self.applicant_sample = Paragraph('<b>Sample</b>', right_style_center)
+        self.applicant_signature = Paragraph('<b>Signature of Applicant</b>', right_style_center)
+
+        if self.footer_fallback:
             footer_text = '''+91116926170 | info@eomshopping.in | info2@eomshopping.com<br/>
             8119, 8th Floor, Gaur City Office Mall, Sector – 4 Greater Noida West, Gautam Buddha Nagar Uttar Pradesh – 201306, India'''
             footer_style = ParagraphStyle(
@@ -264,12 +245,259 @@ def generate_offer_letter_pdf(data):
                 alignment=TA_CENTER,
                 textColor=colors.HexColor('#666666')
             )
-            elements.append(Paragraph(footer_text, footer_style))
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Get the value of the BytesIO buffer and return it
-    pdf = buffer.getvalue()
-    buffer.close()
-    return pdf
+            self.footer_fallback = Paragraph(footer_text, footer_style)
+
+    def candidate_flowables(self, data):
+        """The flowables that differ between letters, keyed by slot name (see SLOTS)"""
+        # Reference number and date
+        ref_text = f'<b>{data["reference_number"]}</b>'
+        date_text = f'{data["offer_date"]}'
+
+        ref_table = Table([[Paragraph(ref_text, self.left_style), Paragraph(date_text, self.right_style)]],
+                          colWidths=[3.5*inch, 3*inch])
+
+        # Main content paragraph
+        para1 = f'''This is with reference to your application and the subsequent discussions you had with us. We are pleased to appointment you the position of <b>{data["designation_display"]} – Department Retainer Sales & Marketing</b>, effective <b>{data["joining_date"]}</b>, on the terms and conditions mutually agreed upon during the interview process.'''
+
+        # Salary information
+        salary_para = f'''As discussed, your annual Amount would be Rupees <b>{data["annual_salary"]}/- ({data["salary_in_words"]})</b>'''
+
+        return {
+            'reference': ref_table,
+            'name': Paragraph(f'Ms. {data["candidate_name"]}', self.left_style),
+            'greeting': Paragraph(f'Dear Ms. {data["candidate_name"].split()[0]},', self.normal_style),
+            'position': Paragraph(para1, self.normal_style),
+            'salary': Paragraph(salary_para, self.normal_style),
+        }
+
+    def build_elements(self, candidate):
+        """Flowables for one letter: cached parts plus candidate_flowables()"""
+        elements = []
+
+        if self.header_img is not None:
+            elements.append(self.header_img)
+            elements.append(Spacer(1, 6))
+
+        # Reference number and date
+        elements.append(candidate['reference'])
+        elements.append(Spacer(1, 24))
+
+        # Candidate name
+        elements.append(candidate['name'])
+        elements.append(Spacer(1, 36))
+
+        # Title - APPOINTMENT LETTER
+        elements.append(self.title)
+        elements.append(Spacer(1, 12))
+
+        # Greeting
+        elements.append(candidate['greeting'])
+        elements.append(Spacer(1, 12))
+
+        # Main content paragraph
+        elements.append(candidate['position'])
+        elements.append(Spacer(1, 12))
+
+        # Salary information
+        elements.append(candidate['salary'])
+        elements.append(Spacer(1, 12))
+
+        elements.append(self.role_heading)
+        elements.append(Spacer(1, 6))
+        elements.append(self.role_para)
+        elements.append(Spacer(1, 12))
+
+        elements.append(self.perf_heading)
+        elements.append(Spacer(1, 6))
+        elements.append(self.perf_intro)
+        elements.extend(self.perf_points)
+        elements.append(Spacer(1, 12))
+
+        elements.append(self.leave_heading)
+        elements.append(Spacer(1, 6))
+        elements.extend(self.leave_points)
+        elements.append(Spacer(1, 24))
+
+        for para in self.closing_paras:
+            elements.append(para)
+            elements.append(Spacer(1, 12))
+
+        elements.append(self.welcome_para)
+        elements.append(self.thanks_para)
+        elements.append(Spacer(1, 12))
+
+        # Signature section; tables carry layout state, so they are rebuilt per letter
+        left_content = [
+            [copy.copy(self.sign_company)],
+            [Spacer(1, 6)],
+            [copy.copy(self.sign_img) if self.sign_img is not None else Spacer(1, 40)],
+            [copy.copy(self.sign_authorized)],
+        ]
+        right_content = [
+            [copy.copy(self.applicant_accept)],
+            [Spacer(1, 60)],
+            [copy.copy(self.applicant_sample)],
+            [copy.copy(self.applicant_signature)],
+        ]
+
+        # Create tables for left and right
+        left_table = Table(left_content, colWidths=[2.5*inch])
+        left_table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ]))
+
+        right_table = Table(right_content, colWidths=[2.5*inch])
+        right_table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ]))
+
+        # Combine left and right in one table
+        sig_table = Table([[left_table, '', right_table]], colWidths=[2.5*inch, 1*inch, 2.5*inch])
+        sig_table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]))
+
+        elements.append(sig_table)
+        elements.append(Spacer(1, 24))
+
+        if self.footer_img is not None:
+            elements.append(self.footer_img)
+        elif self.footer_fallback:
+            elements.append(self.footer_fallback)
+
+        return elements
+
+    def _build(self, candidate):
+        buffer = BytesIO()
+        # invariant: no timestamp or random ID, so the same letter always
+        # produces the same bytes (PDFs are stored by content hash)
+        doc = SimpleDocTemplate(buffer, pagesize=letter,
+                                rightMargin=72, leftMargin=72,
+                                topMargin=20, bottomMargin=20, invariant=1)
+        # Layout state (wrapped lines, page-break bookkeeping) is kept on the
+        # flowables themselves, so the cached ones are shallow-copied per build
+        doc.build([copy.copy(flowable) for flowable in self.build_elements(candidate)])
+        pdf = buffer.getvalue()
+        buffer.close()
+        return pdf
+
+    def render(self, data):
+        """Lay out the whole letter"""
+        return self._build(self.candidate_flowables(data))
+
+    def render_overlay(self, data):
+        """
+        Stamp the candidate's fields onto a cached base PDF holding the rest
+        of the letter. Bases are keyed by the height of every slot, so a
+        field that wraps onto another line gets its own (correctly laid out)
+        base rather than overlapping the text below it. Falls back to a full
+        layout when pypdf isn't installed or MAX_BASES layouts are cached.
+        """
+        if PdfReader is None:
+            return self.render(data)
+
+        candidate = self.candidate_flowables(data)
+        base = self._base_for(candidate)
+        if base is None:
+            return self._build(candidate)
+        base_reader, positions = base
+
+        # Draw only the slots, at the positions they occupied in the base.
+        # They were just wrapped at the frame width by _base_for().
+        overlay_buffer = BytesIO()
+        canv = Canvas(overlay_buffer, pagesize=letter)
+        page_count = max(page for page, *_ in positions.values())
+        for page_number in range(1, page_count + 1):
+            for name, (page, x, y, spare_width, *_) in positions.items():
+                if page == page_number:
+                    candidate[name].drawOn(canv, x, y, _sW=spare_width)
+            canv.showPage()
+        canv.save()
+        overlay = PdfReader(overlay_buffer)
+
+        writer = PdfWriter()
+        for index, base_page in enumerate(base_reader.pages):
+            page = writer.add_page(base_page)
+            if index < page_count:
+                page.merge_page(overlay.pages[index])
+        output = BytesIO()
+        writer.write(output)
+        return output.getvalue()
+
+    def _slot_heights(self, candidate):
+        return tuple(candidate[name].wrap(self._slot_width, self._slot_height)[1] for name in SLOTS)
+
+    def _base_for(self, candidate):
+        """(base PDF, slot positions) matching this candidate's layout, or None"""
+        if self._slot_width is not None:
+            heights = self._slot_heights(candidate)
+            if heights in self._bases:
+                return self._bases[heights]
+            if len(self._bases) >= MAX_BASES:
+                return None
+
+        positions = {}
+        base_pdf = self._build({name: _Slot(name, candidate[name], positions) for name in SLOTS})
+        # Every slot sits directly in the page frame, so they share its size
+        self._slot_width, self._slot_height = positions[SLOTS[0]][4:]
+        base = self._bases[self._slot_heights(candidate)] = (PdfReader(BytesIO(base_pdf)), positions)
+        return base
+
+
+_templates = threading.local()
+
+
+def template_fingerprint():
+    """Changes whenever one of the letter's image files is replaced"""
+    fingerprint = []
+    for filename in TEMPLATE_FILES:
+        try:
+            stat = os.stat(os.path.join(settings.BASE_DIR, filename))
+        except OSError:
+            fingerprint.append(None)
+        else:
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+def get_offer_letter_template():
+    """The calling thread's OfferLetterTemplate, rebuilt when the template files change"""
+    template = getattr(_templates, 'template', None)
+    if template is None or template.fingerprint != template_fingerprint():
+        template = _templates.template = OfferLetterTemplate()
+    return template
+
+
+def generate_offer_letter_pdf(data):
+    """
+    Generate appointment letter PDF from form data with company template formatting
+
+    Args:
+        data: Dictionary containing appointment letter information
+
+    Returns:
+        bytes of the rendered PDF
+    """
+    template = get_offer_letter_template()
+    if settings.OFFER_LETTER_RENDER_MODE == 'overlay':
+        return template.render_overlay(data)
+    return template.render(data)
+
+
+def _init_render_process():
+    import django
+    django.setup()
+
+
+def render_pool(max_workers):
+    """
+    Process pool for rendering PDFs outside the calling process. Workers are
+    spawned rather than forked so they never share the parent's DB connections.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_render_process,
+    )
@@ -0,0 +1,115 @@
+"""
+Org chart tree rendering.
+
+The tree used to be rendered through a recursive `{% include %}`, which
+re-resolves the template for every node. render_tree_html() produces the
+same markup iteratively, and the fragment is cached per root employee until
+someone in that subtree changes (see Employee.invalidate_org_tree_cache).
+Invalidation only reaches a shared cache backend; with the default
+per-process cache (one per gunicorn worker, and a separate one for every
+management command) a fragment expires after a short time instead.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import SafeString, mark_safe
+
+ORG_TREE_CACHE_TIMEOUT = 60 * 60
+# Changes made in other workers or commands never invalidate an in-process
+# cache, so there a rendered tree is only reused for this long
+LOCAL_ORG_TREE_CACHE_TIMEOUT = 30
+
+
+def org_tree_cache_key(root_id: int) -> str:
+    return f"org_tree:{root_id}:{settings.ORG_CHART_INITIAL_DEPTH}"
+
+
+def org_tree_cache_timeout() -> int:
+    if isinstance(caches["default"], LocMemCache):
+        return LOCAL_ORG_TREE_CACHE_TIMEOUT
+    return ORG_TREE_CACHE_TIMEOUT
+
+
+def get_cached_org_tree(root_id: int) -> SafeString | None:
+    html = cache.get(org_tree_cache_key(root_id))
+    return mark_safe(html) if html is not None else None
+
+
+def cache_org_tree(root_id: int, html: str) -> None:
+    cache.set(org_tree_cache_key(root_id), str(html), org_tree_cache_timeout())
+
+
+def invalidate_org_tree(root_ids) -> None:
+    cache.delete_many([org_tree_cache_key(root_id) for root_id in root_ids])
+
+
+def _capacity_badge(capacity: dict[str, Any]) -> str:
+    if capacity["total_capacity"] <= 0:
+        return ""
+    if capacity["is_empty"]:
+        return '<span class="badge bg-secondary">Empty</span>'
+    if capacity["percentage"] < 50:
+        css = "badge bg-success"
+    elif capacity["percentage"] < 100:
+        css = "badge bg-warning text-dark"
+    else:
+        css = "badge bg-danger"
+    return format_html('<span class="{}">{}</span>', css, capacity["status_text"])
+
+
+def _node_html(node: dict[str, Any]) -> str:
+    emp = node["employee"]
+    return format_html(
+        '<li>\n'
+        '  <span class="fw-semibold">{}</span>\n'
+        '  <span class="text-muted">({})</span>\n'
+        '  <span class="badge text-bg-light border badge-role">{}</span>\n'
+        '  {}\n',
+        emp.full_name,
+        emp.employee_id,
+        emp.get_role_display(),
+        mark_safe(_capacity_badge(node["hiring_capacity"])),
+    )
+
+
+def _expand_button_html(node: dict[str, Any]) -> str:
+    count = node["child_count"]
+    return format_html(
+        '  <button type="button" class="btn btn-link btn-sm p-0 ms-1 js-org-expand"\n'
+        '    data-children-url="{}">\n'
+        '    Show {} report{}\n'
+        '  </button>\n',
+        reverse("org_chart_children", args=[node["employee"].pk]),
+        count,
+        "" if count == 1 else "s",
+    )
+
+
+def render_tree_html(tree: dict[str, Any]) -> SafeString:
+    """Render a _build_tree() node and its descendants as nested <li>/<ul> markup"""
+    parts: list[str] = []
+    # Stack of nodes still to render, interleaved with closing tags
+    stack: list[dict[str, Any] | str] = [tree]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+
+        parts.append(_node_html(item))
+        if item["children"]:
+            parts.append("  <ul>\n")
+            stack.append("  </ul>\n</li>\n")
+            stack.extend(reversed(item["children"]))
+        else:
+            if item["child_count"]:
+                parts.append(_expand_button_html(item))
+            parts.append("</li>\n")
+
+    return mark_safe("".join(parts))
@@ -0,0 +1,59 @@
+"""
+Keyset ("seek") pagination for long newest-first lists.
+
+Instead of OFFSET, each page starts strictly after the (timestamp, pk) of the
+last row shown, so every page is an index range scan of the same cost no
+matter how far back the user pages, and rows inserted meanwhile don't shift
+the pages. The position travels in the URL as an opaque cursor.
+"""
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(value: datetime, pk: int) -> str:
+    return base64.urlsafe_b64encode(f"{value.isoformat()}|{pk}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    """(timestamp, pk) from a cursor; None for a missing or mangled one (first page)"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        value, pk = raw.rsplit("|", 1)
+        value = datetime.fromisoformat(value)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if settings.USE_TZ and timezone.is_naive(value):
+        # Not one of ours: encode_cursor() always writes the UTC offset
+        return None
+    return value, pk
+
+
+def keyset_page(
+    queryset: QuerySet, cursor: str | None, page_size: int = PAGE_SIZE, field: str = "created_at"
+) -> tuple[list, str | None]:
+    """
+    One page of `queryset` ordered by `field` then pk, newest first, starting
+    after `cursor`. Returns (rows, cursor for the next page or None).
+    """
+    queryset = queryset.order_by(f"-{field}", "-pk")
+    position = decode_cursor(cursor)
+    if position is not None:
+        value, pk = position
+        queryset = queryset.filter(Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk}))
+
+    rows = list(queryset[: page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    last = rows[page_size - 1]
+    return rows[:page_size], encode_cursor(getattr(last, field), last.pk)
@@ -0,0 +1,111 @@
+"""
+Daily report compliance over a date range: which of a manager's team
+submitted a report on which day.
+
+The whole subtree's submissions come from one query over DailyReport
+(employee_id, report_date), joined through the closure table, and the team
+from one more; the employees x days matrix and the per-employee / per-day
+percentages are then counted in memory, so the cost doesn't grow with the
+number of days looked at the way reloading the single-day dashboard does.
+Days before an employee joined don't count against them, and neither do
+the empty placeholder reports opening the report form used to create: a day
+with only a placeholder is a missing report.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+from .models import DailyReport, Employee
+
+# Longest range one heatmap covers (one column per day)
+MAX_DAYS = 62
+
+
+def _percent(part: int, whole: int) -> float | None:
+    return round(100 * part / whole, 1) if whole else None
+
+
+@dataclass
+class ComplianceRow:
+    """One team member's line: `cells` is True/False per day, None for days before they joined (unless they reported)"""
+
+    employee_id: int
+    username: str
+    full_name: str
+    designation: str
+    cells: list[bool | None]
+
+    @property
+    def submitted(self) -> int:
+        return sum(1 for cell in self.cells if cell)
+
+    @property
+    def expected(self) -> int:
+        return sum(1 for cell in self.cells if cell is not None)
+
+    @property
+    def percent(self) -> float | None:
+        return _percent(self.submitted, self.expected)
+
+
+@dataclass
+class ComplianceMatrix:
+    days: list[date]
+    rows: list[ComplianceRow]
+    day_submitted: list[int]
+    day_expected: list[int]
+
+    @property
+    def day_percents(self) -> list[float | None]:
+        return [_percent(submitted, expected) for submitted, expected in zip(self.day_submitted, self.day_expected)]
+
+    @property
+    def percent(self) -> float | None:
+        return _percent(sum(self.day_submitted), sum(self.day_expected))
+
+    def rows_by_compliance(self) -> list[ComplianceRow]:
+        """Lowest compliance first (people with nothing expected last), then by employee ID"""
+        return sorted(self.rows, key=lambda row: (row.percent is None, row.percent or 0, row.username))
+
+
+def compliance_matrix(manager: Employee, start: date, end: date) -> ComplianceMatrix:
+    """Submitted / not submitted for every active employee below `manager` on each day of [start, end]"""
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+    submitted: dict[int, set[int]] = {}
+    for employee_id, report_date in (
+        DailyReport.for_team(manager, start, end)
+        .exclude(DailyReport.EMPTY_PLACEHOLDER)
+        .order_by()
+        .values_list("employee_id", "report_date")
+    ):
+        submitted.setdefault(employee_id, set()).add((report_date - start).days)
+
+    team = (
+        Employee.objects.filter(
+            ancestor_links__ancestor_id=manager.id, ancestor_links__depth__gt=0, is_active=True
+        )
+        .order_by("user__username")
+        .values_list("id", "user__username", "full_name", "role", "created_at")
+    )
+    role_labels = dict(Employee.Role.choices)
+    rows = []
+    day_submitted = [0] * len(days)
+    day_expected = [0] * len(days)
+    for employee_id, username, full_name, role, created_at in team:
+        joined = (timezone.localtime(created_at).date() - start).days
+        days_submitted = submitted.get(employee_id, ())
+        cells = [
+            True if offset in days_submitted else (False if offset >= joined else None)
+            for offset in range(len(days))
+        ]
+        for offset, cell in enumerate(cells):
+            if cell is not None:
+                day_expected[offset] += 1
+                day_submitted[offset] += cell
+        rows.append(ComplianceRow(employee_id, username, full_name, role_labels.get(role, role), cells))
+
+    return ComplianceMatrix(days, rows, day_submitted, day_expected)
@@ -0,0 +1,60 @@
+"""
+Daily report export for a manager's team over a date range.
+
+Rows are read with QuerySet.iterator(chunk_size=...) (a server-side cursor on
+PostgreSQL) and handed to org.streaming one at a time, so a year of reports
+for thousands of agents streams out without being loaded into memory.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import date
+
+from .models import DailyReport, Employee
+
+REPORT_EXPORT_COLUMNS = [
+    "Report Date",
+    "Employee ID",
+    "Name",
+    "Designation",
+    "Manager ID",
+    "Manager",
+    "Tasks Completed",
+    "Challenges",
+    "Next Day Plan",
+    "Joining Date",
+    "Today Hiring",
+    "Total Hiring",
+    "Sales",
+    "Submitted At",
+]
+EXPORT_CHUNK_SIZE = 2000
+
+
+def report_export_rows(manager: Employee, start: date, end: date) -> Iterator[tuple]:
+    """One tuple per report by `manager`'s team in [start, end], in REPORT_EXPORT_COLUMNS order"""
+    reports = (
+        DailyReport.for_team(manager, start, end)
+        .order_by("report_date", "employee__user__username")
+        .values_list(
+            "report_date",
+            "employee__user__username",
+            "employee__full_name",
+            "employee__role",
+            "employee__reporting_manager__user__username",
+            "employee__reporting_manager__full_name",
+            "tasks_completed",
+            "challenges",
+            "next_day_plan",
+            "joining_date",
+            "today_hiring",
+            "total_hiring",
+            "sales",
+            "submitted_at",
+        )
+    )
+    role_labels = dict(Employee.Role.choices)
+    for row in reports.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        row = list(row)
+        row[3] = role_labels.get(row[3], row[3])
+        yield tuple(row)
@@ -0,0 +1,145 @@
+"""
+Sales and hiring leaderboards for a manager's team, and trend series.
+
+Both read ReportRollup instead of DailyReport. A leaderboard is one
+own-scope rollup row per team member for the period, joined through the
+closure table and ranked by a RANK() window in the database. A trend is
+one range scan of a single employee's rollups on their unique index.
+Leaderboards are cached per (manager, period); ReportRollup drops the
+affected entries whenever figures under a manager change, and Employee
+whenever a listed member's name or employee ID changes. Dropping only reaches
+a shared cache backend, so with the default per-process cache (one per
+gunicorn worker) entries expire after a short time instead.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import models
+from django.db.models.functions import Rank
+
+from .models import Employee, EmployeeClosure, ReportRollup
+
+REPORT_STATS_CACHE_TIMEOUT = 60 * 60
+# Other workers' in-process caches never hear about invalidations, so there
+# a leaderboard is only reused for this long
+LOCAL_REPORT_STATS_CACHE_TIMEOUT = 30
+LEADERBOARD_SIZE = 25
+MAX_TREND_PERIODS = 60
+
+# Leaderboard name -> ReportRollup field it ranks by
+LEADERBOARD_METRICS = {"sales": "sales", "hiring": "today_hiring"}
+
+
+def leaderboard_cache_key(manager_id: int, period: str, period_start: date) -> str:
+    return f"report_leaderboard:{manager_id}:{period}:{period_start.isoformat()}"
+
+
+def report_stats_cache_timeout() -> int:
+    if isinstance(caches["default"], LocMemCache):
+        return LOCAL_REPORT_STATS_CACHE_TIMEOUT
+    return REPORT_STATS_CACHE_TIMEOUT
+
+
+def invalidate_leaderboards(manager_ids, buckets) -> None:
+    """Forget cached leaderboards of `manager_ids` for the given (period, period_start) pairs"""
+    cache.delete_many(
+        [leaderboard_cache_key(manager_id, period, start) for manager_id in manager_ids for period, start in buckets]
+    )
+
+
+def invalidate_member_leaderboards(employee_id: int) -> None:
+    """
+    Forget every cached leaderboard that can list `employee_id` (their
+    managers' boards for each period they have figures in), e.g. after their
+    name or employee ID changed.
+    """
+    buckets = ReportRollup.objects.filter(employee_id=employee_id, scope=ReportRollup.Scope.OWN).values_list(
+        "period", "period_start"
+    )
+    invalidate_leaderboards(EmployeeClosure.ancestor_ids(employee_id) - {employee_id}, list(buckets))
+
+
+def leaderboard(manager: Employee, period: str, day: date) -> dict:
+    """
+    Ranked sales and hiring of everyone below `manager` for the period
+    containing `day`, plus the team totals:
+    {"period", "period_start", "team": {figure: total}, "sales": [...], "hiring": [...]}
+    Each ranking lists up to LEADERBOARD_SIZE people with a non-zero figure.
+    """
+    period_start = ReportRollup.period_starts(day)[period]
+    key = leaderboard_cache_key(manager.id, period, period_start)
+    board = cache.get(key)
+    if board is None:
+        board = _leaderboard(manager, period, period_start)
+        cache.set(key, board, report_stats_cache_timeout())
+    return board
+
+
+def _leaderboard(manager: Employee, period: str, period_start: date) -> dict:
+    team = ReportRollup.totals(manager, period, period_start)
+    board = {
+        "period": period,
+        "period_start": period_start,
+        "team": {name: getattr(team, name) for name in ReportRollup.FIGURES},
+    }
+    rollups = ReportRollup.objects.filter(
+        scope=ReportRollup.Scope.OWN,
+        period=period,
+        period_start=period_start,
+        employee__ancestor_links__ancestor_id=manager.id,
+        employee__ancestor_links__depth__gt=0,
+    )
+    for name, field in LEADERBOARD_METRICS.items():
+        rows = (
+            rollups.filter(**{f"{field}__gt": 0})
+            .annotate(rank=models.Window(Rank(), order_by=models.F(field).desc()))
+            .order_by("rank", "employee__user__username")
+            .values("rank", "employee_id", "employee__user__username", "employee__full_name", field, "report_count")
+        )
+        board[name] = [
+            {
+                "rank": row["rank"],
+                "id": row["employee_id"],
+                "employee_id": row["employee__user__username"],
+                "full_name": row["employee__full_name"],
+                "value": row[field],
+                "report_count": row["report_count"],
+            }
+            for row in rows[:LEADERBOARD_SIZE]
+        ]
+    return board
+
+
+def _previous_start(period: str, start: date) -> date:
+    if period == ReportRollup.Period.DAY:
+        return start - timedelta(days=1)
+    if period == ReportRollup.Period.WEEK:
+        return start - timedelta(weeks=1)
+    return (start - timedelta(days=1)).replace(day=1)
+
+
+def trend(employee: Employee, period: str, day: date, periods: int = 12, scope: str = ReportRollup.Scope.OWN) -> list[dict]:
+    """
+    `employee`'s figures (own, or their team's) for the `periods` periods up
+    to the one containing `day`, oldest first; zeros where nothing was reported.
+    """
+    starts = [ReportRollup.period_starts(day)[period]]
+    while len(starts) < periods:
+        starts.append(_previous_start(period, starts[-1]))
+    starts.reverse()
+
+    zero = {name: 0 for name in ReportRollup.FIGURES} | {"sales": Decimal("0.00")}
+    found = {
+        row["period_start"]: row
+        for row in ReportRollup.objects.filter(
+            employee=employee, scope=scope, period=period, period_start__range=(starts[0], starts[-1])
+        ).values("period_start", *ReportRollup.FIGURES)
+    }
+    return [
+        {"period_start": start, **{name: found.get(start, zero)[name] for name in ReportRollup.FIGURES}}
+        for start in starts
+    ]
@@ -0,0 +1,207 @@
+"""
+Full-text search over daily report contents (tasks completed, challenges,
+next day plan) within a manager's team.
+
+The index lives in the database and is maintained by it, so every write
+path (save(), bulk_create, queryset updates) keeps it current:
+
+* PostgreSQL: a tsvector column, org_dailyreport.search_vector (weighted
+  tasks > challenges > plan, English stemming) set by a trigger, with a GIN
+  index. Queries use websearch_to_tsquery ("quoted phrases", or,
+  -exclusions) and rank with ts_rank_cd.
+* SQLite: an external-content FTS5 table, org_dailyreport_fts (porter
+  stemming), synced by triggers. Queries are words and "quoted phrases",
+  all required; ranked with bm25 using the same column weights.
+* Other databases: unranked icontains matching.
+
+Both are created by migration 0012; on PostgreSQL, 0014 fills the column for
+existing rows and builds the GIN index concurrently, so neither step locks
+the table against writes. `python manage.py rebuild_report_search` recreates
+them (e.g. after restoring a SQLite database from a dump).
+"""
+from __future__ import annotations
+
+import re
+from datetime import date
+
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
+
+from .models import DailyReport, Employee
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_FIELDS = ("tasks_completed", "challenges", "next_day_plan")
+
+
+
+def _postgres_vector(row: str) -> str:
+    """The weighted tsvector of one report; `row` is NEW in the trigger or the table name in the backfill"""
+    return (
+        f"setweight(to_tsvector('english', coalesce({row}.tasks_completed, '')), 'A') || "
+        f"setweight(to_tsvector('english', coalesce({row}.challenges, '')), 'B') || "
+        f"setweight(to_tsvector('english', coalesce({row}.next_day_plan, '')), 'C')"
+    )
+
+
+# A plain nullable column is a catalog-only change, unlike a GENERATED ... STORED
+# one, which rewrites the whole table under an exclusive lock. The trigger
+# keeps it current from then on; existing rows are filled in batches and the
+# GIN index is built CONCURRENTLY by migration 0014 (outside a transaction).
+_POSTGRES_CREATE = [
+    "ALTER TABLE org_dailyreport ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"""
+    CREATE OR REPLACE FUNCTION org_dailyreport_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {_postgres_vector("NEW")};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS org_dailyreport_search_vector ON org_dailyreport",
+    f"""
+    CREATE TRIGGER org_dailyreport_search_vector
+    BEFORE INSERT OR UPDATE OF {", ".join(SEARCH_FIELDS)} ON org_dailyreport
+    FOR EACH ROW EXECUTE FUNCTION org_dailyreport_search_vector()
+    """,
+]
+_POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS org_report_search_idx",
+    "DROP TRIGGER IF EXISTS org_dailyreport_search_vector ON org_dailyreport",
+    "DROP FUNCTION IF EXISTS org_dailyreport_search_vector()",
+    "ALTER TABLE org_dailyreport DROP COLUMN IF EXISTS search_vector",
+]
+_POSTGRES_FILL = f"""
+    UPDATE org_dailyreport SET search_vector = {_postgres_vector("org_dailyreport")}
+    WHERE id > %s AND id <= %s AND search_vector IS NULL
+"""
+_POSTGRES_INDEX = "CREATE INDEX CONCURRENTLY IF NOT EXISTS org_report_search_idx ON org_dailyreport USING GIN (search_vector)"
+_POSTGRES_DROP_INDEX = "DROP INDEX CONCURRENTLY IF EXISTS org_report_search_idx"
+FILL_BATCH_SIZE = 5000
+
+_SQLITE_COLUMNS = ", ".join(SEARCH_FIELDS)
+_SQLITE_NEW = ", ".join(f"new.{name}" for name in SEARCH_FIELDS)
+_SQLITE_OLD = ", ".join(f"old.{name}" for name in SEARCH_FIELDS)
+_SQLITE_CREATE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS org_dailyreport_fts USING fts5(
+        {_SQLITE_COLUMNS}, content='org_dailyreport', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS org_dailyreport_fts_insert AFTER INSERT ON org_dailyreport BEGIN
+        INSERT INTO org_dailyreport_fts(rowid, {_SQLITE_COLUMNS}) VALUES (new.id, {_SQLITE_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS org_dailyreport_fts_delete AFTER DELETE ON org_dailyreport BEGIN
+        INSERT INTO org_dailyreport_fts(org_dailyreport_fts, rowid, {_SQLITE_COLUMNS})
+        VALUES ('delete', old.id, {_SQLITE_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS org_dailyreport_fts_update AFTER UPDATE OF {_SQLITE_COLUMNS} ON org_dailyreport BEGIN
+        INSERT INTO org_dailyreport_fts(org_dailyreport_fts, rowid, {_SQLITE_COLUMNS})
+        VALUES ('delete', old.id, {_SQLITE_OLD});
+        INSERT INTO org_dailyreport_fts(rowid, {_SQLITE_COLUMNS}) VALUES (new.id, {_SQLITE_NEW});
+    END
+    """,
+    # Index whatever the table already holds
+    "INSERT INTO org_dailyreport_fts(org_dailyreport_fts) VALUES ('rebuild')",
+]
+_SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS org_dailyreport_fts_insert",
+    "DROP TRIGGER IF EXISTS org_dailyreport_fts_delete",
+    "DROP TRIGGER IF EXISTS org_dailyreport_fts_update",
+    "DROP TABLE IF EXISTS org_dailyreport_fts",
+]
+
+
+def _statements(vendor: str, create: bool) -> list[str]:
+    if vendor == "postgresql":
+        return _POSTGRES_CREATE if create else _POSTGRES_DROP
+    if vendor == "sqlite":
+        return _SQLITE_CREATE if create else _SQLITE_DROP
+    return []
+
+
+def create_search_index(schema_editor) -> None:
+    """
+    Create the search index for the database in use (if missing). On SQLite
+    this also fills it; on PostgreSQL only new writes are indexed until
+    build_search_index() has run.
+    """
+    for sql in _statements(schema_editor.connection.vendor, create=True):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(schema_editor) -> None:
+    for sql in _statements(schema_editor.connection.vendor, create=False):
+        schema_editor.execute(sql)
+
+
+def build_search_index(schema_editor) -> None:
+    """
+    PostgreSQL: fill search_vector for rows written before the trigger existed,
+    one committed batch of ids at a time, then build the GIN index without
+    blocking writes. Must run outside a transaction (CREATE INDEX CONCURRENTLY).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT coalesce(max(id), 0) FROM org_dailyreport")
+        (last_id,) = cursor.fetchone()
+    for low in range(0, last_id, FILL_BATCH_SIZE):
+        schema_editor.execute(_POSTGRES_FILL, [low, low + FILL_BATCH_SIZE])
+    schema_editor.execute(_POSTGRES_INDEX)
+
+
+def drop_search_index_concurrently(schema_editor) -> None:
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(_POSTGRES_DROP_INDEX)
+
+
+def _fts5_query(terms: str) -> str:
+    """Words and "quoted phrases" as an FTS5 query that requires all of them ('' if there are none)"""
+    parts = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', terms):
+        tokens = re.findall(r"\w+", phrase or word)
+        if tokens:
+            parts.append('"' + " ".join(tokens) + '"' if phrase else " ".join(f'"{token}"' for token in tokens))
+    return " ".join(parts)
+
+
+def search_team_reports(manager: Employee, terms: str, start: date | None = None, end: date | None = None):
+    """
+    Reports by everyone below `manager` (optionally within [start, end])
+    matching `terms`, best match first, as a queryset ready for Paginator.
+    """
+    reports = DailyReport.for_team(manager, start, end).select_related("employee__user")
+    terms = terms.strip()
+    vendor = connection.vendor
+
+    if vendor == "postgresql":
+        tsquery = "websearch_to_tsquery('english', %s)"
+        reports = reports.annotate(
+            score=RawSQL(f"ts_rank_cd(org_dailyreport.search_vector, {tsquery})", [terms], output_field=models.FloatField())
+        ).filter(RawSQL(f"org_dailyreport.search_vector @@ {tsquery}", [terms], output_field=models.BooleanField()))
+        return reports.order_by("-score", "-report_date", "-pk")
+
+    if vendor == "sqlite":
+        query = _fts5_query(terms)
+        if not query:
+            return reports.none()
+        # Join the FTS5 table so MATCH and bm25() run once for the whole query.
+        # bm25() is lower-is-better; weights follow the PostgreSQL A/B/C order.
+        reports = (
+            reports.filter(search_entry__isnull=False)
+            .filter(RawSQL("org_dailyreport_fts MATCH %s", [query], output_field=models.BooleanField()))
+            .annotate(score=RawSQL("bm25(org_dailyreport_fts, 4.0, 2.0, 1.0)", [], output_field=models.FloatField()))
+        )
+        return reports.order_by("score", "-report_date", "-pk")
+
+    matches = models.Q()
+    for word in terms.split():
+        matches &= models.Q(tasks_completed__icontains=word) | models.Q(challenges__icontains=word) | models.Q(
+            next_day_plan__icontains=word
+        )
+    return reports.filter(matches).order_by("-report_date", "-pk")
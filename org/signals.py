@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import DailyReport, Employee, EmployeeClosure, ManagerHeadcount, ReportRollup
+
+
+@receiver(pre_delete, sender=Employee)
+def detach_deleted_employee(sender, instance: Employee, **kwargs):
+    instance.invalidate_org_tree_cache()
+    # Deleting an employee SET_NULLs their direct reports with a bulk UPDATE
+    # (no save()), so the hierarchy index has to be fixed up here.
+    ReportRollup.detach_subtree(instance)
+    EmployeeClosure.detach_subtree(instance)
+    ManagerHeadcount.track_change(
+        {attname: getattr(instance, attname) for attname in Employee._TRACKED_FIELDS}, None
+    )
+
+
+@receiver(pre_delete, sender=DailyReport)
+def remove_deleted_report(sender, instance: DailyReport, **kwargs):
+    state = getattr(instance, "_loaded_state", {})
+    ReportRollup.track_change(
+        {attname: state.get(attname, getattr(instance, attname)) for attname in DailyReport._TRACKED_FIELDS}, None
+    )
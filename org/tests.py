@@ -1,3 +1,1547 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import re
+import secrets
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock, skipIf
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django import forms
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count, QuerySet
+from django.http import HttpResponse
+from django.template import Context, Engine
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import offer_letter_import, offer_letter_pdf, org_tree, report_leaderboard
+from .decorators import admin_required
+from .downloads import pdf_download_response
+from .employee_csv import create_employees, read_employee_csv
+from .forms import EmployeeCreateForm, EmployeeUpdateForm
+from .middleware import CurrentEmployeeMiddleware, get_employee_permissions
+from .models import (
+    DailyReport,
+    Employee,
+    EmployeeClosure,
+    EmployeeIdSequence,
+    ManagerHeadcount,
+    OfferLetter,
+    ReportRollup,
+    reporting_cycles,
+)
+from .offer_letter_approval import approve_offer_letters, reject_offer_letters
+from .offer_letter_pdf import OfferLetterTemplate, get_offer_letter_template
+from .pagination import decode_cursor, encode_cursor, keyset_page
+from .report_compliance import MAX_DAYS, compliance_matrix
+from .report_export import REPORT_EXPORT_COLUMNS
+from .report_search import search_team_reports
+from .streaming import xlsx_chunks
+
+
+def make_employee(username, role=Employee.Role.AGENT, manager=None):
+    user = User.objects.create_user(username=username, password="x")
+    return Employee.objects.create(user=user, full_name=username, role=role, reporting_manager=manager)
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    EXPLAIN the hot queries against a seeded database and fail if one of them
+    falls back to reading a whole table (or to sorting rows an index could
+    return in order). On PostgreSQL sequential scans and sorts are disabled
+    for the planner, so a plan only avoids them if a usable index exists;
+    the planner would otherwise pick a seq scan for tables this small anyway.
+    """
+
+    DAYS = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = make_employee("9000", Employee.Role.SALES_MANAGER)
+        cls.team = []
+        for i in range(4):
+            assistant = make_employee(f"91{i:02}", Employee.Role.ASSISTANT_MANAGER, cls.manager)
+            cls.team.append(assistant)
+            for j in range(10):
+                cls.team.append(make_employee(f"92{i}{j}", Employee.Role.RELATIONSHIP_MANAGER, assistant))
+        make_employee("9999", Employee.Role.HR_MANAGER)
+
+        cls.start = date(2026, 6, 1)
+        DailyReport.objects.bulk_create(
+            DailyReport(employee=member, report_date=cls.start + timedelta(days=day), tasks_completed="calls")
+            for member in cls.team
+            for day in range(cls.DAYS)
+        )
+        OfferLetter.objects.bulk_create(
+            OfferLetter(
+                created_by=cls.team[i % 5],
+                candidate_name=f"Candidate {i}",
+                candidate_email=f"candidate{i}@example.com",
+                designation=Employee.Role.AGENT,
+                designation_display="Agent",
+                department="Sales",
+                annual_salary="300,000.00",
+                salary_in_words="Three Lakh",
+                joining_date="July 2026",
+                offer_date="01-06-2026",
+                reference_number=f"REF-{i}",
+                download_token=secrets.token_urlsafe(32),
+                status=("pending", "approved", "rejected")[i % 3],
+            )
+            for i in range(300)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("SET LOCAL enable_sort = off")
+
+    def assertUsesIndexes(self, queryset, ordered=False):
+        plan = queryset.explain()
+        if connection.vendor == "postgresql":
+            full_scans = re.findall(r"Seq Scan on \w+", plan)
+            sorts = re.findall(r"^\s*(?:->\s*)?(?:Incremental )?Sort\b", plan, re.MULTILINE)
+        else:
+            # SCAN reads a whole table or index; a skip-scan (ANY(column)) steps through
+            # every value of an index's leading column
+            full_scans = re.findall(r"\bSCAN \w+|\bSEARCH \w+ USING .*\(ANY\(", plan)
+            sorts = re.findall(r"USE TEMP B-TREE FOR (?:GROUP BY|(?:LAST TERM OF )?ORDER BY)", plan)
+        self.assertFalse(full_scans, f"full table scan in:\n{plan}")
+        if ordered:
+            self.assertFalse(sorts, f"sort instead of index order in:\n{plan}")
+
+    # Employee(reporting_manager, role)
+
+    def test_direct_reports_by_role(self):
+        self.assertUsesIndexes(
+            Employee.objects.filter(
+                reporting_manager=self.manager, role=Employee.Role.ASSISTANT_MANAGER, is_active=True
+            ).order_by()
+        )
+
+    def test_headcount_recount(self):
+        # ManagerHeadcount.actual_counts()
+        self.assertUsesIndexes(
+            Employee.objects.filter(is_active=True, reporting_manager__isnull=False)
+            .values("reporting_manager_id", "role")
+            .annotate(count=Count("id"))
+            .order_by(),
+            ordered=True,
+        )
+
+    # DailyReport(report_date, employee)
+
+    def test_reports_for_a_day(self):
+        self.assertUsesIndexes(DailyReport.objects.filter(report_date=self.start).order_by())
+
+    def test_reports_for_a_date_range(self):
+        self.assertUsesIndexes(
+            DailyReport.objects.filter(report_date__range=(self.start, self.start + timedelta(days=6))).order_by()
+        )
+
+    def test_team_reports_for_a_day(self):
+        # Manager dashboard: the team's reports for the selected date
+        team_ids = [member.id for member in self.team[:11]]
+        self.assertUsesIndexes(DailyReport.objects.filter(employee_id__in=team_ids, report_date=self.start).order_by())
+
+    def test_team_reports_for_a_date_range(self):
+        self.assertUsesIndexes(
+            DailyReport.for_team(self.manager, self.start, self.start + timedelta(days=6))
+            .order_by()
+            .values_list("employee_id", "report_date")
+        )
+
+    # OfferLetter(status, created_at) and OfferLetter(created_by, created_at)
+
+    def test_offer_letters_by_status(self):
+        # HR dashboard tab, keyset paged newest first
+        self.assertUsesIndexes(OfferLetter.objects.filter(status="pending").order_by("-created_at", "-pk"), ordered=True)
+
+    def test_offer_letters_by_creator(self):
+        # "My offer letters"
+        self.assertUsesIndexes(
+            OfferLetter.objects.filter(created_by=self.team[0]).order_by("-created_at"), ordered=True
+        )
+
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class OfferLetterPdfStorageTests(TestCase):
+    def test_reused_orphan_is_not_collected(self):
+        name = OfferLetter.store_pdf(b"%PDF shared")
+        old = time.time() - 7 * 24 * 3600
+        os.utime(default_storage.path(name), (old, old))
+        self.assertEqual(OfferLetter.collect_orphaned_pdfs(timedelta(days=1), delete=False), [name])
+
+        # A worker rendering the same content picks the orphan up again
+        self.assertEqual(OfferLetter.store_pdf(b"%PDF shared"), name)
+        self.assertEqual(OfferLetter.collect_orphaned_pdfs(timedelta(days=1)), [])
+        self.assertTrue(default_storage.exists(name))
+
+    def test_rendered_letter_restores_a_collected_file(self):
+        letter = OfferLetter.objects.create(
+            created_by=make_employee("9000", Employee.Role.SALES_MANAGER), reference_number="R/1", download_token="t"
+        )
+        name = OfferLetter.store_pdf(b"%PDF one")
+        default_storage.delete(name)  # collected between store_pdf() and the save
+        with mock.patch.object(OfferLetter, "store_pdf", return_value=name):
+            letter.mark_rendered(b"%PDF one")
+        with default_storage.open(name, "rb") as f:
+            self.assertEqual(f.read(), b"%PDF one")
+
+
+def pdf_lines(pdf: bytes) -> list[list[str]]:
+    """Each page's text lines, in sorted order (overlaid text is extracted after the base's)"""
+    pages = offer_letter_pdf.PdfReader(io.BytesIO(pdf)).pages
+    return [sorted(line.strip() for line in page.extract_text().splitlines()) for page in pages]
+
+
+class OfferLetterTemplateTests(TestCase):
+    SHORT = {
+        "reference_number": "EOM/HR/DP/095/25/711",
+        "offer_date": "2026-01-05",
+        "candidate_name": "Priya Sharma",
+        "designation_display": "Agent",
+        "joining_date": "2026-01-15",
+        "annual_salary": "600000",
+        "salary_in_words": "Six Lakh",
+    }
+    # Name, position and salary paragraphs each wrap onto more lines
+    LONG = dict(
+        SHORT,
+        candidate_name="Priya " + "Venkataraman " * 12,
+        designation_display="Relationship Manager " * 4,
+        salary_in_words="Six Lakh Fifty Thousand Four Hundred and Twenty Rupees Only " * 3,
+    )
+
+    def setUp(self):
+        offer_letter_pdf._templates.__dict__.clear()
+        self.addCleanup(offer_letter_pdf._templates.__dict__.clear)
+
+    @skipIf(offer_letter_pdf.PdfReader is None, "pypdf is not installed")
+    def test_overlay_has_the_full_layouts_text(self):
+        template = OfferLetterTemplate()
+        for data in (self.SHORT, self.LONG, self.SHORT):
+            with self.subTest(name=data["candidate_name"]):
+                self.assertEqual(pdf_lines(template.render_overlay(data)), pdf_lines(template.render(data)))
+        self.assertEqual(len(template._bases), 2)
+
+    @skipIf(offer_letter_pdf.PdfReader is None, "pypdf is not installed")
+    def test_full_layout_once_max_bases_are_cached(self):
+        template = OfferLetterTemplate()
+        template.render_overlay(self.SHORT)
+        for heights in range(offer_letter_pdf.MAX_BASES - 1):
+            template._bases[(heights,)] = None
+
+        self.assertEqual(template.render_overlay(self.LONG), template.render(self.LONG))
+        self.assertEqual(len(template._bases), offer_letter_pdf.MAX_BASES)
+        # A layout that is already cached is still stamped
+        self.assertNotEqual(template.render_overlay(self.SHORT), template.render(self.SHORT))
+
+    def test_replacing_an_image_rebuilds_the_template(self):
+        base_dir = tempfile.mkdtemp()
+        for name in offer_letter_pdf.TEMPLATE_FILES:
+            shutil.copy(os.path.join(settings.BASE_DIR, name), base_dir)
+        self.addCleanup(shutil.rmtree, base_dir)
+
+        with override_settings(BASE_DIR=base_dir):
+            template = get_offer_letter_template()
+            before = template.render(self.SHORT)
+            self.assertIs(get_offer_letter_template(), template)
+
+            shutil.copy(os.path.join(base_dir, "header.png"), os.path.join(base_dir, "sign.png"))
+            replaced = get_offer_letter_template()
+            self.assertIsNot(replaced, template)
+            self.assertNotEqual(replaced.fingerprint, template.fingerprint)
+            self.assertNotEqual(replaced.render(self.SHORT), before)
+            self.assertIs(get_offer_letter_template(), replaced)
+
+
+class BrokenPool:
+    """Stands in for a process pool whose render process died"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("a child process terminated abruptly"))
+        return future
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class OfferLetterRenderClaimTests(TestCase):
+    def setUp(self):
+        creator = make_employee("9000", Employee.Role.SALES_MANAGER)
+        self.letter = OfferLetter.objects.create(
+            created_by=creator, candidate_name="A", reference_number="R/1", download_token="t"
+        )
+
+    def test_stale_claim_does_not_overwrite_the_new_owner(self):
+        (mine,) = OfferLetter.claim_render_jobs(limit=1)
+        # The claim goes stale and another worker takes the letter over
+        OfferLetter.objects.filter(pk=mine.pk).update(render_claimed_at=timezone.now() + timedelta(seconds=1))
+
+        self.assertFalse(mine.mark_render_failed("too slow"))
+        self.assertFalse(mine.mark_rendered(b"%PDF late"))
+        self.letter.refresh_from_db()
+        self.assertEqual(
+            (self.letter.render_status, self.letter.render_attempts, self.letter.render_error), ("rendering", 0, "")
+        )
+
+    def test_claim_owner_records_the_result(self):
+        (mine,) = OfferLetter.claim_render_jobs(limit=1)
+        self.assertTrue(mine.mark_rendered(b"%PDF one"))
+        self.letter.refresh_from_db()
+        self.assertEqual((self.letter.render_status, self.letter.render_attempts), ("ready", 1))
+        self.assertIsNone(self.letter.render_claimed_at)
+
+    def test_broken_pool_requeues_without_counting_an_attempt(self):
+        letters = OfferLetter.claim_render_jobs(limit=1)
+        with self.assertRaises(BrokenProcessPool):
+            list(OfferLetter.render_pdfs(letters, BrokenPool()))
+        self.letter.refresh_from_db()
+        self.assertEqual((self.letter.render_status, self.letter.render_attempts), ("rendering", 0))
+        self.assertIsNone(self.letter.render_claimed_at)
+        self.assertEqual([letter.pk for letter in OfferLetter.claim_render_jobs(limit=1)], [self.letter.pk])
+
+
+def rollup_rows():
+    return sorted(
+        ReportRollup.objects.values_list("employee_id", "scope", "period", "period_start", *ReportRollup.FIGURES)
+    )
+
+
+def nonzero_rollup_rows():
+    return [row for row in rollup_rows() if any(row[4:])]
+
+
+def fresh_rollup_rows():
+    """What the rollups should hold, summed straight from DailyReport along the reporting_manager chain"""
+    parents = dict(Employee.objects.values_list("id", "reporting_manager_id"))
+    totals = {}
+    for employee_id, report_date, sales, today_hiring, total_hiring in DailyReport.objects.values_list(
+        "employee_id", "report_date", "sales", "today_hiring", "total_hiring"
+    ):
+        owners = [(employee_id, ReportRollup.Scope.OWN)]
+        manager_id = parents[employee_id]
+        while manager_id is not None:
+            owners.append((manager_id, ReportRollup.Scope.TEAM))
+            manager_id = parents[manager_id]
+        for period, period_start in ReportRollup.period_starts(report_date).items():
+            for owner_id, scope in owners:
+                row = totals.setdefault((owner_id, scope, period, period_start), [0, Decimal("0"), 0, 0])
+                row[0] += 1
+                row[1] += sales or 0
+                row[2] += today_hiring or 0
+                row[3] += total_hiring or 0
+    return sorted((*key, *figures) for key, figures in totals.items())
+
+
+class ReportRollupTests(TestCase):
+    def setUp(self):
+        self.top = make_employee("5001", Employee.Role.SALES_MANAGER)
+        self.lead = make_employee("5002", Employee.Role.ASSISTANT_MANAGER, self.top)
+        self.other_lead = make_employee("5003", Employee.Role.ASSISTANT_MANAGER, self.top)
+        self.rm = make_employee("5004", Employee.Role.RELATIONSHIP_MANAGER, self.lead)
+        self.agent = make_employee("5005", Employee.Role.AGENT, self.rm)
+
+    def assert_rollups_fresh(self):
+        self.assertEqual(nonzero_rollup_rows(), fresh_rollup_rows())
+
+    def report(self, employee, day, **figures):
+        return DailyReport.objects.create(employee=employee, report_date=day, tasks_completed="x", **figures)
+
+    def test_rollups_match_a_fresh_aggregate(self):
+        report = self.report(self.agent, date(2026, 3, 30), sales=Decimal("100.25"), today_hiring=1)
+        self.report(self.rm, date(2026, 4, 1), sales=Decimal("50"), total_hiring=3)
+        self.report(self.lead, date(2026, 4, 2), sales=Decimal("7"))
+        self.assert_rollups_fresh()
+        self.assertEqual(ReportRollup.totals(self.top, "month", date(2026, 4, 15)).sales, Decimal("57.00"))
+
+        # Edit the figures, then move the report into another month
+        report.sales = Decimal("80")
+        report.today_hiring = 2
+        report.save()
+        self.assert_rollups_fresh()
+        report.report_date = date(2026, 5, 3)
+        report.save(update_fields=["report_date"])
+        self.assert_rollups_fresh()
+
+        # Move a subtree to another manager, then to the top level
+        self.rm.reporting_manager = self.other_lead
+        self.rm.save()
+        self.assert_rollups_fresh()
+        self.assertEqual(ReportRollup.totals(self.lead, "month", date(2026, 4, 1)).sales, 0)
+        self.assertEqual(Employee.reassign_managers({self.rm.id: None}), 1)
+        self.assert_rollups_fresh()
+
+        report.delete()
+        self.assert_rollups_fresh()
+        DailyReport.objects.filter(employee=self.rm).delete()
+        self.assert_rollups_fresh()
+        self.assertEqual(ReportRollup.totals(self.rm, "month", date(2026, 4, 1), scope="own").report_count, 0)
+
+
+class DailyReportSubmitTests(TestCase):
+    def setUp(self):
+        self.manager = make_employee("9000", Employee.Role.SALES_MANAGER)
+        self.member = make_employee("9001", Employee.Role.RELATIONSHIP_MANAGER, self.manager)
+        self.day = date(2026, 6, 10)
+
+    def assertCountedOnce(self, sales):
+        self.assertEqual(DailyReport.objects.filter(employee=self.member, report_date=self.day).count(), 1)
+        for employee, scope in ((self.member, ReportRollup.Scope.OWN), (self.manager, ReportRollup.Scope.TEAM)):
+            day = ReportRollup.totals(employee, ReportRollup.Period.DAY, self.day, scope=scope)
+            self.assertEqual((day.report_count, day.sales), (1, Decimal(sales)))
+        rows = rollup_rows()
+        ReportRollup.rebuild()
+        self.assertEqual(rows, rollup_rows())
+
+    def test_second_submit_updates_the_report(self):
+        _, created = DailyReport.submit(self.member, self.day, {"tasks_completed": "calls", "sales": Decimal("10")})
+        self.assertTrue(created)
+        _, created = DailyReport.submit(self.member, self.day, {"tasks_completed": "more", "sales": Decimal("25")})
+        self.assertFalse(created)
+        self.assertCountedOnce("25.00")
+
+    def test_submit_that_loses_the_insert_race_updates_the_winner(self):
+        DailyReport.submit(self.member, self.day, {"tasks_completed": "calls", "sales": Decimal("10")})
+
+        # The loser's first lookup ran before the winner committed, so its
+        # INSERT hits the unique constraint
+        real_get = QuerySet.get
+        lookups = []
+
+        def first_lookup_misses(queryset, *args, **kwargs):
+            lookups.append(kwargs)
+            if len(lookups) == 1:
+                raise queryset.model.DoesNotExist
+            return real_get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, "get", first_lookup_misses):
+            report, created = DailyReport.submit(
+                self.member, self.day, {"tasks_completed": "more", "sales": Decimal("25")}
+            )
+        self.assertFalse(created)
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(report.tasks_completed, "more")
+        self.assertCountedOnce("25.00")
+
+    def test_cleanup_keeps_a_placeholder_submitted_after_its_batch_was_read(self):
+        placeholder = DailyReport.objects.create(employee=self.member, report_date=self.day)
+        stale = DailyReport.objects.create(employee=self.member, report_date=self.day - timedelta(days=1))
+        real_delete = QuerySet.delete
+
+        def submit_then_delete(queryset):
+            # The batch's pks are read; the member submits before the DELETE runs
+            if not DailyReport.objects.get(pk=placeholder.pk).tasks_completed:
+                DailyReport.submit(self.member, self.day, {"tasks_completed": "calls", "sales": Decimal("25")})
+            return real_delete(queryset)
+
+        with mock.patch.object(QuerySet, "delete", submit_then_delete):
+            call_command("delete_empty_daily_reports", stdout=io.StringIO())
+        self.assertFalse(DailyReport.objects.filter(pk=stale.pk).exists())
+        self.assertEqual(DailyReport.objects.get(pk=placeholder.pk).tasks_completed, "calls")
+        self.assertEqual(nonzero_rollup_rows(), fresh_rollup_rows())
+
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class PdfDownloadOffloadTests(TestCase):
+    def setUp(self):
+        creator = make_employee("9000", Employee.Role.SALES_MANAGER)
+        # Named after the candidate, as letters rendered before content addressing were
+        name = default_storage.save("offer_letters/OL_2026_Zoë_Ağaoğlu.pdf", ContentFile(b"%PDF legacy"))
+        self.letter = OfferLetter.objects.create(
+            created_by=creator, reference_number="R/1", download_token="t", pdf_file=name
+        )
+        self.request = RequestFactory().get("/")
+
+    @override_settings(OFFER_LETTER_DOWNLOAD_OFFLOAD="x-accel-redirect")
+    def test_accel_redirect_percent_encodes_the_name(self):
+        response = pdf_download_response(self.request, self.letter.pdf_file, "letter.pdf")
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/protected-media/offer_letters/OL_2026_Zo%C3%AB_A%C4%9Fao%C4%9Flu.pdf"
+        )
+
+    @override_settings(OFFER_LETTER_DOWNLOAD_OFFLOAD="x-sendfile")
+    def test_sendfile_streams_paths_that_do_not_fit_a_header(self):
+        response = pdf_download_response(self.request, self.letter.pdf_file, "letter.pdf")
+        self.assertNotIn("X-Sendfile", response)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF legacy")
+
+    @override_settings(OFFER_LETTER_DOWNLOAD_OFFLOAD="x-sendfile")
+    def test_sendfile_offloads_plain_paths(self):
+        name = default_storage.save("offer_letters/plain.pdf", ContentFile(b"%PDF plain"))
+        OfferLetter.objects.filter(pk=self.letter.pk).update(pdf_file=name)
+        self.letter.refresh_from_db()
+        response = pdf_download_response(self.request, self.letter.pdf_file, "letter.pdf")
+        self.assertEqual(response["X-Sendfile"], default_storage.path(name))
+
+
+class LeaderboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = make_employee("9000", Employee.Role.SALES_MANAGER)
+        self.member = make_employee("9001", Employee.Role.RELATIONSHIP_MANAGER, self.manager)
+        self.day = date(2026, 6, 10)
+        DailyReport.submit(self.member, self.day, {"tasks_completed": "calls", "sales": Decimal("10")})
+
+    def board(self):
+        return report_leaderboard.leaderboard(self.manager, ReportRollup.Period.MONTH, self.day)
+
+    def test_in_process_cache_only_keeps_boards_briefly(self):
+        self.assertEqual(
+            report_leaderboard.report_stats_cache_timeout(), report_leaderboard.LOCAL_REPORT_STATS_CACHE_TIMEOUT
+        )
+
+    def test_name_change_drops_cached_boards(self):
+        self.assertEqual(self.board()["sales"][0]["full_name"], "9001")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.full_name = "Renamed"
+            self.member.save()
+        self.assertEqual(self.board()["sales"][0]["full_name"], "Renamed")
+
+    def test_employee_id_change_drops_cached_boards(self):
+        self.assertEqual(self.board()["sales"][0]["employee_id"], "9001")
+        member = Employee.objects.get(pk=self.member.pk)
+        data = {
+            "employee_id": "9101", "full_name": member.full_name, "role": member.role,
+            "reporting_manager": self.manager.pk, "is_active": True,
+        }
+        form = EmployeeUpdateForm(data, instance=member)
+        self.assertTrue(form.is_valid(), form.errors)
+        with self.captureOnCommitCallbacks(execute=True):
+            form.save()
+        self.assertEqual(self.board()["sales"][0]["employee_id"], "9101")
+
+
+class OrgTreeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = make_employee("9200", Employee.Role.SALES_MANAGER)
+        self.member = make_employee("9201", Employee.Role.RELATIONSHIP_MANAGER, self.manager)
+        self.client.force_login(self.manager.user)
+
+    def test_in_process_cache_only_keeps_trees_briefly(self):
+        self.assertEqual(org_tree.org_tree_cache_timeout(), org_tree.LOCAL_ORG_TREE_CACHE_TIMEOUT)
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}):
+            self.assertEqual(org_tree.org_tree_cache_timeout(), org_tree.ORG_TREE_CACHE_TIMEOUT)
+
+    def test_tree_changed_by_another_process_is_refreshed_after_the_local_timeout(self):
+        self.assertContains(self.client.get("/org/"), "9201")
+        # Another worker or a management command: its invalidation never reaches this cache
+        Employee.objects.filter(pk=self.member.pk).update(full_name="Renamed Elsewhere")
+        self.assertNotContains(self.client.get("/org/"), "Renamed Elsewhere")
+
+        later = time.time() + org_tree.LOCAL_ORG_TREE_CACHE_TIMEOUT + 1
+        with mock.patch("time.time", return_value=later):
+            self.assertContains(self.client.get("/org/"), "Renamed Elsewhere")
+
+
+class ManagerHeadcountTests(TestCase):
+    def setUp(self):
+        self.lead = make_employee("7001", Employee.Role.ASSISTANT_MANAGER)
+        self.rm = make_employee("7002", Employee.Role.RELATIONSHIP_MANAGER, self.lead)
+        self.agents = [make_employee(f"700{i}", Employee.Role.AGENT, self.rm) for i in (3, 4)]
+
+    def hire_form(self, employee_id):
+        return EmployeeCreateForm(
+            {"employee_id": employee_id, "full_name": "New Agent", "role": Employee.Role.AGENT,
+             "reporting_manager": self.rm.pk, "is_active": "on"}
+        )
+
+    def test_locked_recheck_refuses_a_hire_once_the_slot_is_taken(self):
+        form = self.hire_form("7010")
+        self.assertTrue(form.is_valid(), form.errors)
+        # A concurrent hire takes the last of the three agent slots after clean() ran
+        make_employee("7011", Employee.Role.AGENT, self.rm)
+        with self.assertRaises(forms.ValidationError):
+            form.save()
+        self.assertFalse(User.objects.filter(username="7010").exists())
+        self.assertFalse(self.hire_form("7012").is_valid())
+
+    def test_counts_follow_every_change(self):
+        agent, other = (Employee.objects.get(pk=e.pk) for e in self.agents)
+        self.assertEqual(self.rm.get_direct_reports_by_role(), {Employee.Role.AGENT: 2})
+
+        agent.role = Employee.Role.RELATIONSHIP_MANAGER
+        agent.save()
+        self.assertEqual(ManagerHeadcount.reconcile(), [])
+        agent.reporting_manager = self.lead
+        agent.save()
+        self.assertEqual(ManagerHeadcount.reconcile(), [])
+        self.assertEqual(
+            self.lead.get_direct_reports_by_role(), {Employee.Role.RELATIONSHIP_MANAGER: 2}
+        )
+
+        other.is_active = False
+        other.save(update_fields=["is_active"])
+        self.assertEqual(ManagerHeadcount.reconcile(), [])
+        self.assertEqual(self.rm.get_direct_reports_by_role(), {})
+        other.is_active = True
+        other.save()
+        self.assertEqual(self.rm.get_direct_reports_by_role(), {Employee.Role.AGENT: 1})
+
+        other.user.delete()
+        self.assertEqual(ManagerHeadcount.reconcile(), [])
+        self.assertEqual(self.rm.get_direct_reports_by_role(), {})
+
+    def test_decrement_of_a_drifted_counter_stops_at_zero(self):
+        ManagerHeadcount.objects.filter(manager=self.rm).update(count=0)
+        agent = Employee.objects.get(pk=self.agents[0].pk)
+        agent.is_active = False
+        agent.save()
+        self.assertEqual(ManagerHeadcount.objects.get(manager=self.rm).count, 0)
+
+    def test_reconcile_command_reports_and_fixes_drift(self):
+        ManagerHeadcount.objects.filter(manager=self.rm).update(count=5)
+        ManagerHeadcount.objects.filter(manager=self.lead).delete()
+        stdout = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command("reconcile_headcounts", stdout=stdout)
+        self.assertEqual(
+            stdout.getvalue().splitlines(),
+            [
+                f"Manager {self.lead.id} / RELATIONSHIP_MANAGER: stored 0, actual 1",
+                f"Manager {self.rm.id} / AGENT: stored 5, actual 2",
+            ],
+        )
+
+        call_command("reconcile_headcounts", "--fix", stdout=io.StringIO())
+        self.assertEqual(ManagerHeadcount.reconcile(), [])
+        stdout = io.StringIO()
+        call_command("reconcile_headcounts", stdout=stdout)
+        self.assertIn("All headcount counters match.", stdout.getvalue())
+
+
+class EmployeeIdSequenceTests(TestCase):
+    def setUp(self):
+        EmployeeIdSequence.objects.update_or_create(pk=1, defaults={"next_value": 2000})
+
+    def take(self, *usernames):
+        User.objects.bulk_create([User(username=str(username)) for username in usernames])
+
+    def next_value(self):
+        return EmployeeIdSequence.objects.get(pk=1).next_value
+
+    def test_reserve_skips_usernames_already_taken(self):
+        self.take(2001, 2003)
+        self.assertEqual(EmployeeIdSequence.reserve(3), ["2000", "2002", "2004"])
+        self.assertEqual(self.next_value(), 2005)
+        self.assertEqual(EmployeeIdSequence.reserve(), ["2005"])
+
+    def test_reserve_more_than_the_lookahead(self):
+        # More IDs than one lookahead window, with more taken ones than it can absorb
+        count = EmployeeIdSequence.LOOKAHEAD + 8
+        taken = range(2010, 2010 + EmployeeIdSequence.LOOKAHEAD + 4)
+        self.take(*taken)
+        reserved = EmployeeIdSequence.reserve(count)
+        expected = [str(n) for n in range(2000, 2010)] + [str(n) for n in range(taken.stop, taken.stop + count - 10)]
+        self.assertEqual(reserved, expected)
+        self.assertEqual(self.next_value(), int(expected[-1]) + 1)
+
+    def test_advance_past_ids_imported_out_of_order(self):
+        EmployeeIdSequence.advance_past(["2050", "2007", "x-12", "٣٣٣٣", "2049"])
+        self.assertEqual(self.next_value(), 2051)
+        # Never moves backwards
+        EmployeeIdSequence.advance_past(["2010"])
+        self.assertEqual(self.next_value(), 2051)
+
+    def test_advance_past_seeds_a_missing_counter(self):
+        EmployeeIdSequence.objects.all().delete()
+        self.take(3000)
+        EmployeeIdSequence.advance_past(["2500"])
+        self.assertEqual(self.next_value(), 3001)
+
+    def test_reservations_never_repeat_an_id(self):
+        reserved = []
+        for count in (1, 5, EmployeeIdSequence.LOOKAHEAD * 2, 3):
+            # IDs typed in by hand between reservations, just ahead of the counter
+            self.take(self.next_value() + 1)
+            reserved += EmployeeIdSequence.reserve(count)
+        self.assertEqual(len(reserved), len(set(reserved)))
+        self.assertFalse(User.objects.filter(username__in=reserved).exists())
+
+
+class OfferLetterApprovalTests(TestCase):
+    def setUp(self):
+        EmployeeIdSequence.objects.update_or_create(pk=1, defaults={"next_value": 8100})
+        self.hr = make_employee("8001", Employee.Role.HR_MANAGER)
+        self.lead = make_employee("8002", Employee.Role.ASSISTANT_MANAGER)
+        self.rm = make_employee("8003", Employee.Role.RELATIONSHIP_MANAGER, self.lead)
+        make_employee("8004", Employee.Role.AGENT, self.rm)
+
+    def letter(self, creator, designation, name):
+        return OfferLetter.objects.create(
+            created_by=creator, candidate_name=name, candidate_email=f"{name.split()[0].lower()}@example.com",
+            designation=designation, reference_number=f"REF/{name}", download_token=secrets.token_hex(8),
+        )
+
+    def test_mixed_batch_creates_employees_and_stops_at_the_hiring_limit(self):
+        # rm already has one of their three agents
+        agents = [self.letter(self.rm, Employee.Role.AGENT, f"Agent {i}") for i in range(3)]
+        decided = self.letter(self.rm, Employee.Role.AGENT, "Old Hire")
+        OfferLetter.objects.filter(pk=decided.pk).update(status="rejected")
+        rm_letter = self.letter(self.lead, Employee.Role.RELATIONSHIP_MANAGER, "Riya Sen")
+        ids = [a.pk for a in agents] + [decided.pk, rm_letter.pk, 999999]
+
+        results = approve_offer_letters(ids, self.hr)
+        self.assertEqual([r.letter_id for r in results], ids)
+        self.assertEqual([r.ok for r in results], [True, True, False, False, True, False])
+        self.assertIn("Hiring limit reached", results[2].message)
+        self.assertEqual(results[3].message, "Already rejected.")
+        self.assertEqual(results[5].message, "Offer letter not found.")
+        self.assertEqual([r.employee_id for r in results if r.ok], ["8100", "8101", "8102"])
+        self.assertEqual(
+            dict(OfferLetter.objects.filter(pk__in=ids).values_list("pk", "status")),
+            {agents[0].pk: "approved", agents[1].pk: "approved", agents[2].pk: "pending",
+             decided.pk: "rejected", rm_letter.pk: "approved"},
+        )
+
+        for result, manager in zip([results[0], results[1], results[4]], [self.rm, self.rm, self.lead]):
+            employee = Employee.objects.select_related("user").get(user__username=result.employee_id)
+            self.assertEqual((employee.full_name, employee.reporting_manager_id), (result.candidate_name, manager.id))
+            self.assertEqual(employee.user.email, f"{result.candidate_name.split()[0].lower()}@example.com")
+            self.assertEqual(
+                EmployeeClosure.ancestor_ids(employee.id), {employee.id} | EmployeeClosure.ancestor_ids(manager.id)
+            )
+        self.assertEqual(closure_rows(), fresh_closure_rows())
+        self.assertEqual(ManagerHeadcount.reconcile(), [])
+        self.assertEqual(self.rm.get_direct_reports_by_role(), {Employee.Role.AGENT: 3})
+
+        again = approve_offer_letters([agents[0].pk], self.hr)
+        self.assertEqual((again[0].ok, again[0].message), (False, "Already approved."))
+
+    def test_reject_skips_decided_letters(self):
+        pending = self.letter(self.rm, Employee.Role.AGENT, "Pending One")
+        approved = self.letter(self.rm, Employee.Role.AGENT, "Approved One")
+        approve_offer_letters([approved.pk], self.hr)
+
+        results = reject_offer_letters([pending.pk, approved.pk], "Position filled")
+        self.assertEqual([(r.ok, r.message) for r in results], [(True, "Rejected."), (False, "Already approved.")])
+        pending.refresh_from_db()
+        self.assertEqual((pending.status, pending.rejection_reason), ("rejected", "Position filled"))
+        self.assertEqual(OfferLetter.objects.get(pk=approved.pk).status, "approved")
+
+    def test_bulk_action_view(self):
+        letters = [self.letter(self.rm, Employee.Role.AGENT, f"View {i}") for i in range(2)]
+        data = {"action": "approve", "letter_ids": [letter.pk for letter in letters]}
+
+        # Only HR may approve: anyone else is sent back to their dashboard with nothing changed
+        self.client.force_login(self.lead.user)
+        self.assertRedirects(
+            self.client.post("/offer-letters/approve/bulk/", data), "/dashboard/", fetch_redirect_response=False
+        )
+        self.assertFalse(OfferLetter.objects.exclude(status="pending").exists())
+
+        self.client.force_login(self.hr.user)
+        response = self.client.post("/offer-letters/approve/bulk/", {**data, "action": "reject"})
+        self.assertRedirects(response, "/offer-letters/approve/", fetch_redirect_response=False)
+        self.assertFalse(OfferLetter.objects.exclude(status="pending").exists())
+
+        response = self.client.post("/offer-letters/approve/bulk/", data)
+        self.assertEqual((response.context["succeeded"], response.context["failed"]), (2, 0))
+        self.assertEqual(OfferLetter.objects.filter(status="approved").count(), 2)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        creator = make_employee("8500", Employee.Role.SALES_MANAGER)
+        self.letters = [
+            OfferLetter.objects.create(
+                created_by=creator, candidate_name=f"C{i}", reference_number=f"K/{i}", download_token=f"k{i}"
+            )
+            for i in range(8)
+        ]
+        # Three timestamps, each shared by several letters
+        base = timezone.now()
+        for i, letter in enumerate(self.letters):
+            OfferLetter.objects.filter(pk=letter.pk).update(created_at=base - timedelta(minutes=i // 3))
+
+    def walk(self, page_size):
+        pages, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(OfferLetter.objects.all(), cursor, page_size=page_size)
+            pages.append([row.pk for row in rows])
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_rows_sharing_a_timestamp_exactly_once(self):
+        newest_first = list(OfferLetter.objects.order_by("-created_at", "-pk").values_list("pk", flat=True))
+        for page_size in (1, 2, 3, 5, 8, 50):
+            pages = self.walk(page_size)
+            self.assertEqual([pk for page in pages for pk in page], newest_first, page_size)
+            self.assertTrue(all(0 < len(page) <= page_size for page in pages))
+
+    def test_cursor_round_trip(self):
+        letter = OfferLetter.objects.get(pk=self.letters[4].pk)
+        cursor = encode_cursor(letter.created_at, letter.pk)
+        self.assertEqual(decode_cursor(cursor), (letter.created_at, letter.pk))
+
+    def test_mangled_or_foreign_cursor_shows_the_first_page(self):
+        first_page, _ = keyset_page(OfferLetter.objects.all(), None, page_size=3)
+        naive = encode_cursor(timezone.now().replace(tzinfo=None), 1)
+        for cursor in ("", "%%%", "éé", "bm90IGEgY3Vyc29y", naive, encode_cursor(timezone.now(), 1)[:-3]):
+            self.assertIsNone(decode_cursor(cursor), cursor)
+            self.assertEqual(keyset_page(OfferLetter.objects.all(), cursor, page_size=3)[0], first_page)
+
+        self.client.force_login(make_employee("8501", Employee.Role.HR_MANAGER).user)
+        response = self.client.get("/offer-letters/approve/", {"status": "all", "after": "%%%not-a-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["offer_letters"]), 8)
+
+
+def offer_letter_csv(*references, blank_lines=False):
+    """A candidates CSV with one valid row per reference number (the template's sample row otherwise)"""
+    stream = io.StringIO()
+    offer_letter_import.write_csv_template(stream)
+    header, sample = stream.getvalue().splitlines()
+    lines = [header]
+    for reference in references:
+        lines.append(sample.replace(offer_letter_import.SAMPLE_ROW["reference_number"], reference))
+        if blank_lines:
+            lines.append(",,,,,,,,,")
+    return "\n".join(lines) + "\n"
+
+
+class OfferLetterImportTests(TestCase):
+    def setUp(self):
+        self.creator = make_employee("8600", Employee.Role.SALES_MANAGER)
+
+    def read(self, text):
+        return offer_letter_import.read_offer_letter_csv(io.StringIO(text))
+
+    def test_file_level_problems(self):
+        with self.assertRaisesMessage(ValidationError, "Missing column(s): candidate_email, designation"):
+            self.read("reference_number,offer_date,candidate_name,department,joining_date,annual_salary,"
+                      "salary_in_words\nR/1,2026-01-05,A,Sales,2026-01-15,1,One\n")
+        with self.assertRaisesMessage(ValidationError, "The file has no candidate rows."):
+            self.read(offer_letter_csv() + ",,,,,,,,,\n")
+        with mock.patch.object(offer_letter_import, "MAX_ROWS", 2):
+            self.assertEqual(len(self.read(offer_letter_csv("R/1", "R/2"))), 2)
+            with self.assertRaisesMessage(ValidationError, "upload at most 2 candidates"):
+                self.read(offer_letter_csv("R/1", "R/2", "R/3"))
+
+    def test_blank_lines_are_skipped_and_lines_numbered_from_the_file(self):
+        rows = self.read(offer_letter_csv("R/1", "R/2", blank_lines=True))
+        self.assertEqual([(row.line, row.is_valid) for row in rows], [(2, True), (4, True)])
+        self.assertEqual(rows[0].cleaned_data["designation"], Employee.Role.RELATIONSHIP_MANAGER)
+
+    def test_reference_numbers_are_checked_within_the_file_and_in_one_query(self):
+        OfferLetter.objects.create(created_by=self.creator, candidate_name="Old", reference_number="R/2")
+        with self.assertNumQueries(1):
+            rows = self.read(offer_letter_csv("R/1", "R/2", "R/3", "R/1"))
+        self.assertEqual(
+            [row.errors for row in rows],
+            [
+                [],
+                ["Reference number R/2 is already in use."],
+                [],
+                ["Reference number R/1 is repeated (first used on line 2)."],
+            ],
+        )
+
+    def test_reference_number_taken_after_validation(self):
+        rows = self.read(offer_letter_csv("R/1", "R/2"))
+        OfferLetter.objects.create(created_by=self.creator, candidate_name="Meanwhile", reference_number="R/2")
+        with self.assertRaisesMessage(ValidationError, "used by another offer letter meanwhile"):
+            offer_letter_import.create_offer_letters(rows, self.creator)
+        self.assertFalse(OfferLetter.objects.filter(reference_number="R/1").exists())
+
+    def test_command_without_rendering(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as f:
+            f.write(offer_letter_csv("R/1", "R/2"))
+        self.addCleanup(os.unlink, f.name)
+        stdout = io.StringIO()
+        call_command("import_offer_letters", f.name, "--created-by", "8600", "--no-render", stdout=stdout)
+        self.assertIn("Created 2 offer letter(s).", stdout.getvalue())
+        letters = OfferLetter.objects.filter(reference_number__in=["R/1", "R/2"])
+        self.assertEqual(
+            {(letter.created_by_id, letter.render_status, letter.render_claimed_at) for letter in letters},
+            {(self.creator.id, "rendering", None)},
+        )
+        # Left for the worker to pick up
+        self.assertEqual(len(OfferLetter.claim_render_jobs(limit=5)), 2)
+
+        with self.assertRaisesMessage(CommandError, "2 of 2 row(s) are invalid"):
+            call_command("import_offer_letters", f.name, "--created-by", "8600", "--no-render",
+                         stdout=io.StringIO(), stderr=io.StringIO())
+
+
+XLSX_NS = {"x": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def xlsx_rows(content: bytes) -> list[list[str]]:
+    """Cell texts of the first sheet, row by row (every part must be well-formed XML)"""
+    with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+        assert workbook.testzip() is None
+        for name in workbook.namelist():
+            ElementTree.fromstring(workbook.read(name))
+        sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+    return [
+        ["".join(cell.itertext()) for cell in row.findall("x:c", XLSX_NS)]
+        for row in sheet.find("x:sheetData", XLSX_NS).findall("x:row", XLSX_NS)
+    ]
+
+
+class ReportExportTests(TestCase):
+    def setUp(self):
+        self.manager = make_employee("8700", Employee.Role.SALES_MANAGER)
+        self.member = make_employee("8701", Employee.Role.RELATIONSHIP_MANAGER, self.manager)
+        outsider = make_employee("8709", Employee.Role.SALES_MANAGER)
+        self.day = date(2026, 6, 10)
+        DailyReport.submit(
+            self.member, self.day,
+            {"tasks_completed": "=HYPERLINK(\"http://evil\")", "challenges": "-2+3", "sales": Decimal("12.50")},
+        )
+        DailyReport.submit(self.member, self.day + timedelta(days=1), {"tasks_completed": "calls & <visits>"})
+        DailyReport.submit(self.manager, self.day, {"tasks_completed": "own report"})
+        DailyReport.submit(outsider, self.day, {"tasks_completed": "someone else's team"})
+        self.client.force_login(self.manager.user)
+
+    def export(self, **params):
+        response = self.client.get("/reports/export/", {"start": "2026-06-01", "end": "2026-06-30", **params})
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_csv_is_scoped_to_the_team_and_escapes_formulas(self):
+        rows = list(csv.reader(io.StringIO(self.export().decode())))
+        self.assertEqual(rows[0], REPORT_EXPORT_COLUMNS)
+        self.assertEqual([row[1] for row in rows[1:]], ["8701", "8701"])
+        first = dict(zip(rows[0], rows[1]))
+        self.assertEqual(first["Tasks Completed"], "'=HYPERLINK(\"http://evil\")")
+        self.assertEqual(first["Challenges"], "'-2+3")
+        self.assertEqual((first["Manager ID"], first["Sales"]), ("8700", "12.50"))
+
+    def test_xlsx_is_a_valid_workbook_with_the_team_rows(self):
+        rows = xlsx_rows(self.export(format="xlsx"))
+        self.assertEqual(rows[0], REPORT_EXPORT_COLUMNS)
+        self.assertEqual(len(rows), 3)
+        self.assertIn("=HYPERLINK(\"http://evil\")", rows[1])  # an inline string, never a formula
+        self.assertIn("calls & <visits>", rows[2])
+        self.assertIn("12.50", rows[1])
+        self.assertNotIn("someone else's team", str(rows))
+
+    def test_large_xlsx_is_streamed_in_chunks(self):
+        texts = [secrets.token_hex(50) for _ in range(5000)]
+        chunks = list(xlsx_chunks(["Text", "Number"], zip(texts, range(5000))))
+        self.assertGreater(len(chunks), 1)
+        parsed = xlsx_rows(b"".join(chunks))
+        self.assertEqual((len(parsed), parsed[-1]), (5001, [texts[-1], "4999"]))
+
+
+@override_settings(ORG_CHART_INITIAL_DEPTH=2)
+class OrgChartChildrenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # top > lead > rm > agents (depth 3, below the initial render), and another team
+        self.top = make_employee("8800", Employee.Role.SALES_MANAGER)
+        self.lead = make_employee("8801", Employee.Role.ASSISTANT_MANAGER, self.top)
+        self.rm = make_employee("8802", Employee.Role.RELATIONSHIP_MANAGER, self.lead)
+        self.agents = [make_employee(f"881{i}", Employee.Role.AGENT, self.rm) for i in range(2)]
+        self.other = make_employee("8890", Employee.Role.SALES_MANAGER)
+        self.other_lead = make_employee("8891", Employee.Role.ASSISTANT_MANAGER, self.other)
+
+    def children(self, pk):
+        return self.client.get(f"/org/{pk}/children/")
+
+    def test_first_render_stops_at_the_initial_depth(self):
+        self.client.force_login(self.top.user)
+        html = self.client.get("/org/").context["tree_html"]
+        self.assertIn("8802", html)
+        self.assertNotIn("8810", html)
+        self.assertIn(f'data-children-url="/org/{self.rm.pk}/children/"', html)
+        self.assertIn("Show 2 reports", html)
+
+    def test_children_of_a_node_in_the_subtree(self):
+        self.client.force_login(self.top.user)
+        response = self.children(self.rm.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([child["employee_id"] for child in response.json()["children"]], ["8810", "8811"])
+        self.assertEqual(response.json()["children"][0]["child_count"], 0)
+
+    def test_nodes_outside_the_subtree_are_refused(self):
+        self.client.force_login(self.lead.user)
+        for pk in (self.top.pk, self.other.pk, self.other_lead.pk):
+            self.assertEqual(self.children(pk).status_code, 403)
+        self.assertEqual(self.children(self.rm.pk).status_code, 200)
+
+        # Agents have no subtree to expand at all
+        self.client.force_login(self.agents[0].user)
+        self.assertEqual(self.children(self.agents[0].pk).status_code, 403)
+
+    def test_unknown_node_is_404(self):
+        self.client.force_login(self.top.user)
+        self.assertEqual(self.children(999999).status_code, 404)
+
+
+class HiringCapacityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Role = Employee.Role
+        cls.top = make_employee("7700", Role.SALES_MANAGER)
+        cls.leads = [make_employee(f"770{i}", Role.ASSISTANT_MANAGER, cls.top) for i in (1, 2)]
+        cls.sub_lead = make_employee("7710", Role.ASSISTANT_MANAGER, cls.leads[0])
+        cls.rms = [make_employee(f"772{i}", Role.RELATIONSHIP_MANAGER, cls.leads[0]) for i in range(2)]
+        for i in range(3):
+            make_employee(f"773{i}", Role.AGENT, cls.rms[0])
+        make_employee("7740", Role.AGENT, cls.rms[1])
+        gone = make_employee("7741", Role.AGENT, cls.rms[1])
+        gone.is_active = False
+        gone.save()
+        cls.hr = make_employee("7750", Role.HR_MANAGER)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bulk_capacity_matches_the_per_employee_checks(self):
+        employees = list(Employee.objects.all())
+        capacities = Employee.bulk_hiring_capacity(employees)
+
+        self.assertEqual(set(capacities), {e.id for e in employees})
+        for employee in employees:
+            self.assertEqual(capacities[employee.id], employee.get_hiring_capacity(), employee.employee_id)
+            by_role = {entry["role"]: entry["has_capacity"] for entry in capacities[employee.id]["by_role"]}
+            for role in employee.get_hiring_limits():
+                self.assertEqual(
+                    by_role[Employee.Role(role).label], employee.can_hire_role(role)[0], (employee.employee_id, role)
+                )
+
+        # Full, partly filled (the inactive agent doesn't count) and empty teams
+        self.assertEqual(capacities[self.rms[0].id]["status_text"], "3/3 Hired")
+        self.assertEqual(capacities[self.rms[1].id]["status_text"], "1/3 Hired")
+        self.assertEqual(capacities[self.leads[1].id]["status_text"], "Empty")
+        self.assertEqual(capacities[self.leads[0].id]["total_hired"], 3)
+        self.assertEqual(capacities[self.hr.id]["total_capacity"], 0)
+
+    def test_one_headcount_query_for_any_number_of_employees(self):
+        employees = list(Employee.objects.all())
+        with self.assertNumQueries(1):
+            Employee.bulk_hiring_capacity(employees)
+
+    @override_settings(ORG_CHART_INITIAL_DEPTH=10)
+    def test_org_chart_queries_do_not_grow_with_the_tree(self):
+        self.client.force_login(self.top.user)
+
+        def org_chart_queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get("/org/").status_code, 200)
+            return len(queries)
+
+        before = org_chart_queries()
+        rm = make_employee("7760", Employee.Role.RELATIONSHIP_MANAGER, self.leads[1])
+        for i in range(3):
+            make_employee(f"777{i}", Employee.Role.AGENT, rm)
+        self.assertEqual(org_chart_queries(), before)
+
+
+# templates/org/_tree.html as it was before render_tree_html() replaced it
+RECURSIVE_TREE_TEMPLATE = """\
+<li>
+  <span class="fw-semibold">{{ node.employee.full_name }}</span>
+  <span class="text-muted">({{ node.employee.employee_id }})</span>
+  <span class="badge text-bg-light border badge-role">{{ node.employee.get_role_display }}</span>
+  
+  {% if node.hiring_capacity.total_capacity > 0 %}
+    {% if node.hiring_capacity.is_empty %}
+      <span class="badge bg-secondary">Empty</span>
+    {% else %}
+      {% if node.hiring_capacity.percentage < 50 %}
+        <span class="badge bg-success">{{ node.hiring_capacity.status_text }}</span>
+      {% elif node.hiring_capacity.percentage < 100 %}
+        <span class="badge bg-warning text-dark">{{ node.hiring_capacity.status_text }}</span>
+      {% else %}
+        <span class="badge bg-danger">{{ node.hiring_capacity.status_text }}</span>
+      {% endif %}
+    {% endif %}
+  {% endif %}
+  
+  {% if node.children %}
+    <ul>
+      {% for child in node.children %}
+        {% include "org/_tree.html" with node=child %}
+      {% endfor %}
+    </ul>
+  {% elif node.child_count %}
+    <button type="button" class="btn btn-link btn-sm p-0 ms-1 js-org-expand"
+      data-children-url="{% url 'org_chart_children' node.employee.pk %}">
+      Show {{ node.child_count }} report{{ node.child_count|pluralize }}
+    </button>
+  {% endif %}
+</li>
+"""
+
+
+def normalize_markup(html: str) -> str:
+    return re.sub(r"\s+", " ", html).replace("> <", "><").strip()
+
+
+class OrgTreeMarkupTests(TestCase):
+    CAPACITIES = [
+        {"total_capacity": 0, "is_empty": True, "percentage": 0, "status_text": ""},
+        {"total_capacity": 3, "is_empty": True, "percentage": 0, "status_text": "0/3 Hired"},
+        {"total_capacity": 3, "is_empty": False, "percentage": 33, "status_text": "1/3 Hired"},
+        {"total_capacity": 3, "is_empty": False, "percentage": 66, "status_text": "2/3 Hired"},
+        {"total_capacity": 3, "is_empty": False, "percentage": 100, "status_text": "3/3 Hired"},
+    ]
+
+    def node(self, number, children=(), child_count=0):
+        employee = Employee(
+            pk=number, full_name=f"Name <{number}> & Co", role=Employee.Role.AGENT, user=User(username=str(number))
+        )
+        capacity = self.CAPACITIES[number % len(self.CAPACITIES)]
+        return {"employee": employee, "children": list(children), "hiring_capacity": capacity, "child_count": child_count}
+
+    def recursive_render(self, tree) -> str:
+        engine = Engine(loaders=[("django.template.loaders.locmem.Loader", {"org/_tree.html": RECURSIVE_TREE_TEMPLATE})])
+        template = engine.get_template("org/_tree.html")
+        rendered = {}
+
+        # The include nests a few dozen frames per level: give the reference room
+        def render():
+            limit = sys.getrecursionlimit()
+            sys.setrecursionlimit(200_000)
+            try:
+                rendered["html"] = template.render(Context({"node": tree}))
+            finally:
+                sys.setrecursionlimit(limit)
+
+        stack_size = threading.stack_size(512 * 1024 * 1024)
+        try:
+            thread = threading.Thread(target=render)
+            thread.start()
+            thread.join()
+        finally:
+            threading.stack_size(stack_size)
+        return rendered["html"]
+
+    def assert_same_markup(self, tree):
+        self.assertEqual(normalize_markup(org_tree.render_tree_html(tree)), normalize_markup(self.recursive_render(tree)))
+
+    def test_chain_deeper_than_the_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 100
+        tree = self.node(depth, child_count=2)  # the deepest node has unrendered reports
+        for number in range(depth - 1, 0, -1):
+            tree = self.node(number, [tree], child_count=1)
+        self.assert_same_markup(tree)
+
+    def test_wide_tree(self):
+        managers = [
+            self.node(number, [self.node(number * 1000 + leaf) for leaf in range(number % 4)], child_count=number % 4)
+            for number in range(1, 301)
+        ]
+        leaves = [self.node(number, child_count=number % 3) for number in range(301, 601)]
+        self.assert_same_markup(self.node(0, managers + leaves, child_count=600))
+
+
+class CurrentEmployeeMiddlewareTests(TestCase):
+    def setUp(self):
+        manager = make_employee("m1", Employee.Role.HR_MANAGER)
+        make_employee("e1", Employee.Role.HR_EXECUTIVE, manager)
+        make_employee("e2", manager=Employee.objects.get(user__username="e1"))
+        self.seen = {}
+
+        @admin_required
+        def view(request):
+            # Everything a view and its templates typically touch, some of it twice
+            self.seen["manager"] = request.employee.reporting_manager.user.username
+            self.seen["same_profile"] = request.user.employee is request.employee._wrapped
+            permissions = request.employee_permissions
+            self.seen["flags"] = (permissions.can_view_subtree, permissions.can_add_employees)
+            self.seen["same_permissions"] = permissions._wrapped is get_employee_permissions(request)
+            self.seen["has_team"] = (permissions.has_team_members, request.employee_permissions.has_team_members)
+            self.seen["full_name"] = request.employee.full_name
+            return HttpResponse("ok")
+
+        self.handler = CurrentEmployeeMiddleware(view)
+
+    def get(self, user):
+        request = RequestFactory().get("/")
+        request.user = user
+        request.session = {}
+        return self.handler(request)
+
+    def test_profile_and_permissions_load_once_across_decorator_and_view(self):
+        user = User.objects.get(username="e1")
+        # The profile (with its manager) once, has_team_members once
+        with self.assertNumQueries(2):
+            response = self.get(user)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.seen,
+            {
+                "manager": "m1",
+                "same_profile": True,
+                "same_permissions": True,
+                "flags": (True, True),
+                "has_team": (True, True),
+                "full_name": "e1",
+            },
+        )
+
+    def test_denied_request_loads_the_profile_once(self):
+        user = User.objects.get(username="e2")
+        with self.assertNumQueries(1):
+            response = self.get(user)
+        self.assertRedirects(response, "/dashboard/", fetch_redirect_response=False)
+        self.assertEqual(self.seen, {})
+
+    def test_anonymous_request_runs_no_queries(self):
+        with self.assertNumQueries(0):
+            response = self.get(AnonymousUser())
+        self.assertEqual(response.status_code, 302)
+
+
+class ReportComplianceTests(TestCase):
+    START, END = date(2026, 3, 1), date(2026, 3, 4)
+
+    @classmethod
+    def setUpTestData(cls):
+        Role = Employee.Role
+        joined = timezone.make_aware(datetime(2026, 2, 1, 12))
+        cls.top = make_employee("6600", Role.SALES_MANAGER)
+        cls.rm = make_employee("6601", Role.RELATIONSHIP_MANAGER, cls.top)
+        cls.agent = make_employee("6602", Role.AGENT, cls.rm)
+        cls.late = make_employee("6603", Role.AGENT, cls.rm)
+        gone = make_employee("6604", Role.AGENT, cls.rm)
+        outsider = make_employee("6690", Role.AGENT)
+        Employee.objects.update(created_at=joined)
+        Employee.objects.filter(pk=cls.late.pk).update(created_at=timezone.make_aware(datetime(2026, 3, 3, 9)))
+        Employee.objects.filter(pk=gone.pk).update(is_active=False)
+
+        def report(employee, day, **values):
+            DailyReport.objects.create(employee=employee, report_date=date(2026, 3, day), **values)
+
+        report(cls.rm, 1, tasks_completed="calls")
+        report(cls.rm, 2)  # placeholder
+        report(cls.rm, 4, challenges="network down")
+        report(cls.rm, 5, tasks_completed="after the range")
+        DailyReport.objects.create(employee=cls.rm, report_date=date(2026, 2, 28), tasks_completed="before it")
+        report(cls.agent, 1)
+        report(cls.agent, 3, sales=Decimal("5"))
+        report(cls.late, 2, next_day_plan="before joining")
+        report(gone, 1, tasks_completed="inactive")
+        report(outsider, 1, tasks_completed="other team")
+        report(cls.top, 1, tasks_completed="own report")
+
+    def test_missing_empty_and_filled_reports_per_employee_and_day(self):
+        with self.assertNumQueries(2):
+            matrix = compliance_matrix(self.top, self.START, self.END)
+
+        self.assertEqual(matrix.days, [date(2026, 3, day) for day in range(1, 5)])
+        self.assertEqual(
+            [(row.username, row.cells, row.percent) for row in matrix.rows],
+            [
+                ("6601", [True, False, False, True], 50.0),
+                ("6602", [False, False, True, False], 25.0),
+                # Joined on the 3rd, but a report before that still counts
+                ("6603", [None, True, False, False], 33.3),
+            ],
+        )
+        self.assertEqual((matrix.day_submitted, matrix.day_expected), ([1, 1, 1, 1], [2, 3, 3, 3]))
+        self.assertEqual(matrix.day_percents, [50.0, 33.3, 33.3, 33.3])
+        self.assertEqual([row.username for row in matrix.rows_by_compliance()], ["6602", "6603", "6601"])
+
+    def test_single_day_ranges_stop_at_their_bounds(self):
+        rows = compliance_matrix(self.top, self.START, self.START).rows
+        self.assertEqual([row.cells for row in rows], [[True], [False], [None]])
+        rows = compliance_matrix(self.top, self.END, self.END).rows
+        self.assertEqual([row.cells for row in rows], [[True], [False], [False]])
+        self.assertEqual(compliance_matrix(self.rm, self.START, self.END).day_expected, [1, 2, 2, 2])
+
+    def test_page_date_range_bounds(self):
+        self.client.force_login(self.top.user)
+        today = date.today()
+
+        def days(start, end):
+            response = self.client.get("/reports/compliance/", {"start": start.isoformat(), "end": end.isoformat()})
+            return response.context["matrix"].days if response.status_code == 200 else response.status_code
+
+        self.assertEqual(days(self.START, self.END), [date(2026, 3, day) for day in range(1, 5)])
+        self.assertEqual(len(days(today - timedelta(days=MAX_DAYS - 1), today)), MAX_DAYS)
+        self.assertEqual(days(today - timedelta(days=MAX_DAYS), today), 302)
+        self.assertEqual(days(self.END, self.START), 302)
+        # Days still to come are cut off, and a range entirely in the future is refused
+        self.assertEqual(days(today, today + timedelta(days=5)), [today])
+        self.assertEqual(days(today + timedelta(days=1), today + timedelta(days=5)), 302)
+        self.assertEqual(self.client.get("/reports/compliance/", {"start": "03/01/2026"}).status_code, 302)
+
+
+@override_settings(HR_DEFAULT_PASSWORD="Batch#Default-26")
+class DefaultPasswordTests(TestCase):
+    def assert_can_log_in(self, usernames):
+        for username in usernames:
+            self.assertTrue(self.client.login(username=username, password="Batch#Default-26"), username)
+            self.assertFalse(self.client.login(username=username, password="Welcome@123"), username)
+
+    def test_imported_employees_log_in_with_the_default_password(self):
+        rows = read_employee_csv(io.StringIO(
+            "employee_id,full_name,role,reporting_manager,is_active\n"
+            "3001,A,SALES_MANAGER,,\n"
+            "3002,B,ASSISTANT_MANAGER,3001,\n"
+            "3003,C,RELATIONSHIP_MANAGER,3002,\n"
+            "3004,D,AGENT,3003,\n"
+        ))
+        with mock.patch("django.contrib.auth.hashers.make_password", wraps=make_password) as hash_password:
+            created = create_employees(rows)
+        self.assertEqual(hash_password.call_count, 1)
+
+        self.assertEqual(len(created), 4)
+        self.assertTrue(all(employee.must_change_password for employee in created))
+        self.assertEqual(len(set(User.objects.filter(username__startswith="300").values_list("password"))), 1)
+        self.assert_can_log_in(["3001", "3002", "3003", "3004"])
+
+    def test_approved_candidates_log_in_with_the_default_password(self):
+        EmployeeIdSequence.objects.update_or_create(pk=1, defaults={"next_value": 8100})
+        hr = make_employee("8001", Employee.Role.HR_MANAGER)
+        letters = [
+            OfferLetter.objects.create(
+                created_by=hr, candidate_name=f"Candidate {i}", designation=Employee.Role.AGENT,
+                reference_number=f"REF/{i}", download_token=secrets.token_hex(8),
+            )
+            for i in range(3)
+        ]
+        with mock.patch("django.contrib.auth.hashers.make_password", wraps=make_password) as hash_password:
+            results = approve_offer_letters([letter.pk for letter in letters], hr)
+        self.assertEqual(hash_password.call_count, 1)
+
+        self.assertTrue(all(result.ok for result in results))
+        self.assert_can_log_in([result.employee_id for result in results])
+
+
+class ReportingCycleTests(TestCase):
+    def test_reporting_cycles(self):
+        parents = {1: None, 2: 1, 3: 4, 4: 5, 5: 3, 6: 3, 7: 7, 8: 99}
+        self.assertEqual(reporting_cycles(parents, parents), {3, 4, 5, 7})
+        self.assertEqual(reporting_cycles(parents, [2, 8]), set())
+        self.assertEqual(reporting_cycles(parents, [6]), {3, 4, 5})
+
+    def test_csv_import_rejects_cycles_among_new_rows(self):
+        make_employee("1010", Employee.Role.SALES_MANAGER)
+        rows = read_employee_csv(io.StringIO(
+            "employee_id,full_name,role,reporting_manager,is_active\n"
+            "2001,A,AGENT,2002,\n"
+            "2002,B,ASSISTANT_MANAGER,2001,\n"
+            "2003,C,AGENT,2002,\n"
+            "2004,D,ASSISTANT_MANAGER,1010,\n"
+            "2005,E,AGENT,2005,\n"
+        ))
+        cycle_errors = {
+            row.employee_id for row in rows if any("cycle" in error for error in row.errors)
+        }
+        self.assertEqual(cycle_errors, {"2001", "2002"})
+        self.assertTrue(next(row for row in rows if row.employee_id == "2004").is_valid)
+
+
+def closure_rows():
+    return sorted(EmployeeClosure.objects.values_list("ancestor_id", "descendant_id", "depth"))
+
+
+def fresh_closure_rows():
+    """What the closure table should hold, walked from each employee up the reporting_manager chain"""
+    parents = dict(Employee.objects.values_list("id", "reporting_manager_id"))
+    rows = []
+    for employee_id in parents:
+        ancestor_id, depth = employee_id, 0
+        while ancestor_id is not None:
+            rows.append((ancestor_id, employee_id, depth))
+            ancestor_id, depth = parents[ancestor_id], depth + 1
+    return sorted(rows)
+
+
+class EmployeeClosureTests(TestCase):
+    def setUp(self):
+        # top > lead > rm > agent, and other on its own
+        self.top = make_employee("6001", Employee.Role.SALES_MANAGER)
+        self.lead = make_employee("6002", Employee.Role.ASSISTANT_MANAGER, self.top)
+        self.rm = make_employee("6003", Employee.Role.RELATIONSHIP_MANAGER, self.lead)
+        self.agent = make_employee("6004", Employee.Role.AGENT, self.rm)
+        self.other = make_employee("6005", Employee.Role.SALES_MANAGER)
+
+    def assert_closure_fresh(self):
+        self.assertEqual(closure_rows(), fresh_closure_rows())
+
+    def test_closure_follows_create_move_and_delete(self):
+        self.assert_closure_fresh()
+        self.assertEqual(self.top.subtree_ids(), {self.top.id, self.lead.id, self.rm.id, self.agent.id})
+
+        self.rm.reporting_manager = self.other
+        self.rm.save()
+        self.assert_closure_fresh()
+        self.assertEqual(self.other.subtree_ids(), {self.other.id, self.rm.id, self.agent.id})
+        self.assertFalse(self.top.is_in_subtree(self.agent))
+
+        self.rm.reporting_manager = None
+        self.rm.save()
+        self.assert_closure_fresh()
+
+        self.rm.reporting_manager = self.lead
+        self.rm.save()
+        self.lead.delete()
+        self.assert_closure_fresh()
+        self.assertEqual(self.top.subtree_ids(), {self.top.id})
+
+    def test_rejected_move_under_a_descendant_leaves_the_closure_alone(self):
+        before = closure_rows()
+        form = EmployeeUpdateForm(
+            data={
+                "employee_id": "6002",
+                "full_name": self.lead.full_name,
+                "role": self.lead.role,
+                "reporting_manager": self.agent.pk,
+                "is_active": "on",
+            },
+            instance=Employee.objects.get(pk=self.lead.pk),
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("cycle", str(form.errors["reporting_manager"]))
+
+        lead = Employee.objects.get(pk=self.lead.pk)
+        lead.reporting_manager = self.rm
+        with self.assertRaises(ValidationError):
+            lead.full_clean()
+        self.assertEqual(closure_rows(), before)
+        self.assert_closure_fresh()
+
+
+class ReassignManagersTests(TestCase):
+    def setUp(self):
+        # a > b > c, and d on its own
+        self.a = make_employee("3001", Employee.Role.SALES_MANAGER)
+        self.b = make_employee("3002", Employee.Role.ASSISTANT_MANAGER, self.a)
+        self.c = make_employee("3003", Employee.Role.AGENT, self.b)
+        self.d = make_employee("3004", Employee.Role.SALES_MANAGER)
+
+    def assert_invalid(self, changes, employee_ids):
+        with self.assertRaises(ValidationError) as cm:
+            Employee.validate_reassignments(changes)
+        self.assertEqual(set(cm.exception.message_dict), employee_ids)
+
+    def test_validate_reassignments_reads_the_closure_table_once(self):
+        a, b, c, d = self.a, self.b, self.c, self.d
+        with self.assertNumQueries(1):
+            parents = Employee.validate_reassignments({a.id: d.id, c.id: None})
+        self.assertEqual(parents, {a.id: d.id, b.id: a.id, c.id: None, d.id: None})
+        with self.assertNumQueries(1):
+            Employee.validate_reassignments({b.id: d.id, c.id: a.id})
+
+        self.assert_invalid({a.id: c.id, d.id: b.id}, {a.id})
+        self.assert_invalid({a.id: d.id, d.id: a.id, c.id: d.id}, {a.id, d.id})
+        self.assert_invalid({a.id: a.id}, {a.id})
+        self.assert_invalid({a.id: 999999, 999998: None}, {a.id, 999998})
+
+    def test_reassign_managers_applies_swaps_top_down(self):
+        a, b, c = self.a, self.b, self.c
+        # b moves out from under a and a moves under b: each move on its own would be a cycle
+        self.assertEqual(Employee.reassign_managers({a.id: b.id, b.id: None, c.id: b.id}), 2)
+        self.assertEqual(
+            dict(Employee.objects.values_list("id", "reporting_manager_id")),
+            {a.id: b.id, b.id: None, c.id: b.id, self.d.id: None},
+        )
+        before = closure_rows()
+        EmployeeClosure.rebuild()
+        self.assertEqual(closure_rows(), before)
+
+        with self.assertRaises(ValidationError):
+            Employee.reassign_managers({b.id: c.id})
+        self.assertIsNone(Employee.objects.get(pk=b.pk).reporting_manager_id)
+
+    def test_command_reports_lines_and_moves_nobody_on_error(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("employee_id,reporting_manager\n3001,3003\n3004,3002\n3005,\n")
+        self.addCleanup(os.unlink, f.name)
+        stderr = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command("reassign_managers", f.name, stderr=stderr, stdout=io.StringIO())
+        self.assertEqual(
+            stderr.getvalue().splitlines(),
+            ["Line 4: Unknown employee ID '3005'."],
+        )
+
+        with open(f.name, "w") as out:
+            out.write("employee_id,reporting_manager\n3001,3003\n3004,3002\n")
+        stderr = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command("reassign_managers", f.name, stderr=stderr, stdout=io.StringIO())
+        self.assertEqual(stderr.getvalue().splitlines(), ["Line 2: Invalid reporting manager (would create a cycle)."])
+
+        with open(f.name, "w") as out:
+            out.write("employee_id,reporting_manager\n3002,3004\n3001,3003\n")
+        stdout = io.StringIO()
+        call_command("reassign_managers", f.name, "--dry-run", stdout=stdout)
+        self.assertEqual(Employee.objects.get(pk=self.b.pk).reporting_manager_id, self.a.id)
+        call_command("reassign_managers", f.name, stdout=stdout)
+        self.assertEqual(Employee.objects.get(pk=self.a.pk).reporting_manager_id, self.c.id)
+        self.assertEqual(self.d.subtree_ids(), {self.d.id, self.b.id, self.c.id, self.a.id})
+
+
+class ReportSearchTests(TestCase):
+    def setUp(self):
+        self.manager = make_employee("4001", Employee.Role.SALES_MANAGER)
+        self.lead = make_employee("4002", Employee.Role.ASSISTANT_MANAGER, self.manager)
+        self.agent = make_employee("4003", Employee.Role.RELATIONSHIP_MANAGER, self.lead)
+        self.outsider = make_employee("4009", Employee.Role.SALES_MANAGER)
+
+    def search(self, manager, terms, **dates):
+        return list(search_team_reports(manager, terms, **dates).values_list("pk", flat=True))
+
+    def test_index_follows_saves_updates_and_deletes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("FTS5 triggers are SQLite only")
+        report = DailyReport.objects.create(
+            employee=self.agent, report_date=date(2026, 5, 1), tasks_completed="Called clients about the gateway outage"
+        )
+        self.assertEqual(self.search(self.manager, "outage"), [report.pk])
+        self.assertEqual(self.search(self.manager, "gateways"), [report.pk])  # porter stemming
+
+        report.tasks_completed = "Visited branches"
+        report.save()
+        self.assertEqual(self.search(self.manager, "outage"), [])
+        self.assertEqual(self.search(self.manager, "branch"), [report.pk])
+
+        DailyReport.objects.filter(pk=report.pk).update(challenges="Printer outage")
+        self.assertEqual(self.search(self.manager, "printer outage"), [report.pk])
+
+        report.delete()
+        self.assertEqual(self.search(self.manager, "branch"), [])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM org_dailyreport_fts WHERE org_dailyreport_fts MATCH 'outage'")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_results_are_ranked_and_limited_to_the_subtree(self):
+        in_tasks = DailyReport.objects.create(
+            employee=self.agent, report_date=date(2026, 5, 1), tasks_completed="payment gateway down"
+        )
+        in_plan = DailyReport.objects.create(
+            employee=self.lead, report_date=date(2026, 5, 2), tasks_completed="visits", next_day_plan="payment gateway"
+        )
+        DailyReport.objects.create(employee=self.outsider, report_date=date(2026, 5, 1), tasks_completed="payment gateway")
+        DailyReport.objects.create(employee=self.manager, report_date=date(2026, 5, 1), tasks_completed="payment gateway")
+
+        self.assertEqual(self.search(self.manager, "payment gateway"), [in_tasks.pk, in_plan.pk])
+        self.assertEqual(self.search(self.manager, '"payment gateway"', end=date(2026, 5, 1)), [in_tasks.pk])
+        self.assertEqual(self.search(self.lead, "payment"), [in_tasks.pk])
+        self.assertEqual(self.search(self.outsider, "payment"), [])
+        self.assertEqual(self.search(self.manager, '" '), [])
@@ -10,11 +10,14 @@ urlpatterns = [
     path("dashboard/", views.dashboard, name="dashboard"),
     path("change-password/", views.change_password, name="change_password"),
     path("org/", views.org_chart, name="org_chart"),
+    path("org/<int:pk>/children/", views.org_chart_children, name="org_chart_children"),
 
     # Admin portal
     path("admin/", views.admin_home, name="admin_home"),
     path("admin/employees/", views.employee_list, name="employee_list"),
     path("admin/employees/new/", views.employee_create, name="employee_create"),
+    path("admin/employees/import/", views.employee_import, name="employee_import"),
+    path("admin/employees/export/", views.employee_export, name="employee_export"),
     path("admin/employees/<int:pk>/edit/", views.employee_edit, name="employee_edit"),
     path("admin/employees/<int:pk>/delete/", views.employee_delete, name="employee_delete"),
     path("admin/employees/<int:pk>/reset-password/", views.employee_reset_password, name="employee_reset_password"),
@@ -22,7 +25,9 @@ urlpatterns = [
     # Offer Letter Approval Workflow
     path("offer-letter/generate/", views.generate_offer_letter, name="generate_offer_letter"),
     path("offer-letters/", views.offer_letters_list, name="offer_letters_list"),
+    path("offer-letters/bulk/", views.bulk_generate_offer_letters, name="bulk_generate_offer_letters"),
     path("offer-letters/approve/", views.hr_approval_dashboard, name="hr_approval_dashboard"),
+    path("offer-letters/approve/bulk/", views.bulk_offer_letter_action, name="bulk_offer_letter_action"),
     path("offer-letters/<int:pk>/approve/", views.approve_offer_letter, name="approve_offer_letter"),
     path("offer-letters/<int:pk>/reject/", views.reject_offer_letter, name="reject_offer_letter"),
     path("offer-letters/<int:pk>/download/", views.download_offer_letter, name="download_offer_letter"),
@@ -32,6 +37,12 @@ urlpatterns = [
     # Daily Reports
     path("report/submit/", views.submit_daily_report, name="submit_daily_report"),
     path("reports/dashboard/", views.manager_reports_dashboard, name="manager_reports_dashboard"),
+    path("reports/export/", views.export_daily_reports, name="export_daily_reports"),
+    path("reports/compliance/", views.report_compliance, name="report_compliance"),
+    path("reports/leaderboard/", views.team_leaderboard, name="team_leaderboard"),
+    path("reports/search/", views.search_daily_reports, name="search_daily_reports"),
+    path("reports/api/leaderboard/", views.team_leaderboard_api, name="team_leaderboard_api"),
+    path("reports/api/trend/", views.report_trend_api, name="report_trend_api"),
     path("reports/<int:pk>/", views.view_report_detail, name="view_report_detail"),
 ]
 
@@ -7,15 +7,17 @@ from django.contrib import messages
 from django.contrib.auth import logout, update_session_auth_hash
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth.views import LoginView
+from django.core.exceptions import ValidationError
 from django.db import models
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.views.decorators.http import require_http_methods
 
 from .decorators import admin_required, can_add_employees_required, employee_required
-from .forms import EmployeeCreateForm, EmployeeIdAuthenticationForm, EmployeeUpdateForm, OfferLetterForm, DailyReportForm
-from .models import Employee, DailyReport
-from .offer_letter_pdf import generate_offer_letter_pdf
+from .forms import EmployeeCreateForm, EmployeeCSVUploadForm, EmployeeIdAuthenticationForm, EmployeeUpdateForm, OfferLetterForm, OfferLetterCSVUploadForm, DailyReportForm
+from .models import Employee, DailyReport, ReportRollup
+from .org_tree import cache_org_tree, get_cached_org_tree, render_tree_html
 from django.utils import timezone
 from datetime import date, datetime
 
@@ -71,7 +73,7 @@ def logout_view(request: HttpRequest) -> HttpResponse:
 
 @employee_required
 def dashboard(request: HttpRequest) -> HttpResponse:
-    employee: Employee = request.user.employee
+    employee: Employee = request.employee
     if employee.must_change_password:
         return redirect("change_password")
     if employee.can_access_admin_portal():
@@ -82,7 +84,7 @@ def dashboard(request: HttpRequest) -> HttpResponse:
 @employee_required
 @require_http_methods(["GET", "POST"])
 def change_password(request: HttpRequest) -> HttpResponse:
-    employee: Employee = request.user.employee
+    employee: Employee = request.employee
     form = PasswordChangeForm(user=request.user, data=request.POST or None)
     if request.method == "POST" and form.is_valid():
         form.save()
@@ -94,35 +96,71 @@ def change_password(request: HttpRequest) -> HttpResponse:
     return render(request, "change_password.html", {"form": form})
 
 
-def _build_tree(root: Employee, employees: list[Employee]) -> dict[str, Any]:
+def _build_tree(
+    root: Employee,
+    employees: list[Employee],
+    capacities: dict[int, dict[str, Any]],
+    child_counts: dict[int, int],
+) -> dict[str, Any]:
     by_manager: dict[int | None, list[Employee]] = {}
     for e in employees:
         by_manager.setdefault(e.reporting_manager_id, []).append(e)
 
     def node_for(emp: Employee) -> dict[str, Any]:
         children = [node_for(c) for c in by_manager.get(emp.id, [])]
-        hiring_capacity = emp.get_hiring_capacity()
+        hiring_capacity = capacities[emp.id]
         return {
             "employee": emp, 
             "children": children,
             "hiring_capacity": hiring_capacity,
+            # Reports below the initially rendered depth are fetched on demand
+            "child_count": child_counts.get(emp.id, 0),
         }
 
     return node_for(root)
 
 
+def _org_chart_node_json(emp: Employee, capacity: dict[str, Any], child_count: int) -> dict[str, Any]:
+    return {
+        "id": emp.id,
+        "employee_id": emp.employee_id,
+        "full_name": emp.full_name,
+        "role": emp.role,
+        "role_display": emp.get_role_display(),
+        "hiring_capacity": {
+            "total_capacity": capacity["total_capacity"],
+            "total_hired": capacity["total_hired"],
+            "is_empty": capacity["is_empty"],
+            "percentage": capacity["percentage"],
+            "status_text": capacity["status_text"],
+        },
+        "child_count": child_count,
+        "children_url": reverse("org_chart_children", args=[emp.id]) if child_count else None,
+    }
+
+
 @employee_required
 def org_chart(request: HttpRequest) -> HttpResponse:
-    employee: Employee = request.user.employee
+    employee: Employee = request.employee
 
     manager = employee.reporting_manager
-    tree = None
+    tree_html = None
     visible_employees: list[Employee] = []
 
     if employee.can_view_subtree():
-        qs = employee.subtree_queryset()
-        visible_employees = list(qs)
-        tree = _build_tree(employee, visible_employees)
+        tree_html = get_cached_org_tree(employee.id)
+        if tree_html is None:
+            # Render only the first few levels; deeper levels load through
+            # org_chart_children so first paint doesn't grow with the org.
+            qs = employee.subtree_queryset(max_depth=settings.ORG_CHART_INITIAL_DEPTH)
+            visible_employees = list(qs)
+            capacities = Employee.bulk_hiring_capacity(visible_employees)
+            child_counts = Employee.direct_report_counts(e.id for e in visible_employees)
+            tree_html = render_tree_html(_build_tree(employee, visible_employees, capacities, child_counts))
+            cache_org_tree(employee.id, tree_html)
+            capacity = capacities[employee.id]
+        else:
+            capacity = employee.get_hiring_capacity()
     else:
         # Regular employee: only see self + their manager
         visible_ids = [employee.id]
@@ -131,6 +169,7 @@ def org_chart(request: HttpRequest) -> HttpResponse:
         visible_employees = list(
             Employee.objects.filter(id__in=visible_ids).select_related("user", "reporting_manager")
         )
+        capacity = employee.get_hiring_capacity()
 
     return render(
         request,
@@ -138,12 +177,35 @@ def org_chart(request: HttpRequest) -> HttpResponse:
         {
             "employee": employee,
             "manager": manager,
-            "tree": tree,
+            "capacity": capacity,
+            "tree_html": tree_html,
             "visible_employees": visible_employees,
         },
     )
 
 
+@employee_required
+def org_chart_children(request: HttpRequest, pk: int) -> JsonResponse:
+    """Direct reports of one org chart node, for expanding the tree on demand"""
+    employee: Employee = request.employee
+    if employee.can_view_subtree() and not Employee.objects.filter(pk=pk).exists():
+        return JsonResponse({"error": "No such employee."}, status=404)
+    if not employee.can_view_subtree() or not employee.is_in_subtree(pk):
+        return JsonResponse({"error": "You don't have permission to view this team."}, status=403)
+
+    children = list(Employee.objects.filter(reporting_manager_id=pk).select_related("user"))
+    capacities = Employee.bulk_hiring_capacity(children)
+    child_counts = Employee.direct_report_counts(c.id for c in children)
+
+    return JsonResponse(
+        {
+            "children": [
+                _org_chart_node_json(c, capacities[c.id], child_counts.get(c.id, 0)) for c in children
+            ]
+        }
+    )
+
+
 @admin_required
 def admin_home(request: HttpRequest) -> HttpResponse:
     return render(request, "admin/admin_home.html", {"default_password": settings.HR_DEFAULT_PASSWORD})
@@ -152,7 +214,7 @@ def admin_home(request: HttpRequest) -> HttpResponse:
 
 @can_add_employees_required
 def employee_list(request: HttpRequest) -> HttpResponse:
-    current_employee = request.user.employee
+    current_employee = request.employee
     q = (request.GET.get("q") or "").strip()
     
     # HR Manager and HR Executive can see all employees
@@ -160,8 +222,7 @@ def employee_list(request: HttpRequest) -> HttpResponse:
         qs = Employee.objects.select_related("user", "reporting_manager")
     else:
         # Other managers can only see their own subtree (team members)
-        team_ids = current_employee.subtree_ids()
-        qs = Employee.objects.filter(id__in=team_ids).select_related("user", "reporting_manager")
+        qs = current_employee.subtree_queryset()
     
     if q:
         qs = qs.filter(models.Q(user__username__icontains=q) | models.Q(full_name__icontains=q))
@@ -173,25 +234,79 @@ def employee_list(request: HttpRequest) -> HttpResponse:
 @can_add_employees_required
 @require_http_methods(["GET", "POST"])
 def employee_create(request: HttpRequest) -> HttpResponse:
-    current_employee = request.user.employee
+    current_employee = request.employee
     form = EmployeeCreateForm(request.POST or None, current_user=current_employee)
     if request.method == "POST" and form.is_valid():
-        employee = form.save()
-        messages.success(request, f"Created employee {employee.employee_id}.")
-        return redirect("employee_list")
+        try:
+            employee = form.save()
+        except ValidationError as e:
+            form.add_error(None, e)
+        else:
+            messages.success(request, f"Created employee {employee.employee_id}.")
+            return redirect("employee_list")
     return render(request, "admin/employee_form.html", {"form": form, "mode": "create"})
 
 
+@admin_required
+@require_http_methods(["GET", "POST"])
+def employee_import(request: HttpRequest) -> HttpResponse:
+    """Create employees from an uploaded CSV; nothing is created unless every row is valid"""
+    import io
+
+    from .employee_csv import EMPLOYEE_CSV_COLUMNS, create_employees, read_employee_csv, write_csv_template
+
+    if request.GET.get("template"):
+        response = HttpResponse(content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="employees_template.csv"'
+        write_csv_template(response)
+        return response
+
+    rows = []
+    if request.method == "POST":
+        form = EmployeeCSVUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                stream = io.TextIOWrapper(form.cleaned_data["csv_file"].file, encoding="utf-8-sig", newline="")
+                rows = read_employee_csv(stream)
+                if all(row.is_valid for row in rows):
+                    employees = create_employees(rows)
+                    messages.success(request, f"Imported {len(employees)} employees.")
+                    return redirect("employee_list")
+            except UnicodeDecodeError:
+                form.add_error("csv_file", "The file must be UTF-8 encoded CSV.")
+            except ValidationError as e:
+                form.add_error("csv_file", e)
+    else:
+        form = EmployeeCSVUploadForm()
+
+    return render(request, "admin/employee_import.html", {
+        "form": form,
+        "rows": rows,
+        "invalid_rows": [row for row in rows if not row.is_valid],
+        "columns": EMPLOYEE_CSV_COLUMNS,
+    })
+
+
+@admin_required
+def employee_export(request: HttpRequest) -> StreamingHttpResponse:
+    """All employees as CSV, streamed so the response never sits in memory"""
+    from .employee_csv import iter_employee_csv
+
+    response = StreamingHttpResponse(iter_employee_csv(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="employees_{date.today():%Y%m%d}.csv"'
+    return response
+
+
 @can_add_employees_required
 @require_http_methods(["GET", "POST"])
 def employee_edit(request: HttpRequest, pk: int) -> HttpResponse:
-    current_employee = request.user.employee
+    current_employee = request.employee
     employee = get_object_or_404(Employee.objects.select_related("user"), pk=pk)
     
     # Check if current user has permission to edit this employee
     if not current_employee.can_access_admin_portal():
         # Non-admin managers can only edit their team members
-        if employee.id not in current_employee.subtree_ids():
+        if not current_employee.is_in_subtree(employee):
             messages.error(request, "You don't have permission to edit this employee.")
             return redirect("employee_list")
     form = EmployeeUpdateForm(request.POST or None, instance=employee)
@@ -207,7 +322,7 @@ def employee_edit(request: HttpRequest, pk: int) -> HttpResponse:
 @can_add_employees_required
 @require_http_methods(["GET", "POST"])
 def employee_delete(request: HttpRequest, pk: int) -> HttpResponse:
-    current_employee = request.user.employee
+    current_employee = request.employee
     employee = get_object_or_404(Employee.objects.select_related("user"), pk=pk)
     
     if employee.user_id == request.user.id:
@@ -217,7 +332,7 @@ def employee_delete(request: HttpRequest, pk: int) -> HttpResponse:
     # Check if current user has permission to delete this employee
     if not current_employee.can_access_admin_portal():
         # Non-admin managers can only delete their team members
-        if employee.id not in current_employee.subtree_ids():
+        if not current_employee.is_in_subtree(employee):
             messages.error(request, "You don't have permission to delete this employee.")
             return redirect("employee_list")
 
@@ -232,13 +347,13 @@ def employee_delete(request: HttpRequest, pk: int) -> HttpResponse:
 @can_add_employees_required
 @require_http_methods(["GET", "POST"])
 def employee_reset_password(request: HttpRequest, pk: int) -> HttpResponse:
-    current_employee = request.user.employee
+    current_employee = request.employee
     employee = get_object_or_404(Employee.objects.select_related("user"), pk=pk)
     
     # Check if current user has permission to reset password for this employee
     if not current_employee.can_access_admin_portal():
         # Non-admin managers can only reset passwords for their team members
-        if employee.id not in current_employee.subtree_ids():
+        if not current_employee.is_in_subtree(employee):
             messages.error(request, "You don't have permission to reset this employee's password.")
             return redirect("employee_list")
     if request.method == "POST":
@@ -258,59 +373,18 @@ def employee_reset_password(request: HttpRequest, pk: int) -> HttpResponse:
 @can_add_employees_required
 @require_http_methods(["GET", "POST"])
 def generate_offer_letter(request: HttpRequest) -> HttpResponse:
-    """Generate offer letter and save for HR approval"""
-    from django.core.files.base import ContentFile
-    import secrets
-    
+    """Save offer letter for HR approval; the PDF is rendered by the background worker"""
     if request.method == "POST":
         form = OfferLetterForm(request.POST)
         if form.is_valid():
             from .models import OfferLetter
             
-            # Prepare data for PDF generation
-            data = form.cleaned_data.copy()
-            # Get designation display name
-            designation_choices = dict(Employee.Role.choices)
-            data['designation_display'] = designation_choices.get(data['designation'], data['designation'])
-            
-            # Store original values before formatting
-            original_offer_date = data['offer_date']
-            original_joining_date = data['joining_date']
-            original_salary = data['annual_salary']
-            
-            # Format for PDF
-            data['offer_date'] = original_offer_date.strftime('%d-%m-%Y')
-            data['joining_date'] = original_joining_date.strftime('%B %Y')
-            data['annual_salary'] = f"{original_salary:,.2f}"
-            
-            # Generate PDF
-            pdf_content = generate_offer_letter_pdf(data)
-            
-            # Create OfferLetter record
-            offer_letter = OfferLetter(
-                created_by=request.user.employee,
-                candidate_name=form.cleaned_data['candidate_name'],
-                candidate_email=form.cleaned_data.get('candidate_email', ''),
-                designation=form.cleaned_data['designation'],
-                designation_display=data['designation_display'],
-                department=form.cleaned_data['department'],
-                annual_salary=f"{original_salary:,.2f}",
-                salary_in_words=form.cleaned_data['salary_in_words'],
-                joining_date=original_joining_date.strftime('%B %Y'),
-                offer_date=original_offer_date.strftime('%d-%m-%Y'),
-                reference_number=form.cleaned_data['reference_number'],
-                team_details=form.cleaned_data.get('team_details', ''),
-                download_token=secrets.token_urlsafe(32),
-                status='pending'
-            )
-            
-            # Save PDF file
-            filename = f"{form.cleaned_data['reference_number']}_{form.cleaned_data['candidate_name'].replace(' ', '_')}.pdf"
-            offer_letter.pdf_file.save(filename, ContentFile(pdf_content), save=True)
+            OfferLetter.from_form_data(form.cleaned_data, created_by=request.employee).save()
             
             messages.success(
                 request, 
-                f"Offer letter for {form.cleaned_data['candidate_name']} has been submitted for HR approval."
+                f"Offer letter for {form.cleaned_data['candidate_name']} has been submitted for HR approval. "
+                "The PDF is being prepared."
             )
             return redirect("offer_letters_list")
     else:
@@ -319,24 +393,68 @@ def generate_offer_letter(request: HttpRequest) -> HttpResponse:
     return render(request, "offer_letter_form.html", {"form": form})
 
 
+@can_add_employees_required
+@require_http_methods(["GET", "POST"])
+def bulk_generate_offer_letters(request: HttpRequest) -> HttpResponse:
+    """Create offer letters for every candidate in an uploaded CSV; PDFs are rendered by the worker"""
+    import io
+
+    from .offer_letter_import import CSV_COLUMNS, create_offer_letters, read_offer_letter_csv, write_csv_template
+
+    if request.GET.get("template"):
+        response = HttpResponse(content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="offer_letters_template.csv"'
+        write_csv_template(response)
+        return response
+
+    rows = []
+    letters = []
+    if request.method == "POST":
+        form = OfferLetterCSVUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                stream = io.TextIOWrapper(form.cleaned_data["csv_file"].file, encoding="utf-8-sig", newline="")
+                rows = read_offer_letter_csv(stream)
+                if all(row.is_valid for row in rows):
+                    letters = create_offer_letters(rows, created_by=request.employee)
+            except UnicodeDecodeError:
+                form.add_error("csv_file", "The file must be UTF-8 encoded CSV.")
+            except ValidationError as e:
+                form.add_error("csv_file", e)
+
+            if letters:
+                messages.success(
+                    request,
+                    f"{len(letters)} offer letters have been submitted for HR approval. "
+                    "Their PDFs are being prepared.",
+                )
+    else:
+        form = OfferLetterCSVUploadForm()
+
+    return render(request, "offer_letter_bulk_upload.html", {
+        "form": form,
+        "rows": rows,
+        "invalid_count": sum(1 for row in rows if not row.is_valid),
+        "letters": letters,
+        "columns": CSV_COLUMNS,
+    })
+
+
 @employee_required
 @require_http_methods(["GET", "POST"])
 def submit_daily_report(request: HttpRequest) -> HttpResponse:
     """Submit or update daily work report"""
-    current_employee = request.user.employee
+    current_employee = request.employee
     today = date.today()
     
-    # Get or create today's report
-    report, created = DailyReport.objects.get_or_create(
-        employee=current_employee,
-        report_date=today,
-        defaults={'tasks_completed': ''}
-    )
+    # Only read on GET; the row is written when the form is submitted
+    report = DailyReport.objects.filter(employee=current_employee, report_date=today).first()
     
     if request.method == "POST":
-        form = DailyReportForm(request.POST, instance=report)
+        form = DailyReportForm(request.POST)
         if form.is_valid():
-            form.save()
+            values = {name: form.cleaned_data[name] for name in DailyReport.SUBMITTED_FIELDS}
+            DailyReport.submit(current_employee, today, values)
             messages.success(request, "Daily report submitted successfully!")
             return redirect("dashboard")
     else:
@@ -345,14 +463,14 @@ def submit_daily_report(request: HttpRequest) -> HttpResponse:
     return render(request, "report_submit_form.html", {
         "form": form,
         "report_date": today,
-        "is_update": not created
+        "is_update": report is not None
     })
 
 
 @employee_required
 def manager_reports_dashboard(request: HttpRequest) -> HttpResponse:
     """View daily reports from team members with filtering"""
-    current_employee = request.user.employee
+    current_employee = request.employee
     
     # Get team members (excluding self)
     team_ids = current_employee.subtree_ids()
@@ -413,18 +531,230 @@ def manager_reports_dashboard(request: HttpRequest) -> HttpResponse:
         "total_team": total_team,
         "submitted_count": submitted_count,
         "not_submitted_count": total_team - submitted_count,
+        "export_start": selected_date.replace(day=1),
+        "team_month": ReportRollup.totals(current_employee, ReportRollup.Period.MONTH, selected_date),
+    })
+
+
+@employee_required
+def report_compliance(request: HttpRequest) -> HttpResponse:
+    """Heatmap of who on the team submitted a daily report on each day of a range"""
+    from django.core.paginator import Paginator
+
+    from .report_compliance import MAX_DAYS, compliance_matrix
+
+    current_employee = request.employee
+    if not current_employee.has_team_members():
+        messages.error(request, "You don't have any team members to view reports for.")
+        return redirect("manager_reports_dashboard")
+
+    today = date.today()
+    try:
+        start = datetime.strptime(request.GET.get("start") or today.replace(day=1).isoformat(), "%Y-%m-%d").date()
+        end = datetime.strptime(request.GET.get("end") or today.isoformat(), "%Y-%m-%d").date()
+    except ValueError:
+        messages.error(request, "Enter dates as YYYY-MM-DD.")
+        return redirect("report_compliance")
+    end = min(end, today)  # days still to come can't be missed yet
+    if start > end:
+        messages.error(request, "The start date must be on or before the end date (and not in the future).")
+        return redirect("report_compliance")
+    if (end - start).days >= MAX_DAYS:
+        messages.error(request, f"Pick a range of at most {MAX_DAYS} days.")
+        return redirect("report_compliance")
+
+    order = request.GET.get("order", "id")
+    matrix = compliance_matrix(current_employee, start, end)
+    rows = matrix.rows_by_compliance() if order == "compliance" else matrix.rows
+    page = Paginator(rows, 100).get_page(request.GET.get("page"))
+
+    return render(request, "report_compliance.html", {
+        "matrix": matrix,
+        "page": page,
+        "start": start,
+        "end": end,
+        "order": order,
+        "day_columns": list(zip(matrix.days, matrix.day_percents)),
     })
 
 
+def _report_stats_params(request: HttpRequest) -> tuple[str, date]:
+    """(period, day) from the query string; ValueError if either is malformed"""
+    period = request.GET.get("period") or ReportRollup.Period.WEEK
+    if period not in ReportRollup.Period.values:
+        raise ValueError(f"period must be one of {', '.join(ReportRollup.Period.values)}")
+    day = request.GET.get("date")
+    return period, datetime.strptime(day, "%Y-%m-%d").date() if day else date.today()
+
+
+def _subtree_member(request: HttpRequest, param: str) -> Employee | None:
+    """The employee named by `param` (pk, default: the caller) if the caller may see them, else None"""
+    current_employee = request.employee
+    try:
+        pk = int(request.GET.get(param) or current_employee.pk)
+    except ValueError:
+        return None
+    if pk == current_employee.pk:
+        return current_employee
+    if not current_employee.is_in_subtree(pk):
+        return None
+    return Employee.objects.select_related("user").get(pk=pk)
+
+
+@employee_required
+def team_leaderboard(request: HttpRequest) -> HttpResponse:
+    """Sales and hiring leaderboards for the team, with a trend for the team or one member"""
+    from .report_leaderboard import leaderboard, trend
+
+    current_employee = request.employee
+    if not current_employee.has_team_members():
+        messages.error(request, "You don't have any team members to view reports for.")
+        return redirect("manager_reports_dashboard")
+    try:
+        period, day = _report_stats_params(request)
+    except ValueError:
+        messages.error(request, "Pick a day, week or month and a date as YYYY-MM-DD.")
+        return redirect("team_leaderboard")
+
+    # Trend of one team member's own figures when picked, else the whole team's
+    member = _subtree_member(request, "employee")
+    if member is None:
+        messages.error(request, "You don't have permission to view that employee's reports.")
+        return redirect("team_leaderboard")
+    scope = ReportRollup.Scope.TEAM if member == current_employee else ReportRollup.Scope.OWN
+    series = trend(member, period, day, periods=12, scope=scope)
+    peak = max((point["sales"] for point in series), default=0) or 1
+
+    board = leaderboard(current_employee, period, day)
+    return render(request, "report_leaderboard.html", {
+        "board": board,
+        "rankings": [("💰 Sales", board["sales"]), ("🤝 Hiring", board["hiring"])],
+        "period": period,
+        "periods": ReportRollup.Period.choices,
+        "selected_date": day,
+        "member": member,
+        "is_team_trend": scope == ReportRollup.Scope.TEAM,
+        "trend": [{**point, "width": round(100 * point["sales"] / peak)} for point in series],
+    })
+
+
+@employee_required
+def team_leaderboard_api(request: HttpRequest) -> JsonResponse:
+    """Leaderboards for ?manager= (default: the caller) over ?period=day|week|month containing ?date="""
+    from .report_leaderboard import leaderboard
+
+    try:
+        period, day = _report_stats_params(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    manager = _subtree_member(request, "manager")
+    if manager is None:
+        return JsonResponse({"error": "You don't have permission to view this team."}, status=403)
+    return JsonResponse(leaderboard(manager, period, day))
+
+
+@employee_required
+def report_trend_api(request: HttpRequest) -> JsonResponse:
+    """
+    Trend series for ?employee= (default: the caller): their own figures, or
+    with ?scope=team their team's, for the last ?periods= periods up to ?date=
+    """
+    from .report_leaderboard import MAX_TREND_PERIODS, trend
+
+    try:
+        period, day = _report_stats_params(request)
+        periods = int(request.GET.get("periods") or 12)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    scope = request.GET.get("scope") or ReportRollup.Scope.OWN
+    if scope not in ReportRollup.Scope.values or not 1 <= periods <= MAX_TREND_PERIODS:
+        return JsonResponse(
+            {"error": f"scope must be own or team and periods between 1 and {MAX_TREND_PERIODS}"}, status=400
+        )
+    employee = _subtree_member(request, "employee")
+    if employee is None:
+        return JsonResponse({"error": "You don't have permission to view this employee's reports."}, status=403)
+    return JsonResponse({
+        "employee_id": employee.employee_id,
+        "scope": scope,
+        "period": period,
+        "series": trend(employee, period, day, periods=periods, scope=scope),
+    })
+
+
+@employee_required
+def search_daily_reports(request: HttpRequest) -> HttpResponse:
+    """Full-text search over the team's daily reports, best matches first"""
+    from django.core.paginator import Paginator
+
+    from .report_search import SEARCH_PAGE_SIZE, search_team_reports
+
+    current_employee = request.employee
+    if not current_employee.has_team_members():
+        messages.error(request, "You don't have any team members to search reports for.")
+        return redirect("manager_reports_dashboard")
+
+    q = (request.GET.get("q") or "").strip()
+    try:
+        start = datetime.strptime(request.GET["start"], "%Y-%m-%d").date() if request.GET.get("start") else None
+        end = datetime.strptime(request.GET["end"], "%Y-%m-%d").date() if request.GET.get("end") else None
+    except ValueError:
+        messages.error(request, "Enter dates as YYYY-MM-DD.")
+        return redirect("search_daily_reports")
+
+    page = None
+    if q:
+        results = search_team_reports(current_employee, q, start, end)
+        page = Paginator(results, SEARCH_PAGE_SIZE).get_page(request.GET.get("page"))
+
+    return render(request, "report_search.html", {"q": q, "start": start, "end": end, "page": page})
+
+
+@employee_required
+def export_daily_reports(request: HttpRequest) -> HttpResponse:
+    """Stream the team's daily reports for a date range as CSV or XLSX"""
+    from .report_export import REPORT_EXPORT_COLUMNS, report_export_rows
+    from .streaming import csv_lines, xlsx_chunks
+
+    current_employee = request.employee
+    if not current_employee.has_team_members():
+        messages.error(request, "You don't have any team members to export reports for.")
+        return redirect("manager_reports_dashboard")
+
+    today = date.today()
+    try:
+        start = datetime.strptime(request.GET.get("start") or today.replace(day=1).isoformat(), "%Y-%m-%d").date()
+        end = datetime.strptime(request.GET.get("end") or today.isoformat(), "%Y-%m-%d").date()
+    except ValueError:
+        messages.error(request, "Enter export dates as YYYY-MM-DD.")
+        return redirect("manager_reports_dashboard")
+    if start > end:
+        messages.error(request, "The export start date must be on or before the end date.")
+        return redirect("manager_reports_dashboard")
+
+    rows = report_export_rows(current_employee, start, end)
+    filename = f"team_reports_{start:%Y%m%d}_{end:%Y%m%d}"
+    if request.GET.get("format") == "xlsx":
+        response = StreamingHttpResponse(
+            xlsx_chunks(REPORT_EXPORT_COLUMNS, rows, sheet_name="Daily Reports"),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+        filename += ".xlsx"
+    else:
+        response = StreamingHttpResponse(csv_lines(REPORT_EXPORT_COLUMNS, rows), content_type="text/csv")
+        filename += ".csv"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 @employee_required
 def view_report_detail(request: HttpRequest, pk: int) -> HttpResponse:
     """View detailed daily report"""
-    current_employee = request.user.employee
+    current_employee = request.employee
     report = get_object_or_404(DailyReport.objects.select_related('employee__user'), pk=pk)
     
     # Check permission: Can only view reports from team members
-    team_ids = current_employee.subtree_ids()
-    if report.employee_id not in team_ids:
+    if not current_employee.is_in_subtree(report.employee_id):
         messages.error(request, "You don't have permission to view this report.")
         return redirect("manager_reports_dashboard")
     
@@ -433,120 +763,124 @@ def view_report_detail(request: HttpRequest, pk: int) -> HttpResponse:
 
 # ==================== OFFER LETTER APPROVAL WORKFLOW ====================
 
-from django.http import FileResponse
+from .downloads import pdf_download_response
 
 @can_add_employees_required
 def offer_letters_list(request):
     from .models import OfferLetter
-    current_employee = request.user.employee
+    current_employee = request.employee
     offer_letters = OfferLetter.objects.filter(created_by=current_employee).order_by('-created_at')
     return render(request, 'offer_letters_list.html', {'offer_letters': offer_letters})
 
 @admin_required
 def hr_approval_dashboard(request):
     from .models import OfferLetter
+    from .pagination import keyset_page
     status_filter = request.GET.get('status', 'pending')
     if status_filter == 'all':
         offer_letters = OfferLetter.objects.all()
     else:
         offer_letters = OfferLetter.objects.filter(status=status_filter)
-    offer_letters = offer_letters.select_related('created_by__user', 'approved_by__user').order_by('-created_at')
-    pending_count = OfferLetter.objects.filter(status='pending').count()
-    approved_count = OfferLetter.objects.filter(status='approved').count()
-    rejected_count = OfferLetter.objects.filter(status='rejected').count()
+    offer_letters = offer_letters.select_related('created_by__user', 'approved_by__user')
+    cursor = request.GET.get('after')
+    offer_letters, next_cursor = keyset_page(offer_letters, cursor)
+    counts = OfferLetter.status_counts()
     return render(request, 'hr_approval_dashboard.html', {
         'offer_letters': offer_letters, 'status_filter': status_filter, 
-        'pending_count': pending_count, 'approved_count': approved_count, 'rejected_count': rejected_count
+        'pending_count': counts['pending'], 'approved_count': counts['approved'], 'rejected_count': counts['rejected'],
+        'is_first_page': not cursor, 'next_cursor': next_cursor,
     })
 
 @admin_required
 @require_http_methods(['POST'])
 def approve_offer_letter(request, pk):
-    from .models import OfferLetter, Employee
-    from django.utils import timezone
-    from django.contrib.auth.models import User
-    from django.db import transaction
+    from .models import OfferLetter
+    from .offer_letter_approval import approve_offer_letters
     
     offer_letter = get_object_or_404(OfferLetter, pk=pk)
     
-    # Check if already approved (prevent duplicate employee creation)
-    if offer_letter.status == 'approved':
-        messages.warning(request, f'Offer letter for {offer_letter.candidate_name} is already approved.')
-        return redirect('hr_approval_dashboard')
-    
     try:
-        with transaction.atomic():
-            # Generate unique employee ID
-            last_employee = Employee.objects.order_by('-employee_id').first()
-            if last_employee and last_employee.employee_id.isdigit():
-                new_employee_id = str(int(last_employee.employee_id) + 1)
-            else:
-                # Start from 1007 if no numeric IDs exist
-                new_employee_id = "1007"
-            
-            # Create User account
-            username = new_employee_id
-            user = User.objects.create_user(
-                username=username,
-                password=settings.HR_DEFAULT_PASSWORD,
-                first_name=offer_letter.candidate_name.split()[0] if offer_letter.candidate_name else "",
-                last_name=" ".join(offer_letter.candidate_name.split()[1:]) if len(offer_letter.candidate_name.split()) > 1 else ""
-            )
-            
-            # Create Employee record
-            employee = Employee.objects.create(
-                user=user,
-                employee_id=new_employee_id,
-                full_name=offer_letter.candidate_name,
-                email=offer_letter.candidate_email,
-                role=offer_letter.designation,  # Use designation from offer letter
-                reporting_manager=offer_letter.created_by,  # Report to the manager who created the offer
-                date_of_joining=timezone.now().date()
-            )
-            
-            # Approve the offer letter
-            offer_letter.status = 'approved'
-            offer_letter.approved_by = request.user.employee
-            offer_letter.approved_at = timezone.now()
-            offer_letter.save()
-            
-            messages.success(
-                request, 
-                f'Offer letter approved! Employee {employee.full_name} (ID: {new_employee_id}) has been added under {offer_letter.created_by.full_name}.'
-            )
+        result = approve_offer_letters([offer_letter.pk], request.employee)[0]
     except Exception as e:
         messages.error(request, f'Error creating employee: {str(e)}')
+        return redirect('hr_approval_dashboard')
     
+    if result.ok:
+        messages.success(
+            request, 
+            f'Offer letter approved! Employee {offer_letter.candidate_name} (ID: {result.employee_id}) has been added under {offer_letter.created_by.full_name}.'
+        )
+    else:
+        messages.warning(request, f'Offer letter for {offer_letter.candidate_name} was not approved: {result.message}')
     return redirect('hr_approval_dashboard')
 
 @admin_required
 @require_http_methods(['POST'])
 def reject_offer_letter(request, pk):
     from .models import OfferLetter
+    from .offer_letter_approval import reject_offer_letters
     offer_letter = get_object_or_404(OfferLetter, pk=pk)
     rejection_reason = request.POST.get('rejection_reason', 'No reason provided')
-    offer_letter.status = 'rejected'
-    offer_letter.rejection_reason = rejection_reason
-    offer_letter.save()
-    messages.warning(request, f'Offer letter for {offer_letter.candidate_name} has been rejected.')
+    result = reject_offer_letters([offer_letter.pk], rejection_reason)[0]
+    if result.ok:
+        messages.warning(request, f'Offer letter for {offer_letter.candidate_name} has been rejected.')
+    else:
+        messages.error(request, f'Offer letter for {offer_letter.candidate_name} was not rejected: {result.message}')
     return redirect('hr_approval_dashboard')
 
+@admin_required
+@require_http_methods(['POST'])
+def bulk_offer_letter_action(request):
+    """Approve or reject the letters ticked on the HR approval dashboard in one batch"""
+    from .offer_letter_approval import approve_offer_letters, reject_offer_letters
+    
+    action = request.POST.get('action')
+    letter_ids = [value for value in request.POST.getlist('letter_ids') if value.isdigit()]
+    rejection_reason = request.POST.get('rejection_reason', '').strip()
+    if action not in ('approve', 'reject') or not letter_ids:
+        messages.error(request, 'Select at least one offer letter and an action.')
+        return redirect('hr_approval_dashboard')
+    if action == 'reject' and not rejection_reason:
+        messages.error(request, 'Enter a rejection reason for the selected offer letters.')
+        return redirect('hr_approval_dashboard')
+    
+    try:
+        if action == 'approve':
+            results = approve_offer_letters(letter_ids, request.employee)
+        else:
+            results = reject_offer_letters(letter_ids, rejection_reason)
+    except Exception as e:
+        messages.error(request, f'Nothing was changed: {str(e)}')
+        return redirect('hr_approval_dashboard')
+    
+    return render(request, 'offer_letter_bulk_result.html', {
+        'action': action,
+        'results': results,
+        'succeeded': sum(result.ok for result in results),
+        'failed': sum(not result.ok for result in results),
+    })
+
 @employee_required
 def download_offer_letter(request, pk):
     from .models import OfferLetter
     offer_letter = get_object_or_404(OfferLetter, pk=pk)
-    current_employee = request.user.employee
+    current_employee = request.employee
     can_download = (current_employee.can_access_admin_portal() or (offer_letter.created_by == current_employee and offer_letter.status == 'approved'))
     if not can_download:
         messages.error(request, 'You don\'t have permission to download this offer letter.')
         return redirect('offer_letters_list')
-    return FileResponse(offer_letter.pdf_file, as_attachment=True, filename=f'Offer_Letter_{offer_letter.candidate_name}.pdf')
+    if not offer_letter.is_pdf_ready:
+        messages.warning(request, 'The PDF for this offer letter is still being prepared. Please try again shortly.')
+        return redirect('hr_approval_dashboard' if current_employee.can_access_admin_portal() else 'offer_letters_list')
+    return pdf_download_response(request, offer_letter.pdf_file, f'Offer_Letter_{offer_letter.candidate_name}.pdf')
 
 def candidate_download_page(request, token):
     from .models import OfferLetter
     offer_letter = get_object_or_404(OfferLetter, download_token=token)
     if offer_letter.status != 'approved':
         return render(request, 'candidate_download_error.html', {'message': 'This offer letter is pending approval and cannot be downloaded yet.'})
+    if not offer_letter.is_pdf_ready:
+        return render(request, 'candidate_download_error.html', {'message': 'This offer letter is still being prepared. Please check back in a few minutes.'})
     if request.GET.get('download') == '1':
-        return FileResponse(offer_letter.pdf_file, as_attachment=True, filename=f'Offer_Letter_{offer_letter.candidate_name}.pdf')
+        return pdf_download_response(request, offer_letter.pdf_file, f'Offer_Letter_{offer_letter.candidate_name}.pdf')
     return render(request, 'candidate_download_page.html', {'offer_letter': offer_letter})